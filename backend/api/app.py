@@ -1,41 +1,74 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from db.database import init_db
+from db import profiling
+from db.aio import close_async_pools
+from db.database import init_db, tenancy_enabled
+from api.profiling import ProfilingMiddleware
+from api.tenancy import TenantMiddleware
 from api.routes import (
     accounts,
+    budget,
     credit_cards,
     categories,
     classification_rules,
+    debug,
     fixed_incomes,
     fixed_expenses,
+    forecast,
+    imports,
+    metrics,
+    overview,
     savings,
     sync,
     transactions,
+    wedding,
 )
 
 app = FastAPI(title="Cashboard API")
 
+# Added before CORS so it runs inside it: preflight requests carry no tenant
+if tenancy_enabled():
+    app.add_middleware(TenantMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing"],
 )
 
+if profiling.ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 
 @app.on_event("startup")
 def startup():
     init_db()
 
 
+@app.on_event("shutdown")
+def shutdown():
+    close_async_pools()
+
+
 app.include_router(accounts.router)
+app.include_router(budget.router)
 app.include_router(credit_cards.router)
 app.include_router(categories.router)
 app.include_router(classification_rules.router)
 app.include_router(fixed_incomes.router)
 app.include_router(fixed_expenses.router)
+app.include_router(forecast.router)
+app.include_router(imports.router)
+app.include_router(metrics.router)
+app.include_router(overview.router)
 app.include_router(savings.router)
 app.include_router(sync.router)
 app.include_router(transactions.router)
+app.include_router(wedding.router)
+
+if profiling.ENABLED:
+    app.include_router(debug.router)
@@ -0,0 +1,40 @@
+"""Conditional GETs driven by the data_versions counters.
+
+etag("categories") is a route dependency that reads the table's version
+stamp (one primary-key lookup) and answers 304 Not Modified when the
+client's If-None-Match already holds it, before the route's own query
+runs. Otherwise it sets the ETag header on the response. Stamps start
+with the database's instance id, so tags never carry over between
+databases or tenants.
+"""
+
+from fastapi import Depends, HTTPException, Request, Response
+
+from db.aio import AsyncConnection, get_async_db
+from db.database import get_data_version
+
+
+def format_etag(stamp: tuple[int, ...]) -> str:
+    return '"' + "-".join(str(v) for v in stamp) + '"'
+
+
+def etag_matches(if_none_match: str | None, tag: str) -> bool:
+    """Weak comparison, as If-None-Match requires (RFC 9110 §13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (c.strip().removeprefix("W/") for c in if_none_match.split(","))
+    return tag in candidates
+
+
+def etag(*tables: str):
+    """Dependency: ETag/If-None-Match handling for routes that read `tables`."""
+
+    async def check(request: Request, response: Response, db: AsyncConnection = Depends(get_async_db)):
+        tag = format_etag(await db.run(lambda conn: get_data_version(conn, *tables)))
+        if etag_matches(request.headers.get("if-none-match"), tag):
+            raise HTTPException(status_code=304, headers={"ETag": tag})
+        response.headers["ETag"] = tag
+
+    return check
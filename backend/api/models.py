@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 
 
@@ -15,6 +15,12 @@ class AccountResponse(AccountCreate):
     id: int
 
 
+class BalancePoint(BaseModel):
+    date: str
+    balance: float
+    interpolated: bool
+
+
 # --- Credit Cards ---
 
 class CreditCardCreate(BaseModel):
@@ -103,6 +109,186 @@ class SavingsResponse(SavingsCreate):
     id: int
 
 
+# --- Overview ---
+
+class OverviewAccount(BaseModel):
+    account_id: int
+    name: str
+    bank: str
+    type: str
+    balance: Optional[float] = None
+    date: Optional[str] = None
+
+
+class OverviewSavings(BaseModel):
+    id: int
+    name: str
+    account_id: Optional[int] = None
+    current_amount: Optional[float] = None
+
+
+class OverviewBudget(BaseModel):
+    total: float
+    spent: float
+    remaining: float
+
+
+class OverviewResponse(BaseModel):
+    month: str
+    total_balance: float
+    accounts: list[OverviewAccount]
+    savings_total: float
+    savings: list[OverviewSavings]
+    budget: OverviewBudget
+
+
+# --- Budget ---
+
+class BudgetCategory(BaseModel):
+    category_id: int
+    name: str
+    budget: float
+    spent: float
+    remaining: float
+    percent_used: Optional[float] = None
+
+
+class BudgetResponse(BaseModel):
+    month: str
+    budget: float
+    spent: float
+    remaining: float
+    percent_used: Optional[float] = None
+    categories: list[BudgetCategory]
+
+
+# --- Forecast ---
+
+class ForecastItem(BaseModel):
+    id: int
+    name: str
+    amount: float
+    day_of_month: Optional[int] = None
+    overdue: bool
+
+
+class ForecastResponse(BaseModel):
+    month: str
+    account_id: Optional[int] = None
+    as_of: str
+    remaining_days: int
+    current_balance: float
+    expected_income: list[ForecastItem]
+    expected_income_total: float
+    remaining_fixed_expenses: list[ForecastItem]
+    remaining_fixed_total: float
+    variable_by_category: dict[int, float]
+    estimated_variable_total: float
+    forecast_balance: float
+
+
+# --- Wedding ---
+
+class WeddingVendorCreate(BaseModel):
+    name: str
+    category: Optional[str] = None
+    total_cost: Optional[float] = None
+    notes: Optional[str] = None
+
+
+class WeddingVendorResponse(WeddingVendorCreate):
+    id: int
+
+
+class WeddingPaymentCreate(BaseModel):
+    vendor_id: int
+    payment_type: Optional[str] = None  # 'advance' | 'interim' | 'final'
+    amount: float
+    due_date: Optional[str] = None
+    is_paid: bool = False
+    paid_date: Optional[str] = None
+
+
+class WeddingPaymentResponse(WeddingPaymentCreate):
+    id: int
+
+
+class WeddingSettings(BaseModel):
+    wedding_date: Optional[str] = None
+    original_budget: Optional[float] = None
+    total_invited: Optional[int] = None
+    confirmed_count: Optional[int] = None
+    declined_count: Optional[int] = None
+    avg_gift_estimate: Optional[float] = None
+    additional_income: Optional[float] = None
+    additional_expenses: Optional[float] = None
+
+
+class WeddingCategorySummary(BaseModel):
+    category: str
+    vendors: int
+    total_cost: float
+    paid: float
+    remaining: float
+
+
+class WeddingSummary(BaseModel):
+    budget: Optional[float] = None
+    total_cost: float
+    paid: float
+    remaining: float
+    budget_remaining: Optional[float] = None
+    categories: list[WeddingCategorySummary]
+
+
+class WeddingTimelinePayment(WeddingPaymentResponse):
+    vendor_name: str
+
+
+class WeddingUpcomingPayment(WeddingTimelinePayment):
+    overdue: bool
+
+
+class WeddingTimelineMonth(BaseModel):
+    month: str
+    total: float
+    paid: float
+    unpaid: float
+    payments: list[WeddingTimelinePayment]
+
+
+class WeddingTimeline(BaseModel):
+    months: list[WeddingTimelineMonth]
+    unscheduled: list[WeddingTimelinePayment]
+    upcoming: list[WeddingUpcomingPayment]
+
+
+class WeddingCalculatorBase(BaseModel):
+    wedding_date: str
+    months_until_wedding: float
+    current_balance: float
+    remaining_vendor_costs: float
+    history_months: int
+
+
+class WeddingProjection(WeddingCalculatorBase):
+    avg_monthly_income: float
+    avg_monthly_expenses: float
+    expected_gifts: float
+    balance_before: float
+    balance_after: float
+    status: str  # 'ok' | 'tight' | 'shortfall'
+
+
+class WeddingSimulation(WeddingCalculatorBase):
+    scenarios: int
+    seed: int
+    balance_before: dict[str, float]  # percentile ('p5' … 'p95') → amount
+    balance_after: dict[str, float]
+    gifts: dict[str, float]
+    probability_negative_after: float
+
+
 # --- Transactions ---
 
 class TransactionCreate(BaseModel):
@@ -139,9 +325,47 @@ class TransactionClassify(BaseModel):
 class TransactionResponse(TransactionCreate):
     id: int
     charged_month: Optional[str] = None
+    merchant_id: Optional[int] = None
     created_at: str
 
 
+# --- Imports ---
+
+class ImportProfileCreate(BaseModel):
+    name: str
+    source_type: str  # 'bank' | 'credit_card'
+    source_id: int
+    date_column: str
+    date_format: str = "%d/%m/%Y"
+    amount_column: str
+    description_column: str
+    identifier_column: Optional[str] = None
+    memo_column: Optional[str] = None
+    currency_column: Optional[str] = None
+    balance_column: Optional[str] = None
+    negate_amounts: bool = False
+    delimiter: str = ","
+    encoding: str = "utf-8-sig"
+    skip_rows: int = Field(0, ge=0)
+    decimal_separator: str = "."  # '.' or ','; the other one separates thousands
+
+
+class ImportProfileResponse(ImportProfileCreate):
+    id: int
+
+
+class ImportResult(BaseModel):
+    file: str
+    rows: int
+    inserted: int
+    updated: int
+    skipped: int
+    error_rows: int
+    errors: list[str]
+    total_ms: float
+    stage_timings_ms: dict[str, float]
+
+
 # --- Sync ---
 
 class SyncRequest(BaseModel):
@@ -154,11 +378,23 @@ class SyncScrapeResult(BaseModel):
     error: Optional[str] = None
 
 
+class SyncFileTimings(BaseModel):
+    file: str
+    rows: int
+    total_ms: float
+    stage_timings_ms: dict[str, float]
+
+
 class SyncIngestionResult(BaseModel):
     inserted: int
     updated: int
     skipped: int
     errors: list[str]
+    classify_cache_hits: int = 0
+    classify_cache_misses: int = 0
+    rows: int = 0
+    stage_timings_ms: dict[str, float] = {}
+    files: list[SyncFileTimings] = []
 
 
 class SyncResponse(BaseModel):
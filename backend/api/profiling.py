@@ -0,0 +1,160 @@
+"""Request timing middleware and rolling per-route histograms.
+
+Installed by api/app.py only when CASHBOARD_PROFILING=1. Each request gets
+a RequestProfile (db/profiling.py). The response carries a Server-Timing
+header with wall time and SQL time, and the numbers are added to the
+per-route histograms served by GET /api/_debug/metrics.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+import metrics
+from db.profiling import end_profile, start_profile
+
+# Histogram bucket upper bounds, in milliseconds
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float("inf"))
+
+
+class RollingHistogram:
+    """Latency distribution over the last `window` observations."""
+
+    def __init__(self, window: int = 1024):
+        self._values: deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def observe(self, value_ms: float) -> None:
+        self._values.append(value_ms)
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        values = sorted(self._values)
+        buckets = [0] * len(BUCKETS_MS)
+        for v in values:
+            buckets[bisect_left(BUCKETS_MS, v)] += 1
+        return {
+            "count": self.count,
+            "window": len(values),
+            "p50": _percentile(values, 50),
+            "p95": _percentile(values, 95),
+            "p99": _percentile(values, 99),
+            "max": values[-1] if values else 0.0,
+            "buckets": {("+Inf" if b == float("inf") else str(b)): n for b, n in zip(BUCKETS_MS, buckets)},
+        }
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 3)
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.wall_ms = RollingHistogram()
+        self.sql_ms = RollingHistogram()
+        self.statements = RollingHistogram()
+
+
+class MetricsStore:
+    """Per-route histograms plus the most recent slow statements."""
+
+    def __init__(self, slow_window: int = 50):
+        self._lock = threading.Lock()
+        self._routes: dict[str, RouteMetrics] = {}
+        self._slow: deque[dict] = deque(maxlen=slow_window)
+
+    def record(self, route: str, wall_seconds: float, profile) -> None:
+        with self._lock:
+            route_metrics = self._routes.get(route)
+            if route_metrics is None:
+                route_metrics = self._routes[route] = RouteMetrics()
+            route_metrics.wall_ms.observe(wall_seconds * 1000)
+            route_metrics.sql_ms.observe(profile.sql_seconds * 1000)
+            route_metrics.statements.observe(profile.statements)
+            for stmt in profile.slow:
+                self._slow.append({
+                    "route": route,
+                    "sql": stmt.sql,
+                    "ms": round(stmt.seconds * 1000, 3),
+                    "plan": stmt.plan,
+                })
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "routes": {
+                    route: {
+                        "wall_ms": m.wall_ms.snapshot(),
+                        "sql_ms": m.sql_ms.snapshot(),
+                        "statements": m.statements.snapshot(),
+                    }
+                    for route, m in sorted(self._routes.items())
+                },
+                "slow_statements": list(self._slow),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._slow.clear()
+
+
+metrics_store = MetricsStore()
+
+_request_seconds = metrics.histogram(
+    "cashboard_http_request_seconds", "API request latency (recorded when profiling is on)", ("route",),
+)
+
+
+def _route_label(scope) -> str:
+    # The router stores the matched route in the scope; label by its path
+    # template so /api/transactions/17 and /18 share a histogram
+    route = scope.get("route")
+    path = getattr(route, "path", None) or "unmatched"
+    return f"{scope['method']} {path}"
+
+
+def _server_timing(wall_seconds: float, profile) -> bytes:
+    parts = [
+        f"app;dur={wall_seconds * 1000:.2f}",
+        f'sql;dur={profile.sql_seconds * 1000:.2f};desc="{profile.statements} statements"',
+    ]
+    if profile.slowest is not None:
+        parts.append(f'sql-slowest;dur={profile.slowest.seconds * 1000:.2f}')
+    return ", ".join(parts).encode("latin-1")
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles each HTTP request."""
+
+    def __init__(self, app, store: MetricsStore = metrics_store):
+        self.app = app
+        self.store = store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile, token = start_profile()
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(time.perf_counter() - start, profile)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_profile(token)
+            wall = time.perf_counter() - start
+            route = _route_label(scope)
+            self.store.record(route, wall, profile)
+            _request_seconds.labels(route).observe(wall)
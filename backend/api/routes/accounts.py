@@ -1,33 +1,62 @@
 import sqlite3
+from datetime import date, timedelta
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
-from api.models import AccountCreate, AccountResponse
-from db.database import get_db
+from api.etag import etag
+from api.models import AccountCreate, AccountResponse, BalancePoint
+from db.aio import AsyncConnection, get_async_db
+from db.database import bump_data_version, get_db
+from services.balances import daily_balance_series
 
 router = APIRouter(prefix="/api/accounts", tags=["accounts"])
 
+ETAG = [Depends(etag("accounts"))]
 
-@router.get("", response_model=list[AccountResponse])
-def list_accounts(db: sqlite3.Connection = Depends(get_db)):
-    rows = db.execute("SELECT * FROM accounts").fetchall()
+MAX_SERIES_DAYS = 3660
+
+
+@router.get("", response_model=list[AccountResponse], dependencies=ETAG)
+async def list_accounts(db: AsyncConnection = Depends(get_async_db)):
+    rows = await db.fetchall("SELECT * FROM accounts")
     return [dict(r) for r in rows]
 
 
-@router.get("/{account_id}", response_model=AccountResponse)
-def get_account(account_id: int, db: sqlite3.Connection = Depends(get_db)):
-    row = db.execute("SELECT * FROM accounts WHERE id = ?", (account_id,)).fetchone()
+@router.get("/{account_id}", response_model=AccountResponse, dependencies=ETAG)
+async def get_account(account_id: int, db: AsyncConnection = Depends(get_async_db)):
+    row = await db.fetchone("SELECT * FROM accounts WHERE id = ?", (account_id,))
     if not row:
         raise HTTPException(status_code=404, detail="Account not found")
     return dict(row)
 
 
+@router.get("/{account_id}/balances", response_model=list[BalancePoint])
+async def get_balance_series(
+    account_id: int,
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    db: AsyncConnection = Depends(get_async_db),
+):
+    """Daily end-of-day balances, reconstructed between snapshots. Defaults to the last 30 days."""
+    end = end or date.today()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= MAX_SERIES_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_SERIES_DAYS} days")
+    if not await db.fetchone("SELECT id FROM accounts WHERE id = ?", (account_id,)):
+        raise HTTPException(status_code=404, detail="Account not found")
+    return await db.run(lambda conn: daily_balance_series(conn, account_id, start.isoformat(), end.isoformat()))
+
+
 @router.post("", response_model=AccountResponse, status_code=201)
 def create_account(body: AccountCreate, db: sqlite3.Connection = Depends(get_db)):
     cur = db.execute(
         "INSERT INTO accounts (name, bank, type, scraper_type) VALUES (?, ?, ?, ?)",
         (body.name, body.bank, body.type, body.scraper_type),
     )
+    bump_data_version(db, "accounts")
     db.commit()
     return {**body.model_dump(), "id": cur.lastrowid}
 
@@ -41,6 +70,7 @@ def update_account(account_id: int, body: AccountCreate, db: sqlite3.Connection
         "UPDATE accounts SET name = ?, bank = ?, type = ?, scraper_type = ? WHERE id = ?",
         (body.name, body.bank, body.type, body.scraper_type, account_id),
     )
+    bump_data_version(db, "accounts")
     db.commit()
     return {**body.model_dump(), "id": account_id}
 
@@ -60,13 +90,15 @@ def delete_account(account_id: int, db: sqlite3.Connection = Depends(get_db)):
                 detail=f"Cannot delete account: referenced by {table}",
             )
 
-    # transactions use source_type/source_id
-    count = db.execute(
-        "SELECT COUNT(*) FROM transactions WHERE source_type = 'bank' AND source_id = ?",
-        (account_id,),
-    ).fetchone()[0]
-    if count > 0:
-        raise HTTPException(status_code=409, detail="Cannot delete account: referenced by transactions")
+    # transactions and import_profiles use source_type/source_id
+    for table in ("transactions", "import_profiles"):
+        count = db.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE source_type = 'bank' AND source_id = ?",
+            (account_id,),
+        ).fetchone()[0]
+        if count > 0:
+            raise HTTPException(status_code=409, detail=f"Cannot delete account: referenced by {table}")
 
     db.execute("DELETE FROM accounts WHERE id = ?", (account_id,))
+    bump_data_version(db, "accounts")
     db.commit()
@@ -0,0 +1,20 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from api.models import BudgetResponse
+from api.routes.forecast import MONTH_RE
+from db.aio import AsyncConnection, get_async_db
+from services.budget import month_budget
+
+router = APIRouter(prefix="/api/budget", tags=["budget"])
+
+
+@router.get("", response_model=BudgetResponse)
+async def get_budget(month: Optional[str] = Query(None), db: AsyncConnection = Depends(get_async_db)):
+    """Budget vs. spent per budgeted category and overall; defaults to the current month."""
+    month = month or date.today().strftime("%Y-%m")
+    if not MONTH_RE.fullmatch(month):
+        raise HTTPException(status_code=400, detail="month must be YYYY-MM")
+    return await db.run(lambda conn: month_budget(conn, month))
@@ -2,21 +2,25 @@ import sqlite3
 
 from fastapi import APIRouter, Depends, HTTPException
 
+from api.etag import etag
 from api.models import CategoryCreate, CategoryResponse
-from db.database import get_db
+from db.aio import AsyncConnection, get_async_db
+from db.database import bump_data_version, get_db
 
 router = APIRouter(prefix="/api/categories", tags=["categories"])
 
+ETAG = [Depends(etag("categories"))]
 
-@router.get("", response_model=list[CategoryResponse])
-def list_categories(db: sqlite3.Connection = Depends(get_db)):
-    rows = db.execute("SELECT * FROM categories").fetchall()
+
+@router.get("", response_model=list[CategoryResponse], dependencies=ETAG)
+async def list_categories(db: AsyncConnection = Depends(get_async_db)):
+    rows = await db.fetchall("SELECT * FROM categories")
     return [dict(r) for r in rows]
 
 
-@router.get("/{category_id}", response_model=CategoryResponse)
-def get_category(category_id: int, db: sqlite3.Connection = Depends(get_db)):
-    row = db.execute("SELECT * FROM categories WHERE id = ?", (category_id,)).fetchone()
+@router.get("/{category_id}", response_model=CategoryResponse, dependencies=ETAG)
+async def get_category(category_id: int, db: AsyncConnection = Depends(get_async_db)):
+    row = await db.fetchone("SELECT * FROM categories WHERE id = ?", (category_id,))
     if not row:
         raise HTTPException(status_code=404, detail="Category not found")
     return dict(row)
@@ -28,6 +32,7 @@ def create_category(body: CategoryCreate, db: sqlite3.Connection = Depends(get_d
         "INSERT INTO categories (name, monthly_budget, icon, color) VALUES (?, ?, ?, ?)",
         (body.name, body.monthly_budget, body.icon, body.color),
     )
+    bump_data_version(db, "categories")
     db.commit()
     return {**body.model_dump(), "id": cur.lastrowid}
 
@@ -41,6 +46,7 @@ def update_category(category_id: int, body: CategoryCreate, db: sqlite3.Connecti
         "UPDATE categories SET name = ?, monthly_budget = ?, icon = ?, color = ? WHERE id = ?",
         (body.name, body.monthly_budget, body.icon, body.color, category_id),
     )
+    bump_data_version(db, "categories")
     db.commit()
     return {**body.model_dump(), "id": category_id}
 
@@ -63,4 +69,5 @@ def delete_category(category_id: int, db: sqlite3.Connection = Depends(get_db)):
             )
 
     db.execute("DELETE FROM categories WHERE id = ?", (category_id,))
+    bump_data_version(db, "categories")
     db.commit()
@@ -2,21 +2,25 @@ import sqlite3
 
 from fastapi import APIRouter, Depends, HTTPException
 
+from api.etag import etag
 from api.models import ClassificationRuleCreate, ClassificationRuleResponse
-from db.database import get_db
+from db.aio import AsyncConnection, get_async_db
+from db.database import bump_data_version, get_db
 
 router = APIRouter(prefix="/api/classification-rules", tags=["classification rules"])
 
+ETAG = [Depends(etag("classification_rules"))]
 
-@router.get("", response_model=list[ClassificationRuleResponse])
-def list_rules(db: sqlite3.Connection = Depends(get_db)):
-    rows = db.execute("SELECT * FROM classification_rules").fetchall()
+
+@router.get("", response_model=list[ClassificationRuleResponse], dependencies=ETAG)
+async def list_rules(db: AsyncConnection = Depends(get_async_db)):
+    rows = await db.fetchall("SELECT * FROM classification_rules")
     return [dict(r) for r in rows]
 
 
-@router.get("/{rule_id}", response_model=ClassificationRuleResponse)
-def get_rule(rule_id: int, db: sqlite3.Connection = Depends(get_db)):
-    row = db.execute("SELECT * FROM classification_rules WHERE id = ?", (rule_id,)).fetchone()
+@router.get("/{rule_id}", response_model=ClassificationRuleResponse, dependencies=ETAG)
+async def get_rule(rule_id: int, db: AsyncConnection = Depends(get_async_db)):
+    row = await db.fetchone("SELECT * FROM classification_rules WHERE id = ?", (rule_id,))
     if not row:
         raise HTTPException(status_code=404, detail="Classification rule not found")
     return dict(row)
@@ -28,6 +32,7 @@ def create_rule(body: ClassificationRuleCreate, db: sqlite3.Connection = Depends
         "INSERT INTO classification_rules (category_id, keyword, match_type) VALUES (?, ?, ?)",
         (body.category_id, body.keyword, body.match_type),
     )
+    bump_data_version(db, "classification_rules")
     db.commit()
     return {**body.model_dump(), "id": cur.lastrowid}
 
@@ -41,6 +46,7 @@ def update_rule(rule_id: int, body: ClassificationRuleCreate, db: sqlite3.Connec
         "UPDATE classification_rules SET category_id = ?, keyword = ?, match_type = ? WHERE id = ?",
         (body.category_id, body.keyword, body.match_type, rule_id),
     )
+    bump_data_version(db, "classification_rules")
     db.commit()
     return {**body.model_dump(), "id": rule_id}
 
@@ -51,4 +57,5 @@ def delete_rule(rule_id: int, db: sqlite3.Connection = Depends(get_db)):
     if not existing:
         raise HTTPException(status_code=404, detail="Classification rule not found")
     db.execute("DELETE FROM classification_rules WHERE id = ?", (rule_id,))
+    bump_data_version(db, "classification_rules")
     db.commit()
@@ -2,23 +2,30 @@ import sqlite3
 
 from fastapi import APIRouter, Depends, HTTPException
 
+from api.etag import etag
 from api.models import CreditCardCreate, CreditCardResponse
-from db.database import get_db
+from db.aio import AsyncConnection, get_async_db
+from db.database import bump_data_version, get_db
+from ingestion.classifier import recompute_charged_month
+from services import budget
+from services.forecast import rebuild_spend
 
 router = APIRouter(prefix="/api/credit-cards", tags=["credit cards"])
 
+ETAG = [Depends(etag("credit_cards"))]
+
 COLS = "id, account_id, name, company, last_4_digits, billing_day, scraper_type"
 
 
-@router.get("", response_model=list[CreditCardResponse])
-def list_credit_cards(db: sqlite3.Connection = Depends(get_db)):
-    rows = db.execute(f"SELECT {COLS} FROM credit_cards").fetchall()
+@router.get("", response_model=list[CreditCardResponse], dependencies=ETAG)
+async def list_credit_cards(db: AsyncConnection = Depends(get_async_db)):
+    rows = await db.fetchall(f"SELECT {COLS} FROM credit_cards")
     return [dict(r) for r in rows]
 
 
-@router.get("/{card_id}", response_model=CreditCardResponse)
-def get_credit_card(card_id: int, db: sqlite3.Connection = Depends(get_db)):
-    row = db.execute(f"SELECT {COLS} FROM credit_cards WHERE id = ?", (card_id,)).fetchone()
+@router.get("/{card_id}", response_model=CreditCardResponse, dependencies=ETAG)
+async def get_credit_card(card_id: int, db: AsyncConnection = Depends(get_async_db)):
+    row = await db.fetchone(f"SELECT {COLS} FROM credit_cards WHERE id = ?", (card_id,))
     if not row:
         raise HTTPException(status_code=404, detail="Credit card not found")
     return dict(row)
@@ -31,13 +38,14 @@ def create_credit_card(body: CreditCardCreate, db: sqlite3.Connection = Depends(
         "VALUES (?, ?, ?, ?, ?, ?)",
         (body.account_id, body.name, body.company, body.last_4_digits, body.billing_day, body.scraper_type),
     )
+    bump_data_version(db, "credit_cards")
     db.commit()
     return {**body.model_dump(), "id": cur.lastrowid}
 
 
 @router.put("/{card_id}", response_model=CreditCardResponse)
 def update_credit_card(card_id: int, body: CreditCardCreate, db: sqlite3.Connection = Depends(get_db)):
-    existing = db.execute("SELECT id FROM credit_cards WHERE id = ?", (card_id,)).fetchone()
+    existing = db.execute("SELECT id, account_id, billing_day FROM credit_cards WHERE id = ?", (card_id,)).fetchone()
     if not existing:
         raise HTTPException(status_code=404, detail="Credit card not found")
     db.execute(
@@ -45,6 +53,15 @@ def update_credit_card(card_id: int, body: CreditCardCreate, db: sqlite3.Connect
         "billing_day = ?, scraper_type = ? WHERE id = ?",
         (body.account_id, body.name, body.company, body.last_4_digits, body.billing_day, body.scraper_type, card_id),
     )
+    if body.billing_day != existing["billing_day"]:
+        recompute_charged_month(db, card_id)
+        # Card transactions may have moved to another budget month
+        budget.rebuild(db)
+        bump_data_version(db, "transactions")
+    if body.account_id != existing["account_id"]:
+        # Card spend counts against the card's account in the forecast profiles
+        rebuild_spend(db)
+    bump_data_version(db, "credit_cards")
     db.commit()
     return {**body.model_dump(), "id": card_id}
 
@@ -55,13 +72,14 @@ def delete_credit_card(card_id: int, db: sqlite3.Connection = Depends(get_db)):
     if not existing:
         raise HTTPException(status_code=404, detail="Credit card not found")
 
-    # transactions use source_type/source_id, not credit_card_id
-    count = db.execute(
-        "SELECT COUNT(*) FROM transactions WHERE source_type = 'credit_card' AND source_id = ?",
-        (card_id,),
-    ).fetchone()[0]
-    if count > 0:
-        raise HTTPException(status_code=409, detail="Cannot delete credit card: referenced by transactions")
+    # transactions and import_profiles use source_type/source_id, not credit_card_id
+    for table in ("transactions", "import_profiles"):
+        count = db.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE source_type = 'credit_card' AND source_id = ?",
+            (card_id,),
+        ).fetchone()[0]
+        if count > 0:
+            raise HTTPException(status_code=409, detail=f"Cannot delete credit card: referenced by {table}")
 
     count = db.execute(
         "SELECT COUNT(*) FROM fixed_expenses WHERE credit_card_id = ?", (card_id,)
@@ -70,4 +88,5 @@ def delete_credit_card(card_id: int, db: sqlite3.Connection = Depends(get_db)):
         raise HTTPException(status_code=409, detail="Cannot delete credit card: referenced by fixed_expenses")
 
     db.execute("DELETE FROM credit_cards WHERE id = ?", (card_id,))
+    bump_data_version(db, "credit_cards")
     db.commit()
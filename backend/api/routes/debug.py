@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+
+from api.profiling import metrics_store
+from services import response_cache
+
+router = APIRouter(prefix="/api/_debug", tags=["debug"])
+
+
+@router.get("/metrics")
+def get_metrics():
+    """Rolling per-route latency/SQL histograms and recent slow statements."""
+    return metrics_store.snapshot()
+
+
+@router.delete("/metrics", status_code=204)
+def reset_metrics():
+    metrics_store.clear()
+
+
+@router.get("/cache")
+def get_cache_stats():
+    """Size and hit rate of the analytics response cache."""
+    return response_cache.stats()
+
+
+@router.delete("/cache", status_code=204)
+def clear_cache():
+    response_cache.clear()
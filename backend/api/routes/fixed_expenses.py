@@ -2,24 +2,29 @@ import sqlite3
 
 from fastapi import APIRouter, Depends, HTTPException
 
+from api.etag import etag
 from api.models import FixedExpenseCreate, FixedExpenseResponse
-from db.database import get_db
+from db.aio import AsyncConnection, get_async_db
+from db.database import bump_data_version, get_db
+from services.forecast import rematch_fixed
 
 router = APIRouter(prefix="/api/fixed-expenses", tags=["fixed expenses"])
 
+ETAG = [Depends(etag("fixed_expenses"))]
+
 COLS = ("id, name, expected_amount, frequency, payment_method, "
         "credit_card_id, account_id, keyword, day_of_month")
 
 
-@router.get("", response_model=list[FixedExpenseResponse])
-def list_fixed_expenses(db: sqlite3.Connection = Depends(get_db)):
-    rows = db.execute(f"SELECT {COLS} FROM fixed_expenses").fetchall()
+@router.get("", response_model=list[FixedExpenseResponse], dependencies=ETAG)
+async def list_fixed_expenses(db: AsyncConnection = Depends(get_async_db)):
+    rows = await db.fetchall(f"SELECT {COLS} FROM fixed_expenses")
     return [dict(r) for r in rows]
 
 
-@router.get("/{expense_id}", response_model=FixedExpenseResponse)
-def get_fixed_expense(expense_id: int, db: sqlite3.Connection = Depends(get_db)):
-    row = db.execute(f"SELECT {COLS} FROM fixed_expenses WHERE id = ?", (expense_id,)).fetchone()
+@router.get("/{expense_id}", response_model=FixedExpenseResponse, dependencies=ETAG)
+async def get_fixed_expense(expense_id: int, db: AsyncConnection = Depends(get_async_db)):
+    row = await db.fetchone(f"SELECT {COLS} FROM fixed_expenses WHERE id = ?", (expense_id,))
     if not row:
         raise HTTPException(status_code=404, detail="Fixed expense not found")
     return dict(row)
@@ -33,6 +38,8 @@ def create_fixed_expense(body: FixedExpenseCreate, db: sqlite3.Connection = Depe
         (body.name, body.expected_amount, body.frequency, body.payment_method,
          body.credit_card_id, body.account_id, body.keyword, body.day_of_month),
     )
+    rematch_fixed(db, "expense")
+    bump_data_version(db, "fixed_expenses")
     db.commit()
     return {**body.model_dump(), "id": cur.lastrowid}
 
@@ -48,6 +55,8 @@ def update_fixed_expense(expense_id: int, body: FixedExpenseCreate, db: sqlite3.
         (body.name, body.expected_amount, body.frequency, body.payment_method,
          body.credit_card_id, body.account_id, body.keyword, body.day_of_month, expense_id),
     )
+    rematch_fixed(db, "expense")
+    bump_data_version(db, "fixed_expenses")
     db.commit()
     return {**body.model_dump(), "id": expense_id}
 
@@ -58,4 +67,6 @@ def delete_fixed_expense(expense_id: int, db: sqlite3.Connection = Depends(get_d
     if not existing:
         raise HTTPException(status_code=404, detail="Fixed expense not found")
     db.execute("DELETE FROM fixed_expenses WHERE id = ?", (expense_id,))
+    rematch_fixed(db, "expense")
+    bump_data_version(db, "fixed_expenses")
     db.commit()
@@ -2,21 +2,26 @@ import sqlite3
 
 from fastapi import APIRouter, Depends, HTTPException
 
+from api.etag import etag
 from api.models import FixedIncomeCreate, FixedIncomeResponse
-from db.database import get_db
+from db.aio import AsyncConnection, get_async_db
+from db.database import bump_data_version, get_db
+from services.forecast import rematch_fixed
 
 router = APIRouter(prefix="/api/fixed-incomes", tags=["fixed incomes"])
 
+ETAG = [Depends(etag("fixed_incomes"))]
 
-@router.get("", response_model=list[FixedIncomeResponse])
-def list_fixed_incomes(db: sqlite3.Connection = Depends(get_db)):
-    rows = db.execute("SELECT * FROM fixed_incomes").fetchall()
+
+@router.get("", response_model=list[FixedIncomeResponse], dependencies=ETAG)
+async def list_fixed_incomes(db: AsyncConnection = Depends(get_async_db)):
+    rows = await db.fetchall("SELECT * FROM fixed_incomes")
     return [dict(r) for r in rows]
 
 
-@router.get("/{income_id}", response_model=FixedIncomeResponse)
-def get_fixed_income(income_id: int, db: sqlite3.Connection = Depends(get_db)):
-    row = db.execute("SELECT * FROM fixed_incomes WHERE id = ?", (income_id,)).fetchone()
+@router.get("/{income_id}", response_model=FixedIncomeResponse, dependencies=ETAG)
+async def get_fixed_income(income_id: int, db: AsyncConnection = Depends(get_async_db)):
+    row = await db.fetchone("SELECT * FROM fixed_incomes WHERE id = ?", (income_id,))
     if not row:
         raise HTTPException(status_code=404, detail="Fixed income not found")
     return dict(row)
@@ -29,6 +34,8 @@ def create_fixed_income(body: FixedIncomeCreate, db: sqlite3.Connection = Depend
         "VALUES (?, ?, ?, ?, ?, ?)",
         (body.name, body.expected_amount, body.frequency, body.account_id, body.day_of_month, body.keyword),
     )
+    rematch_fixed(db, "income")
+    bump_data_version(db, "fixed_incomes")
     db.commit()
     return {**body.model_dump(), "id": cur.lastrowid}
 
@@ -43,6 +50,8 @@ def update_fixed_income(income_id: int, body: FixedIncomeCreate, db: sqlite3.Con
         "account_id = ?, day_of_month = ?, keyword = ? WHERE id = ?",
         (body.name, body.expected_amount, body.frequency, body.account_id, body.day_of_month, body.keyword, income_id),
     )
+    rematch_fixed(db, "income")
+    bump_data_version(db, "fixed_incomes")
     db.commit()
     return {**body.model_dump(), "id": income_id}
 
@@ -53,4 +62,6 @@ def delete_fixed_income(income_id: int, db: sqlite3.Connection = Depends(get_db)
     if not existing:
         raise HTTPException(status_code=404, detail="Fixed income not found")
     db.execute("DELETE FROM fixed_incomes WHERE id = ?", (income_id,))
+    rematch_fixed(db, "income")
+    bump_data_version(db, "fixed_incomes")
     db.commit()
@@ -0,0 +1,26 @@
+import re
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from api.models import ForecastResponse
+from db.aio import AsyncConnection, get_async_db
+from services.forecast import forecast_month
+
+router = APIRouter(prefix="/api/forecast", tags=["forecast"])
+
+MONTH_RE = re.compile(r"\d{4}-(0[1-9]|1[0-2])")
+
+
+@router.get("", response_model=ForecastResponse)
+async def get_forecast(
+    month: Optional[str] = Query(None),
+    account_id: Optional[int] = Query(None),
+    db: AsyncConnection = Depends(get_async_db),
+):
+    """End-of-month balance forecast; defaults to the current month and all accounts."""
+    month = month or date.today().strftime("%Y-%m")
+    if not MONTH_RE.fullmatch(month):
+        raise HTTPException(status_code=400, detail="month must be YYYY-MM")
+    return await db.run(lambda conn: forecast_month(conn, month, account_id))
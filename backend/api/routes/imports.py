@@ -0,0 +1,139 @@
+import codecs
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+
+from api.etag import etag
+from api.models import ImportProfileCreate, ImportProfileResponse, ImportResult
+from db.aio import AsyncConnection, get_async_db
+from db.database import bump_data_version, get_db
+from ingestion.csv_importer import DECIMAL_SEPARATORS, StatementError, get_profile, import_statement
+
+router = APIRouter(prefix="/api/imports", tags=["imports"])
+
+ETAG = [Depends(etag("import_profiles"))]
+
+PROFILE_FIELDS = ("name", "source_type", "source_id", "date_column", "date_format", "amount_column",
+                  "description_column", "identifier_column", "memo_column", "currency_column",
+                  "balance_column", "negate_amounts", "delimiter", "encoding", "skip_rows",
+                  "decimal_separator")
+COLS = "id, " + ", ".join(PROFILE_FIELDS)
+
+# Uploads are buffered in memory up to this size, then on disk
+UPLOAD_SPOOL_BYTES = 1024 * 1024
+
+
+# --- Profiles ---
+
+@router.get("/profiles", response_model=list[ImportProfileResponse], dependencies=ETAG)
+async def list_profiles(db: AsyncConnection = Depends(get_async_db)):
+    rows = await db.fetchall(f"SELECT {COLS} FROM import_profiles ORDER BY id")
+    return [dict(r) for r in rows]
+
+
+@router.get("/profiles/{profile_id}", response_model=ImportProfileResponse, dependencies=ETAG)
+async def get_import_profile(profile_id: int, db: AsyncConnection = Depends(get_async_db)):
+    row = await db.fetchone(f"SELECT {COLS} FROM import_profiles WHERE id = ?", (profile_id,))
+    if not row:
+        raise HTTPException(status_code=404, detail="Import profile not found")
+    return dict(row)
+
+
+@router.post("/profiles", response_model=ImportProfileResponse, status_code=201)
+def create_profile(body: ImportProfileCreate, db: sqlite3.Connection = Depends(get_db)):
+    _validate_profile(db, body)
+    values = body.model_dump()
+    cur = db.execute(
+        f"INSERT INTO import_profiles ({', '.join(PROFILE_FIELDS)}) "
+        f"VALUES ({', '.join('?' for _ in PROFILE_FIELDS)})",
+        [values[f] for f in PROFILE_FIELDS],
+    )
+    bump_data_version(db, "import_profiles")
+    db.commit()
+    return {**values, "id": cur.lastrowid}
+
+
+@router.put("/profiles/{profile_id}", response_model=ImportProfileResponse)
+def update_profile(profile_id: int, body: ImportProfileCreate, db: sqlite3.Connection = Depends(get_db)):
+    existing = db.execute("SELECT id FROM import_profiles WHERE id = ?", (profile_id,)).fetchone()
+    if not existing:
+        raise HTTPException(status_code=404, detail="Import profile not found")
+    _validate_profile(db, body, profile_id)
+    values = body.model_dump()
+    db.execute(
+        f"UPDATE import_profiles SET {', '.join(f'{f} = ?' for f in PROFILE_FIELDS)} WHERE id = ?",
+        [values[f] for f in PROFILE_FIELDS] + [profile_id],
+    )
+    bump_data_version(db, "import_profiles")
+    db.commit()
+    return {**values, "id": profile_id}
+
+
+@router.delete("/profiles/{profile_id}", status_code=204)
+def delete_profile(profile_id: int, db: sqlite3.Connection = Depends(get_db)):
+    existing = db.execute("SELECT id FROM import_profiles WHERE id = ?", (profile_id,)).fetchone()
+    if not existing:
+        raise HTTPException(status_code=404, detail="Import profile not found")
+    db.execute("DELETE FROM import_profiles WHERE id = ?", (profile_id,))
+    bump_data_version(db, "import_profiles")
+    db.commit()
+
+
+def _validate_profile(db: sqlite3.Connection, body: ImportProfileCreate, profile_id: int | None = None) -> None:
+    if body.source_type == "bank":
+        table = "accounts"
+    elif body.source_type == "credit_card":
+        table = "credit_cards"
+    else:
+        raise HTTPException(status_code=400, detail="source_type must be 'bank' or 'credit_card'")
+    if not db.execute(f"SELECT id FROM {table} WHERE id = ?", (body.source_id,)).fetchone():
+        raise HTTPException(status_code=400, detail="Source not found")
+    if len(body.delimiter) != 1:
+        raise HTTPException(status_code=400, detail="delimiter must be a single character")
+    try:
+        codecs.lookup(body.encoding)
+    except LookupError:
+        raise HTTPException(status_code=400, detail=f"Unknown encoding: {body.encoding}")
+    if body.decimal_separator not in DECIMAL_SEPARATORS:
+        raise HTTPException(status_code=400, detail="decimal_separator must be '.' or ','")
+    clash = db.execute(
+        "SELECT id FROM import_profiles WHERE name = ? AND id IS NOT ?", (body.name, profile_id),
+    ).fetchone()
+    if clash:
+        raise HTTPException(status_code=409, detail="An import profile with this name already exists")
+
+
+# --- Statement upload ---
+
+@router.post("/profiles/{profile_id}/statement", response_model=ImportResult)
+async def upload_statement(
+    profile_id: int,
+    request: Request,
+    filename: Optional[str] = Query(None),
+    format: Optional[str] = Query(None, description="'csv' or 'xlsx'; defaults to the filename's extension"),
+    db: sqlite3.Connection = Depends(get_db),
+):
+    """Import a statement sent as the raw request body.
+
+    The body is spooled to a temporary file as it arrives and parsed from
+    there in chunks, so neither step holds the whole statement in memory.
+    """
+    profile = await run_in_threadpool(get_profile, db, profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Import profile not found")
+    fmt = (format or (Path(filename).suffix.lstrip(".") if filename else "") or "csv").lower()
+
+    with tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES) as spool:
+        async for chunk in request.stream():
+            # Past UPLOAD_SPOOL_BYTES this writes to disk; keep it off the event loop
+            await run_in_threadpool(spool.write, chunk)
+        spool.seek(0)
+        try:
+            result = await run_in_threadpool(import_statement, db, profile, spool, fmt, filename or "upload")
+        except StatementError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return {**result, "stage_timings_ms": result["timings_ms"]}
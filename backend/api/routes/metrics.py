@@ -0,0 +1,73 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+import metrics
+from db.database import get_connection, tenancy_enabled, tenant_registry
+
+router = APIRouter(tags=["metrics"])
+
+_db_size = metrics.gauge("cashboard_db_size_bytes", "Size of the SQLite database")
+_transactions = metrics.gauge("cashboard_transactions", "Transactions stored, by classification", ("state",))
+_tenant_db_size = metrics.gauge(
+    "cashboard_tenant_db_size_bytes", "Size of each open tenant's SQLite database", ("tenant",),
+)
+_tenant_transactions = metrics.gauge(
+    "cashboard_tenant_transactions", "Transactions stored per open tenant, by classification", ("tenant", "state"),
+)
+
+
+def _db_stats(conn) -> tuple[int, int, int]:
+    """(size in bytes, transactions, uncategorized transactions)"""
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    total, uncategorized = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(category_id = 1), 0) FROM transactions"
+    ).fetchone()
+    return page_count * page_size, total, uncategorized
+
+
+def _collect_db_stats() -> None:
+    if tenancy_enabled():
+        _collect_tenant_stats()
+        return
+    conn = get_connection()
+    try:
+        size, total, uncategorized = _db_stats(conn)
+    finally:
+        conn.close()
+    _db_size.set(size)
+    _transactions.labels("categorized").set(total - uncategorized)
+    _transactions.labels("uncategorized").set(uncategorized)
+
+
+def _collect_tenant_stats() -> None:
+    # /metrics belongs to no tenant: report every tenant with an open pool.
+    # Evicted tenants drop out rather than keep their last values.
+    stats = []
+    for tenant, pool in tenant_registry().ready_pools():
+        conn = pool.acquire()
+        try:
+            stats.append((tenant, *_db_stats(conn)))
+        finally:
+            pool.release(conn)
+    _tenant_db_size.clear()
+    _tenant_transactions.clear()
+    for tenant, size, total, uncategorized in stats:
+        _tenant_db_size.labels(tenant).set(size)
+        _tenant_transactions.labels(tenant, "categorized").set(total - uncategorized)
+        _tenant_transactions.labels(tenant, "uncategorized").set(uncategorized)
+
+
+metrics.REGISTRY.add_collector(_collect_db_stats)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text exposition of sync, ingestion, classification and DB metrics.
+
+    cashboard_db_query_seconds times every query of the async read routes.
+    The per-statement and request latency histograms are only populated
+    when CASHBOARD_PROFILING=1. In multi-tenant mode the DB gauges are the
+    cashboard_tenant_* ones, one series per open tenant.
+    """
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
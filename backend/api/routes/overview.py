@@ -0,0 +1,15 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends
+
+from api.models import OverviewResponse
+from db.aio import AsyncConnection, get_async_db
+from services.overview import get_overview
+
+router = APIRouter(prefix="/api/overview", tags=["overview"])
+
+
+@router.get("", response_model=OverviewResponse)
+async def overview(db: AsyncConnection = Depends(get_async_db)):
+    month = date.today().strftime("%Y-%m")
+    return await db.run(lambda conn: get_overview(conn, month))
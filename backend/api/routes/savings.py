@@ -2,23 +2,27 @@ import sqlite3
 
 from fastapi import APIRouter, Depends, HTTPException
 
+from api.etag import etag
 from api.models import SavingsCreate, SavingsResponse
-from db.database import get_db
+from db.aio import AsyncConnection, get_async_db
+from db.database import bump_data_version, get_db
 
 router = APIRouter(prefix="/api/savings", tags=["savings"])
 
+ETAG = [Depends(etag("savings"))]
+
 COLS = "id, name, account_id, initial_amount, current_amount, start_date, end_date, interest_rate"
 
 
-@router.get("", response_model=list[SavingsResponse])
-def list_savings(db: sqlite3.Connection = Depends(get_db)):
-    rows = db.execute(f"SELECT {COLS} FROM savings").fetchall()
+@router.get("", response_model=list[SavingsResponse], dependencies=ETAG)
+async def list_savings(db: AsyncConnection = Depends(get_async_db)):
+    rows = await db.fetchall(f"SELECT {COLS} FROM savings")
     return [dict(r) for r in rows]
 
 
-@router.get("/{savings_id}", response_model=SavingsResponse)
-def get_savings(savings_id: int, db: sqlite3.Connection = Depends(get_db)):
-    row = db.execute(f"SELECT {COLS} FROM savings WHERE id = ?", (savings_id,)).fetchone()
+@router.get("/{savings_id}", response_model=SavingsResponse, dependencies=ETAG)
+async def get_savings(savings_id: int, db: AsyncConnection = Depends(get_async_db)):
+    row = await db.fetchone(f"SELECT {COLS} FROM savings WHERE id = ?", (savings_id,))
     if not row:
         raise HTTPException(status_code=404, detail="Savings not found")
     return dict(row)
@@ -32,6 +36,7 @@ def create_savings(body: SavingsCreate, db: sqlite3.Connection = Depends(get_db)
         (body.name, body.account_id, body.initial_amount, body.current_amount,
          body.start_date, body.end_date, body.interest_rate),
     )
+    bump_data_version(db, "savings")
     db.commit()
     return {**body.model_dump(), "id": cur.lastrowid}
 
@@ -47,6 +52,7 @@ def update_savings(savings_id: int, body: SavingsCreate, db: sqlite3.Connection
         (body.name, body.account_id, body.initial_amount, body.current_amount,
          body.start_date, body.end_date, body.interest_rate, savings_id),
     )
+    bump_data_version(db, "savings")
     db.commit()
     return {**body.model_dump(), "id": savings_id}
 
@@ -57,4 +63,5 @@ def delete_savings(savings_id: int, db: sqlite3.Connection = Depends(get_db)):
     if not existing:
         raise HTTPException(status_code=404, detail="Savings not found")
     db.execute("DELETE FROM savings WHERE id = ?", (savings_id,))
+    bump_data_version(db, "savings")
     db.commit()
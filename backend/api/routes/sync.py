@@ -1,19 +1,44 @@
 import subprocess
+import time
 from pathlib import Path
 
 from fastapi import APIRouter, HTTPException
 
-from api.models import SyncRequest, SyncResponse, SyncScrapeResult, SyncIngestionResult
-from ingestion.ingest import ingest_all
+from api.models import SyncFileTimings, SyncRequest, SyncResponse, SyncScrapeResult, SyncIngestionResult
+import metrics
+from db.database import tenancy_enabled
+from ingestion.ingest import ingest_all, sum_stage_timings
 
 router = APIRouter(prefix="/api/sync", tags=["sync"])
 
 VALID_BANKS = ["leumi", "isracard", "max"]
 DATA_FETCHER_DIR = Path(__file__).resolve().parent.parent.parent.parent / "data-fetcher"
 
+_scrape_seconds = metrics.histogram("cashboard_scrape_duration_seconds", "Scraper run time", ("bank",))
+_scrapes_total = metrics.counter("cashboard_scrapes", "Scraper runs, by bank and status", ("bank", "status"))
+_last_scrape_success = metrics.gauge(
+    "cashboard_last_scrape_success", "1 if the bank's last scrape succeeded, else 0", ("bank",),
+)
+_last_scrape_time = metrics.gauge(
+    "cashboard_last_scrape_timestamp_seconds", "Unix time the bank's last scrape finished", ("bank",),
+)
+
+
+def _record_scrape(bank: str, success: bool, started: float) -> None:
+    _scrape_seconds.labels(bank).observe(time.perf_counter() - started)
+    _scrapes_total.labels(bank, "success" if success else "failed").inc()
+    _last_scrape_success.labels(bank).set(1 if success else 0)
+    _last_scrape_time.labels(bank).set(time.time())
+
 
 @router.post("", response_model=SyncResponse)
 def sync(request: SyncRequest = None):
+    # The scrapers share one config and output directory, and ingestion
+    # matches sources by scraper_type, so their data can't be attributed
+    # to a tenant
+    if tenancy_enabled():
+        raise HTTPException(status_code=409, detail="Sync is not available in multi-tenant mode")
+
     banks = request.banks if request and request.banks else VALID_BANKS
 
     unknown = [b for b in banks if b not in VALID_BANKS]
@@ -23,6 +48,7 @@ def sync(request: SyncRequest = None):
     # Run scrapers
     scrape_results: list[SyncScrapeResult] = []
     for bank in banks:
+        started = time.perf_counter()
         try:
             result = subprocess.run(
                 ["npm", "run", f"scrape:{bank}"],
@@ -41,6 +67,7 @@ def sync(request: SyncRequest = None):
             scrape_results.append(SyncScrapeResult(bank=bank, success=False, error="Scraper timed out (120s)"))
         except Exception as e:
             scrape_results.append(SyncScrapeResult(bank=bank, success=False, error=str(e)))
+        _record_scrape(bank, scrape_results[-1].success, started)
 
     # Ingest new files
     ingestion_results = ingest_all()
@@ -48,6 +75,8 @@ def sync(request: SyncRequest = None):
     inserted = sum(r["inserted"] for r in ingestion_results)
     updated = sum(r["updated"] for r in ingestion_results)
     skipped = sum(r["skipped"] for r in ingestion_results)
+    cache_hits = sum(r.get("classify_cache_hits", 0) for r in ingestion_results)
+    cache_misses = sum(r.get("classify_cache_misses", 0) for r in ingestion_results)
     errors = []
     for r in ingestion_results:
         errors.extend(r["errors"])
@@ -59,5 +88,16 @@ def sync(request: SyncRequest = None):
             updated=updated,
             skipped=skipped,
             errors=errors,
+            classify_cache_hits=cache_hits,
+            classify_cache_misses=cache_misses,
+            rows=sum(r.get("rows", 0) for r in ingestion_results),
+            stage_timings_ms=sum_stage_timings(ingestion_results),
+            files=[
+                SyncFileTimings(
+                    file=r["file"], rows=r.get("rows", 0), total_ms=r.get("total_ms", 0.0),
+                    stage_timings_ms=r.get("timings_ms", {}),
+                )
+                for r in ingestion_results
+            ],
         ),
     )
@@ -3,20 +3,26 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
+from api.etag import etag
 from api.models import TransactionClassify, TransactionResponse, TransactionUpdate
-from db.database import get_db
+from db.aio import AsyncConnection, get_async_db
+from db.database import bump_data_version, get_db
+from services import budget
+from services.forecast import add_fixed_match, add_spend, remove_fixed_match, remove_spend
 
 router = APIRouter(prefix="/api/transactions", tags=["transactions"])
 
+ETAG = [Depends(etag("transactions"))]
 
-@router.get("", response_model=list[TransactionResponse])
-def list_transactions(
+
+@router.get("", response_model=list[TransactionResponse], dependencies=ETAG)
+async def list_transactions(
     from_date: Optional[str] = Query(None),
     to_date: Optional[str] = Query(None),
     category: Optional[int] = Query(None),
     account: Optional[int] = Query(None),
     source_type: Optional[str] = Query(None),
-    db: sqlite3.Connection = Depends(get_db),
+    db: AsyncConnection = Depends(get_async_db),
 ):
     clauses = []
     params = []
@@ -37,15 +43,15 @@ def list_transactions(
         params.append(source_type)
 
     where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
-    rows = db.execute(f"SELECT * FROM transactions{where} ORDER BY date DESC", params).fetchall()
+    rows = await db.fetchall(f"SELECT * FROM transactions{where} ORDER BY date DESC", params)
     return [dict(r) for r in rows]
 
 
-@router.get("/uncategorized", response_model=list[TransactionResponse])
-def list_uncategorized(db: sqlite3.Connection = Depends(get_db)):
-    rows = db.execute(
+@router.get("/uncategorized", response_model=list[TransactionResponse], dependencies=ETAG)
+async def list_uncategorized(db: AsyncConnection = Depends(get_async_db)):
+    rows = await db.fetchall(
         "SELECT * FROM transactions WHERE category_id = 1 ORDER BY date DESC"
-    ).fetchall()
+    )
     return [dict(r) for r in rows]
 
 
@@ -75,9 +81,17 @@ def update_transaction(
 
     if updates:
         params.append(transaction_id)
+        remove_spend(db, existing)
+        remove_fixed_match(db, existing)
+        budget.remove_transaction(db, existing)
         db.execute(
             f"UPDATE transactions SET {', '.join(updates)} WHERE id = ?", params
         )
+        updated = db.execute("SELECT * FROM transactions WHERE id = ?", (transaction_id,)).fetchone()
+        add_spend(db, updated)
+        add_fixed_match(db, updated)
+        budget.add_transaction(db, updated)
+        bump_data_version(db, "transactions")
         db.commit()
 
     row = db.execute(
@@ -104,10 +118,18 @@ def classify_transaction(
     if not cat:
         raise HTTPException(status_code=400, detail="Category not found")
 
+    remove_spend(db, existing)
+    remove_fixed_match(db, existing)
+    budget.remove_transaction(db, existing)
     db.execute(
         "UPDATE transactions SET category_id = ?, transaction_type = ? WHERE id = ?",
         (body.category_id, body.transaction_type, transaction_id),
     )
+    classified = {**dict(existing), "category_id": body.category_id, "transaction_type": body.transaction_type}
+    add_spend(db, classified)
+    add_fixed_match(db, classified)
+    budget.add_transaction(db, classified)
+    bump_data_version(db, "transactions")
 
     if body.create_rule:
         keyword = body.keyword or existing["description"]
@@ -115,6 +137,14 @@ def classify_transaction(
             "INSERT INTO classification_rules (category_id, keyword, match_type) VALUES (?, ?, ?)",
             (body.category_id, keyword, body.match_type),
         )
+        bump_data_version(db, "classification_rules")
+        # Pin the merchant too, so other branches/variants of it follow
+        if existing["merchant_id"] is not None:
+            db.execute(
+                "UPDATE merchants SET category_id = ? WHERE id = ?",
+                (body.category_id, existing["merchant_id"]),
+            )
+            bump_data_version(db, "merchants")
 
     db.commit()
 
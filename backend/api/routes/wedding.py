@@ -0,0 +1,238 @@
+import sqlite3
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from api.etag import etag
+from api.models import (
+    WeddingPaymentCreate,
+    WeddingPaymentResponse,
+    WeddingProjection,
+    WeddingSettings,
+    WeddingSimulation,
+    WeddingSummary,
+    WeddingTimeline,
+    WeddingUpcomingPayment,
+    WeddingVendorCreate,
+    WeddingVendorResponse,
+)
+from db.aio import AsyncConnection, get_async_db
+from db.database import bump_data_version, get_db
+from services.wedding import UPCOMING_DAYS, summary, timeline
+from services.wedding_calculator import WeddingNotConfigured, is_iso_date, project, simulate
+
+router = APIRouter(prefix="/api/wedding", tags=["wedding"])
+
+VENDOR_COLS = "id, name, category, total_cost, notes"
+PAYMENT_COLS = "id, vendor_id, payment_type, amount, due_date, is_paid, paid_date"
+SETTINGS_COLS = ("wedding_date", "original_budget", "total_invited", "confirmed_count", "declined_count",
+                 "avg_gift_estimate", "additional_income", "additional_expenses")
+
+
+# --- Vendors ---
+
+@router.get("/vendors", response_model=list[WeddingVendorResponse],
+            dependencies=[Depends(etag("wedding_vendors"))])
+async def list_vendors(db: AsyncConnection = Depends(get_async_db)):
+    rows = await db.fetchall(f"SELECT {VENDOR_COLS} FROM wedding_vendors")
+    return [dict(r) for r in rows]
+
+
+@router.get("/vendors/{vendor_id}", response_model=WeddingVendorResponse,
+            dependencies=[Depends(etag("wedding_vendors"))])
+async def get_vendor(vendor_id: int, db: AsyncConnection = Depends(get_async_db)):
+    row = await db.fetchone(f"SELECT {VENDOR_COLS} FROM wedding_vendors WHERE id = ?", (vendor_id,))
+    if not row:
+        raise HTTPException(status_code=404, detail="Vendor not found")
+    return dict(row)
+
+
+@router.post("/vendors", response_model=WeddingVendorResponse, status_code=201)
+def create_vendor(body: WeddingVendorCreate, db: sqlite3.Connection = Depends(get_db)):
+    cur = db.execute(
+        "INSERT INTO wedding_vendors (name, category, total_cost, notes) VALUES (?, ?, ?, ?)",
+        (body.name, body.category, body.total_cost, body.notes),
+    )
+    bump_data_version(db, "wedding_vendors")
+    db.commit()
+    return {**body.model_dump(), "id": cur.lastrowid}
+
+
+@router.put("/vendors/{vendor_id}", response_model=WeddingVendorResponse)
+def update_vendor(vendor_id: int, body: WeddingVendorCreate, db: sqlite3.Connection = Depends(get_db)):
+    existing = db.execute("SELECT id FROM wedding_vendors WHERE id = ?", (vendor_id,)).fetchone()
+    if not existing:
+        raise HTTPException(status_code=404, detail="Vendor not found")
+    db.execute(
+        "UPDATE wedding_vendors SET name = ?, category = ?, total_cost = ?, notes = ? WHERE id = ?",
+        (body.name, body.category, body.total_cost, body.notes, vendor_id),
+    )
+    bump_data_version(db, "wedding_vendors")
+    db.commit()
+    return {**body.model_dump(), "id": vendor_id}
+
+
+@router.delete("/vendors/{vendor_id}", status_code=204)
+def delete_vendor(vendor_id: int, db: sqlite3.Connection = Depends(get_db)):
+    existing = db.execute("SELECT id FROM wedding_vendors WHERE id = ?", (vendor_id,)).fetchone()
+    if not existing:
+        raise HTTPException(status_code=404, detail="Vendor not found")
+    count = db.execute("SELECT COUNT(*) FROM wedding_payments WHERE vendor_id = ?", (vendor_id,)).fetchone()[0]
+    if count > 0:
+        raise HTTPException(status_code=409, detail="Cannot delete vendor: referenced by wedding_payments")
+    db.execute("DELETE FROM wedding_vendors WHERE id = ?", (vendor_id,))
+    bump_data_version(db, "wedding_vendors")
+    db.commit()
+
+
+# --- Payments ---
+
+@router.get("/payments", response_model=list[WeddingPaymentResponse],
+            dependencies=[Depends(etag("wedding_payments"))])
+async def list_payments(
+    vendor_id: Optional[int] = Query(None),
+    is_paid: Optional[bool] = Query(None),
+    db: AsyncConnection = Depends(get_async_db),
+):
+    clauses = []
+    params = []
+    if is_paid is not None:
+        clauses.append("is_paid = ?")
+        params.append(int(is_paid))
+    if vendor_id is not None:
+        clauses.append("vendor_id = ?")
+        params.append(vendor_id)
+    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+    rows = await db.fetchall(f"SELECT {PAYMENT_COLS} FROM wedding_payments{where} ORDER BY due_date, id", params)
+    return [dict(r) for r in rows]
+
+
+@router.get("/payments/upcoming", response_model=list[WeddingUpcomingPayment])
+async def list_upcoming_payments(
+    days: int = Query(UPCOMING_DAYS, ge=0, le=366),
+    db: AsyncConnection = Depends(get_async_db),
+):
+    """Unpaid payments due within `days` days, overdue ones included."""
+    today = date.today()
+    rows = await db.fetchall(
+        "SELECT p.id, p.vendor_id, v.name AS vendor_name, p.payment_type, p.amount, p.due_date, "
+        "p.is_paid, p.paid_date, p.due_date < ? AS overdue "
+        "FROM wedding_payments p JOIN wedding_vendors v ON v.id = p.vendor_id "
+        "WHERE p.is_paid = 0 AND p.due_date <= ? ORDER BY p.due_date, p.id",
+        (today.isoformat(), (today + timedelta(days=days)).isoformat()),
+    )
+    return [dict(r) for r in rows]
+
+
+@router.get("/payments/{payment_id}", response_model=WeddingPaymentResponse,
+            dependencies=[Depends(etag("wedding_payments"))])
+async def get_payment(payment_id: int, db: AsyncConnection = Depends(get_async_db)):
+    row = await db.fetchone(f"SELECT {PAYMENT_COLS} FROM wedding_payments WHERE id = ?", (payment_id,))
+    if not row:
+        raise HTTPException(status_code=404, detail="Payment not found")
+    return dict(row)
+
+
+@router.post("/payments", response_model=WeddingPaymentResponse, status_code=201)
+def create_payment(body: WeddingPaymentCreate, db: sqlite3.Connection = Depends(get_db)):
+    _require_vendor(db, body.vendor_id)
+    cur = db.execute(
+        "INSERT INTO wedding_payments (vendor_id, payment_type, amount, due_date, is_paid, paid_date) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (body.vendor_id, body.payment_type, body.amount, body.due_date, int(body.is_paid), body.paid_date),
+    )
+    bump_data_version(db, "wedding_payments")
+    db.commit()
+    return {**body.model_dump(), "id": cur.lastrowid}
+
+
+@router.put("/payments/{payment_id}", response_model=WeddingPaymentResponse)
+def update_payment(payment_id: int, body: WeddingPaymentCreate, db: sqlite3.Connection = Depends(get_db)):
+    existing = db.execute("SELECT id FROM wedding_payments WHERE id = ?", (payment_id,)).fetchone()
+    if not existing:
+        raise HTTPException(status_code=404, detail="Payment not found")
+    _require_vendor(db, body.vendor_id)
+    db.execute(
+        "UPDATE wedding_payments SET vendor_id = ?, payment_type = ?, amount = ?, due_date = ?, "
+        "is_paid = ?, paid_date = ? WHERE id = ?",
+        (body.vendor_id, body.payment_type, body.amount, body.due_date, int(body.is_paid), body.paid_date,
+         payment_id),
+    )
+    bump_data_version(db, "wedding_payments")
+    db.commit()
+    return {**body.model_dump(), "id": payment_id}
+
+
+@router.delete("/payments/{payment_id}", status_code=204)
+def delete_payment(payment_id: int, db: sqlite3.Connection = Depends(get_db)):
+    existing = db.execute("SELECT id FROM wedding_payments WHERE id = ?", (payment_id,)).fetchone()
+    if not existing:
+        raise HTTPException(status_code=404, detail="Payment not found")
+    db.execute("DELETE FROM wedding_payments WHERE id = ?", (payment_id,))
+    bump_data_version(db, "wedding_payments")
+    db.commit()
+
+
+def _require_vendor(db: sqlite3.Connection, vendor_id: int) -> None:
+    if not db.execute("SELECT id FROM wedding_vendors WHERE id = ?", (vendor_id,)).fetchone():
+        raise HTTPException(status_code=400, detail="Vendor not found")
+
+
+# --- Settings ---
+
+@router.get("/settings", response_model=WeddingSettings, dependencies=[Depends(etag("wedding_settings"))])
+async def get_settings(db: AsyncConnection = Depends(get_async_db)):
+    row = await db.fetchone(f"SELECT {', '.join(SETTINGS_COLS)} FROM wedding_settings WHERE id = 1")
+    return dict(row) if row else {}
+
+
+@router.put("/settings", response_model=WeddingSettings)
+def update_settings(body: WeddingSettings, db: sqlite3.Connection = Depends(get_db)):
+    if body.wedding_date is not None and not is_iso_date(body.wedding_date):
+        raise HTTPException(status_code=400, detail="wedding_date must be a YYYY-MM-DD date")
+    values = body.model_dump()
+    db.execute(
+        f"INSERT INTO wedding_settings (id, {', '.join(SETTINGS_COLS)}) "
+        f"VALUES (1, {', '.join('?' for _ in SETTINGS_COLS)}) "
+        f"ON CONFLICT(id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in SETTINGS_COLS)}",
+        [values[c] for c in SETTINGS_COLS],
+    )
+    bump_data_version(db, "wedding_settings")
+    db.commit()
+    return values
+
+
+# --- Summary, timeline and calculator ---
+
+@router.get("/summary", response_model=WeddingSummary,
+            dependencies=[Depends(etag("wedding_settings", "wedding_vendors", "wedding_payments"))])
+async def get_summary(db: AsyncConnection = Depends(get_async_db)):
+    return await db.run(summary)
+
+
+@router.get("/timeline", response_model=WeddingTimeline)
+async def get_timeline(db: AsyncConnection = Depends(get_async_db)):
+    """Payments by due month, with unpaid ones due in the next 30 days flagged as upcoming."""
+    return await db.run(timeline)
+
+
+@router.get("/calculator", response_model=WeddingProjection)
+async def get_calculator(db: AsyncConnection = Depends(get_async_db)):
+    try:
+        return await db.run(project)
+    except WeddingNotConfigured as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/calculator/simulation", response_model=WeddingSimulation)
+async def get_simulation(
+    scenarios: int = Query(10_000, ge=100, le=100_000),
+    seed: int = Query(0, ge=0),
+    db: AsyncConnection = Depends(get_async_db),
+):
+    """Percentile bands of the projected balances over simulated scenarios."""
+    try:
+        return await db.run(lambda conn: simulate(conn, scenarios, seed))
+    except WeddingNotConfigured as e:
+        raise HTTPException(status_code=409, detail=str(e))
@@ -0,0 +1,41 @@
+"""Tenant selection for multi-household deployments.
+
+Installed by api/app.py when CASHBOARD_TENANTS_DIR is set. Reads the
+tenant id from the X-Cashboard-Tenant header and sets
+db.database.current_tenant for the request, so get_db() and every
+get_connection() made while handling it use that tenant's database file.
+
+/api/sync is refused in this mode: the scrapers in data-fetcher share one
+config and output directory, so their data belongs to no single tenant.
+"""
+
+from starlette.responses import JSONResponse
+
+from db.database import current_tenant, is_valid_tenant_id
+
+TENANT_HEADER = b"x-cashboard-tenant"
+
+# Process-wide endpoints that don't belong to a household
+EXEMPT_PATHS = frozenset({"/metrics", "/docs", "/redoc", "/openapi.json"})
+
+
+class TenantMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        tenant = next((v.decode("latin-1") for k, v in scope["headers"] if k == TENANT_HEADER), None)
+        if tenant is None or not is_valid_tenant_id(tenant):
+            detail = "Missing X-Cashboard-Tenant header" if tenant is None else "Invalid tenant id"
+            await JSONResponse({"detail": detail}, status_code=400)(scope, receive, send)
+            return
+
+        token = current_tenant.set(tenant)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_tenant.reset(token)
@@ -0,0 +1,143 @@
+"""API latency harness.
+
+Seeds a file database with N synthetic transactions (benchmarks/generator.py),
+then drives api.app in-process through httpx's ASGI transport with
+concurrent clients and reports p50/p95/p99 latency and throughput per
+route. Scrapers are stubbed for POST /api/sync; ingestion runs for real
+against a small generated dump.
+
+Usage:
+    cd backend && python -m benchmarks.api_bench
+    cd backend && python -m benchmarks.api_bench --rows 100k --clients 32 --requests 500
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from benchmarks.ingest_bench import parse_size
+
+
+def _seed(workdir: Path, rows: int) -> Path:
+    """Create and fill the DB; returns the small dump dir used by /api/sync."""
+    from benchmarks.generator import setup_sources, write_dumps
+    from db.database import get_connection, init_db
+    from ingestion.ingest import ingest_file
+
+    init_db()
+    db = get_connection()
+    setup_sources(db)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for path in write_dumps(workdir / "seed", rows, duplicate_ratio=0.0):
+            ingest_file(path, db=db)
+    db.close()
+
+    sync_dir = workdir / "sync"
+    write_dumps(sync_dir, 300, seed=1)
+    return sync_dir
+
+
+def _scenarios(client_id: int, round_no: int) -> list[tuple[str, str, str, dict | None]]:
+    """(label, method, url, json) requests one client issues per round."""
+    name = f"bench-{client_id}-{round_no}"
+    return [
+        ("GET /api/transactions", "GET", "/api/transactions", None),
+        ("GET /api/transactions?filters", "GET",
+         "/api/transactions?from_date=2024-03-01&to_date=2024-03-31&category=2", None),
+        ("GET /api/transactions/uncategorized", "GET", "/api/transactions/uncategorized", None),
+        ("GET /api/categories", "GET", "/api/categories", None),
+        ("POST /api/categories", "POST", "/api/categories", {"name": name}),
+        ("GET /api/classification-rules", "GET", "/api/classification-rules", None),
+        ("POST /api/classification-rules", "POST", "/api/classification-rules",
+         {"category_id": 2, "keyword": name}),
+    ]
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def _drive(app, clients: int, rounds: int, sync_rounds: int) -> dict[str, list[float]]:
+    import httpx
+
+    latencies: dict[str, list[float]] = {}
+
+    async def request(client, label, method, url, body):
+        start = time.perf_counter()
+        resp = await client.request(method, url, json=body)
+        latencies.setdefault(label, []).append(time.perf_counter() - start)
+        if resp.status_code >= 400:
+            raise RuntimeError(f"{label} → {resp.status_code}: {resp.text[:200]}")
+        return resp
+
+    async def run_client(client_id: int):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for r in range(rounds):
+                for label, method, url, body in _scenarios(client_id, r):
+                    resp = await request(client, label, method, url, body)
+                    if method == "POST":
+                        created = resp.json()["id"]
+                        base = url.rstrip("/")
+                        put_body = {**body, "name": f"{body['name']}-u"} if "name" in body else body
+                        await request(client, f"PUT {base}/{{id}}", "PUT", f"{base}/{created}", put_body)
+                        await request(client, f"DELETE {base}/{{id}}", "DELETE", f"{base}/{created}", None)
+            if client_id == 0:
+                for _ in range(sync_rounds):
+                    await request(client, "POST /api/sync", "POST", "/api/sync", {"banks": ["leumi"]})
+
+    await asyncio.gather(*(run_client(i) for i in range(clients)))
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="10k", help="transactions to seed (e.g. 10k, 100k, 1M)")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--requests", type=int, default=20, help="rounds of the route mix per client")
+    parser.add_argument("--sync", type=int, default=5, help="POST /api/sync calls (scrapers stubbed)")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory(prefix="cashboard-api-bench-")
+    workdir = Path(tmp.name)
+    os.environ["CASHBOARD_DB_PATH"] = str(workdir / "bench.db")
+
+    t0 = time.perf_counter()
+    sync_dir = _seed(workdir, parse_size(args.rows))
+    print(f"Seeded {args.rows} transactions in {time.perf_counter() - t0:.1f}s")
+
+    from api.app import app
+    from ingestion.ingest import ingest_all
+
+    scrape_ok = MagicMock(spec=subprocess.CompletedProcess, returncode=0, stdout="", stderr="")
+    with patch("api.routes.sync.subprocess.run", return_value=scrape_ok), \
+         patch("api.routes.sync.ingest_all", lambda: ingest_all(output_dir=sync_dir)), \
+         contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        latencies = asyncio.run(_drive(app, args.clients, args.requests, args.sync))
+        wall = time.perf_counter() - start
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{total} requests from {args.clients} clients in {wall:.2f}s ({total / wall:.0f} req/s)\n")
+    print(f"{'route':<40}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for label, values in sorted(latencies.items()):
+        values.sort()
+        ms = [v * 1000 for v in values]
+        rps = len(values) / wall  # observed completions/s within the mixed run
+        print(f"{label:<40}{len(ms):>7}{_percentile(ms, 50):>10.1f}{_percentile(ms, 95):>10.1f}"
+              f"{_percentile(ms, 99):>10.1f}{rps:>10.0f}")
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Sync vs async read routes under concurrency.
+
+Seeds a file DB (as benchmarks/api_bench.py does), then serves the same
+read queries two ways and drives each with many concurrent httpx ASGI
+clients:
+
+  sync   sync handlers on get_db(), each request holding a threadpool
+         worker while SQLite runs (how every route worked before db/aio.py)
+  async  the async read routes in api.app, multiplexed over the
+         AsyncConnectionPool's worker threads
+
+Reports throughput, p50/p95/p99 latency and the peak number of threads.
+
+Usage:
+    cd backend && python -m benchmarks.async_bench
+    cd backend && python -m benchmarks.async_bench --rows 100k --clients 500 --requests 20
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.api_bench import _percentile, _seed
+from benchmarks.ingest_bench import parse_size
+
+PATHS = [
+    "/api/transactions?from_date=2024-03-01&to_date=2024-03-31&category=2",
+    "/api/categories",
+    "/api/accounts",
+    "/api/classification-rules/1",
+]
+
+
+def _sync_app():
+    """The read routes as sync handlers, the way api/routes served them before."""
+    from typing import Optional
+
+    from fastapi import Depends, FastAPI, Query
+
+    from db.database import get_db
+
+    app = FastAPI()
+
+    @app.get("/api/transactions")
+    def list_transactions(from_date: Optional[str] = Query(None), to_date: Optional[str] = Query(None),
+                          category: Optional[int] = Query(None), db: sqlite3.Connection = Depends(get_db)):
+        rows = db.execute(
+            "SELECT * FROM transactions WHERE date >= ? AND date <= ? AND category_id = ? ORDER BY date DESC",
+            (from_date, to_date, category),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    @app.get("/api/categories")
+    def list_categories(db: sqlite3.Connection = Depends(get_db)):
+        return [dict(r) for r in db.execute("SELECT * FROM categories").fetchall()]
+
+    @app.get("/api/accounts")
+    def list_accounts(db: sqlite3.Connection = Depends(get_db)):
+        return [dict(r) for r in db.execute("SELECT * FROM accounts").fetchall()]
+
+    @app.get("/api/classification-rules/{rule_id}")
+    def get_rule(rule_id: int, db: sqlite3.Connection = Depends(get_db)):
+        return dict(db.execute("SELECT * FROM classification_rules WHERE id = ?", (rule_id,)).fetchone())
+
+    return app
+
+
+async def _drive(app, clients: int, rounds: int) -> tuple[list[float], float, int]:
+    import httpx
+
+    latencies: list[float] = []
+    peak_threads = threading.active_count()
+    done = asyncio.Event()
+
+    async def sample_threads():
+        nonlocal peak_threads
+        while not done.is_set():
+            peak_threads = max(peak_threads, threading.active_count())
+            await asyncio.sleep(0.005)
+
+    async def run_client():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for _ in range(rounds):
+                for path in PATHS:
+                    start = time.perf_counter()
+                    resp = await client.get(path)
+                    latencies.append(time.perf_counter() - start)
+                    if resp.status_code != 200:
+                        raise RuntimeError(f"{path} → {resp.status_code}: {resp.text[:200]}")
+
+    sampler = asyncio.create_task(sample_threads())
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client() for _ in range(clients)))
+    wall = time.perf_counter() - start
+    done.set()
+    await sampler
+    return latencies, wall, peak_threads
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="10k", help="transactions to seed (e.g. 10k, 100k)")
+    parser.add_argument("--clients", type=int, default=200, help="concurrent clients")
+    parser.add_argument("--requests", type=int, default=10, help="rounds of the route mix per client")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory(prefix="cashboard-async-bench-")
+    os.environ["CASHBOARD_DB_PATH"] = str(Path(tmp.name) / "bench.db")
+    _seed(Path(tmp.name), parse_size(args.rows))
+
+    from api.app import app as async_app
+    from db.aio import close_async_pools
+
+    print(f"{'mode':<8}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'threads':>10}")
+    for mode, app in (("sync", _sync_app()), ("async", async_app)):
+        latencies, wall, threads = asyncio.run(_drive(app, args.clients, args.requests))
+        ms = sorted(v * 1000 for v in latencies)
+        print(f"{mode:<8}{len(ms):>10}{len(ms) / wall:>10.0f}{_percentile(ms, 50):>10.1f}"
+              f"{_percentile(ms, 95):>10.1f}{_percentile(ms, 99):>10.1f}{threads:>10}")
+    close_async_pools()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Micro-benchmark: per-transaction cost of scraper date normalization.
+
+Compares the original datetime/ZoneInfo conversion with IsraelDateConverter
+on a dump-like stream of timestamps (a few hundred distinct instants, each
+repeated, crossing both DST transitions).
+
+Usage:
+    cd backend && python -m benchmarks.bench_normalize_date [n_txns]
+"""
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from ingestion.dates import IsraelDateConverter
+
+ISRAEL_TZ = ZoneInfo("Asia/Jerusalem")
+
+
+def _reference(iso_str: str | None) -> str | None:
+    """The conversion as originally implemented in ingestion.ingest."""
+    if not iso_str:
+        return None
+    dt = datetime.fromisoformat(iso_str.replace("Z", "+00:00"))
+    return dt.astimezone(ISRAEL_TZ).strftime("%Y-%m-%d")
+
+
+def _timestamps(n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    # Scrapers mostly report midnight-local instants, i.e. 21:00/22:00 UTC
+    instants = [
+        (start + timedelta(days=d, hours=h)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        for d in range(365) for h in (21, 22)
+    ]
+    return [rng.choice(instants) for _ in range(n)]
+
+
+def _per_txn_us(fn, values: list[str]) -> float:
+    t0 = time.perf_counter()
+    for v in values:
+        fn(v)
+    return (time.perf_counter() - t0) / len(values) * 1e6
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    values = _timestamps(n)
+
+    before = _per_txn_us(_reference, values)
+    cold = _per_txn_us(IsraelDateConverter(memo_size=1).to_date, values)
+    warm = _per_txn_us(IsraelDateConverter().to_date, values)
+
+    assert all(IsraelDateConverter().to_date(v) == _reference(v) for v in values[:5000])
+
+    print(f"{n} timestamps, {len(set(values))} distinct")
+    print(f"  before (datetime + ZoneInfo): {before:6.3f} us/txn")
+    print(f"  after, no memo hits:          {cold:6.3f} us/txn")
+    print(f"  after, memoized:              {warm:6.3f} us/txn ({before / warm:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Deterministic synthetic scraper dumps for benchmarks.
+
+Produces JSON in the shape data-fetcher/scrapers/save-results.ts writes
+({"bank", "scrapedAt", "accounts": [{"accountNumber", "balance", "txns"}]}),
+with merchant descriptions drawn from the keywords in db/seed.sql plus
+branch numbers, city suffixes and unknown merchants. write_statement_csv
+renders the same transactions as a bank statement export for
+ingestion/csv_importer.py.
+"""
+
+import csv
+import json
+import random
+import re
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+SEED_PATH = Path(__file__).resolve().parent.parent / "db" / "seed.sql"
+
+BANKS = ("leumi", "isracard", "max")
+
+_CITIES = ["תל אביב", "ירושלים", "חיפה", "באר שבע", "רמת גן", "TEL AVIV", "HAIFA", ""]
+_UNKNOWN = ["PAYBOX", "העברה מ", "משכורת", "ביט העברת כסף", "קופיקס", "SHEIN", "GOOGLE *YouTube"]
+
+
+def seed_keywords() -> list[str]:
+    """Classification rule keywords from seed.sql."""
+    text = SEED_PATH.read_text(encoding="utf-8")
+    return re.findall(r"\(\d+,\s*'([^']+)',\s*'(?:contains|exact|starts_with)'\)", text)
+
+
+def account_numbers(bank: str, accounts: int) -> list[str]:
+    if bank == "leumi":
+        return [f"{800 + i}-{123456 + i}" for i in range(accounts)]
+    offset = 1000 if bank == "isracard" else 5000
+    return [f"{offset + i:04d}" for i in range(accounts)]
+
+
+def generate_dump(
+    bank: str,
+    accounts: int = 1,
+    txns_per_account: int = 1000,
+    pending_ratio: float = 0.05,
+    duplicate_ratio: float = 0.0,
+    seed: int = 0,
+    start: datetime = datetime(2024, 1, 1, tzinfo=timezone.utc),
+) -> dict:
+    """Return one scraper dump for a bank.
+
+    duplicate_ratio is the share of txns that repeat an earlier txn of the
+    same account (same identifier, or same date/amount/description for
+    pending rows without one), as happens with overlapping scrape windows.
+    """
+    rng = random.Random(f"{bank}:{seed}")
+    merchants = seed_keywords() + _UNKNOWN
+    is_card = bank != "leumi"
+    days = max(1, txns_per_account // 10)
+
+    out_accounts = []
+    for number in account_numbers(bank, accounts):
+        txns: list[dict] = []
+        for i in range(txns_per_account):
+            if txns and rng.random() < duplicate_ratio:
+                txns.append(dict(rng.choice(txns)))
+                continue
+
+            when = start + timedelta(days=rng.randrange(days), hours=rng.choice([0, 21, 22]))
+            merchant = rng.choice(merchants)
+            city = rng.choice(_CITIES)
+            description = f"{merchant} {rng.randrange(1, 400)} {city}".strip() if rng.random() < 0.5 else merchant
+            amount = -round(rng.lognormvariate(4, 1), 2)
+            if not is_card and rng.random() < 0.05:
+                amount = round(rng.uniform(5000, 20000), 2)  # income into the bank account
+            pending = rng.random() < pending_ratio
+
+            txn = {
+                "type": "normal",
+                "date": when.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "processedDate": (when + timedelta(days=rng.randrange(0, 30))).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "originalAmount": amount,
+                "originalCurrency": "ILS",
+                "chargedAmount": 0 if pending and bank == "max" else amount,
+                "chargedCurrency": "ILS",
+                "description": description,
+                "memo": "",
+                "status": "pending" if pending else "completed",
+            }
+            # Leumi often omits identifiers; pending card rows have none yet
+            if not pending and (is_card or rng.random() < 0.5):
+                txn["identifier"] = f"{bank}-{number}-{i}"
+            if is_card and rng.random() < 0.1:
+                txn["type"] = "installments"
+                txn["installmentTotal"] = rng.choice([3, 6, 12])
+                txn["installmentNumber"] = rng.randrange(1, txn["installmentTotal"] + 1)
+            txns.append(txn)
+
+        account = {"accountNumber": number, "txns": txns}
+        if not is_card:
+            account["balance"] = round(rng.uniform(-5000, 50000), 2)
+        out_accounts.append(account)
+
+    return {
+        "bank": bank,
+        "scrapedAt": (start + timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "accounts": out_accounts,
+    }
+
+
+def write_dumps(output_dir: Path, total_txns: int, accounts_per_bank: int = 1,
+                banks: tuple[str, ...] = BANKS, **kwargs) -> list[Path]:
+    """Write one dump per bank under output_dir/<bank>/, splitting total_txns evenly."""
+    per_account = max(1, total_txns // (len(banks) * accounts_per_bank))
+    paths = []
+    for bank in banks:
+        bank_dir = output_dir / bank
+        bank_dir.mkdir(parents=True, exist_ok=True)
+        dump = generate_dump(bank, accounts_per_bank, per_account, **kwargs)
+        path = bank_dir / f"{bank}_2024-01-01.json"
+        path.write_text(json.dumps(dump, ensure_ascii=False), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+# Header of the statements written by write_statement_csv
+STATEMENT_COLUMNS = ("תאריך", "תיאור", "סכום", "יתרה")
+
+
+def write_statement_csv(path: Path, total_txns: int, seed: int = 0) -> Path:
+    """Write a leumi-style statement CSV (dd/mm/yyyy dates, running balance)."""
+    dump = generate_dump("leumi", 1, total_txns, pending_ratio=0.0, seed=seed)
+    txns = sorted(dump["accounts"][0]["txns"], key=lambda t: t["date"])
+    balance = 10_000.0
+    with path.open("w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(STATEMENT_COLUMNS)
+        for txn in txns:
+            balance += txn["chargedAmount"]
+            when = datetime.strptime(txn["date"][:10], "%Y-%m-%d")
+            writer.writerow([when.strftime("%d/%m/%Y"), txn["description"], f"{txn['chargedAmount']:,.2f}",
+                             f"{balance:,.2f}"])
+    return path
+
+
+def setup_sources(db: sqlite3.Connection, accounts_per_bank: int = 1,
+                  banks: tuple[str, ...] = BANKS) -> None:
+    """Create the accounts/cards the generated dumps resolve to."""
+    db.execute(
+        "INSERT INTO accounts (id, name, bank, type, scraper_type) "
+        "VALUES (1, 'Leumi Shared', 'leumi', 'shared', 'leumi')"
+    )
+    for bank in banks:
+        if bank == "leumi":
+            continue
+        for number in account_numbers(bank, accounts_per_bank):
+            db.execute(
+                "INSERT INTO credit_cards (account_id, name, company, last_4_digits, billing_day, scraper_type) "
+                "VALUES (1, ?, ?, ?, 2, ?)",
+                (f"{bank} {number}", bank, number, bank),
+            )
+    db.commit()
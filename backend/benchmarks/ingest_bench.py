@@ -0,0 +1,210 @@
+"""Ingestion throughput benchmarks.
+
+Runs ingest_file, ingest_all, classify_transaction and check_duplicate on
+synthetic scraper dumps (benchmarks/generator.py), and csv_import on the
+same transactions as a statement CSV, against a fresh file DB,
+each case in its own subprocess so peak RSS is per case. Reports rows/s
+and peak RSS, and exits non-zero when the best of --repeat runs of a case
+regresses against benchmarks/baseline.json by more than the tolerance.
+Baselines are
+machine-specific: refresh them with --update-baseline on the machine that
+runs the comparison.
+
+Usage:
+    cd backend && python -m benchmarks.ingest_bench                       # 1k, compare
+    cd backend && python -m benchmarks.ingest_bench --sizes 1k 100k 1M
+    cd backend && python -m benchmarks.ingest_bench --update-baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+CASES = ("ingest_file", "ingest_all", "classify_transaction", "check_duplicate", "csv_import")
+
+
+def parse_size(text: str) -> int:
+    units = {"k": 1_000, "m": 1_000_000}
+    suffix = text[-1].lower()
+    if suffix in units:
+        return int(float(text[:-1]) * units[suffix])
+    return int(text)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _run_case(case: str, size: int, workdir: Path, pending_ratio: float, duplicate_ratio: float) -> dict:
+    """Run one case in this process. The DB path must already be set in the env."""
+    from benchmarks.generator import STATEMENT_COLUMNS, setup_sources, write_dumps, write_statement_csv
+    from db.database import get_connection, init_db
+    from ingestion.classifier import classify_transaction
+    from ingestion.duplicate_checker import check_duplicate
+    from ingestion.ingest import _normalize_transaction, _resolve_source, ingest_all, ingest_file
+
+    output_dir = workdir / "output"
+    paths = write_dumps(output_dir, size, pending_ratio=pending_ratio, duplicate_ratio=duplicate_ratio)
+    init_db()
+    db = get_connection()
+    setup_sources(db)
+
+    def normalized() -> list[dict]:
+        txns = []
+        for path in paths:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            for account in data["accounts"]:
+                source_type, source_id = _resolve_source(db, data["bank"], account["accountNumber"])
+                txns.extend(
+                    _normalize_transaction(t, source_type, source_id, data["bank"])
+                    for t in account["txns"]
+                )
+        return txns
+
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        if case == "ingest_file":
+            rows = sum(len(a["txns"]) for p in paths for a in json.loads(p.read_text(encoding="utf-8"))["accounts"])
+            start = time.perf_counter()
+            for path in paths:
+                ingest_file(path, db=db)
+            elapsed = time.perf_counter() - start
+        elif case == "ingest_all":
+            db.close()
+            rows = sum(len(a["txns"]) for p in paths for a in json.loads(p.read_text(encoding="utf-8"))["accounts"])
+            start = time.perf_counter()
+            ingest_all(output_dir)
+            elapsed = time.perf_counter() - start
+            db = get_connection()
+        elif case == "classify_transaction":
+            txns = normalized()
+            rows = len(txns)
+            start = time.perf_counter()
+            for txn in txns:
+                classify_transaction(db, txn)
+            elapsed = time.perf_counter() - start
+        elif case == "check_duplicate":
+            for path in paths:
+                ingest_file(path, db=db)
+            txns = normalized()
+            rows = len(txns)
+            start = time.perf_counter()
+            for txn in txns:
+                check_duplicate(db, txn)
+            elapsed = time.perf_counter() - start
+        elif case == "csv_import":
+            from ingestion.csv_importer import import_file
+
+            path = write_statement_csv(workdir / "statement.csv", size)
+            date_col, description_col, amount_col, balance_col = STATEMENT_COLUMNS
+            profile_id = db.execute(
+                "INSERT INTO import_profiles (name, source_type, source_id, date_column, amount_column, "
+                "description_column, balance_column) VALUES ('bench', 'bank', 1, ?, ?, ?, ?)",
+                (date_col, amount_col, description_col, balance_col),
+            ).lastrowid
+            db.commit()
+            rows = size
+            start = time.perf_counter()
+            import_file(path, profile_id, db=db)
+            elapsed = time.perf_counter() - start
+        else:
+            raise ValueError(f"Unknown case: {case}")
+    db.close()
+
+    return {
+        "rows": rows,
+        "seconds": round(elapsed, 4),
+        "rows_per_s": round(rows / elapsed, 1) if elapsed else None,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def _spawn(case: str, size: int, args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory(prefix="cashboard-bench-") as tmp:
+        env = {**os.environ, "CASHBOARD_DB_PATH": str(Path(tmp) / "bench.db")}
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.ingest_bench", "--case", case, "--size", str(size),
+             "--workdir", tmp, "--pending-ratio", str(args.pending_ratio),
+             "--duplicate-ratio", str(args.duplicate_ratio)],
+            cwd=str(BACKEND_DIR), env=env, capture_output=True, text=True,
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{case}@{size} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _compare(key: str, result: dict, baseline: dict, tolerance: float) -> list[str]:
+    base = baseline.get(key)
+    if not base:
+        return []
+    problems = []
+    if result["rows_per_s"] < base["rows_per_s"] * (1 - tolerance):
+        problems.append(f"{key}: {result['rows_per_s']:.0f} rows/s < baseline {base['rows_per_s']:.0f}")
+    if result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+        problems.append(f"{key}: {result['peak_rss_mb']} MB peak RSS > baseline {base['peak_rss_mb']} MB")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["1k"])
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=CASES)
+    parser.add_argument("--pending-ratio", type=float, default=0.05)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the best is reported")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="allowed relative regression before failing (default 0.3)")
+    parser.add_argument("--update-baseline", action="store_true")
+    # Internal: run a single case in this process
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        result = _run_case(args.case, args.size, Path(args.workdir), args.pending_ratio, args.duplicate_ratio)
+        print(json.dumps(result))
+        return
+
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    problems = []
+    print(f"{'case':<24}{'size':>8}{'rows/s':>14}{'seconds':>10}{'peak RSS MB':>14}")
+    for size_text in args.sizes:
+        size = parse_size(size_text)
+        for case in args.cases:
+            # Best of N runs; small sizes finish in milliseconds and are noisy
+            result = max((_spawn(case, size, args) for _ in range(args.repeat)),
+                         key=lambda r: r["rows_per_s"])
+            key = f"{case}@{size_text}"
+            print(f"{case:<24}{size_text:>8}{result['rows_per_s']:>14.0f}{result['seconds']:>10.2f}"
+                  f"{result['peak_rss_mb']:>14.1f}")
+            if args.update_baseline:
+                baseline[key] = {"rows_per_s": result["rows_per_s"], "peak_rss_mb": result["peak_rss_mb"]}
+            else:
+                problems.extend(_compare(key, result, baseline, args.tolerance))
+
+    if args.update_baseline:
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+    elif problems:
+        print("\nRegressions:")
+        for p in problems:
+            print(f"  {p}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
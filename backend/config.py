@@ -3,3 +3,25 @@ from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent
 DB_PATH = os.environ.get("CASHBOARD_DB_PATH", str(BASE_DIR / "cashboard.db"))
+
+# Per-request timing and SQL profiling (see db/profiling.py); off by default
+PROFILING = os.environ.get("CASHBOARD_PROFILING", "") == "1"
+SLOW_QUERY_MS = float(os.environ.get("CASHBOARD_SLOW_QUERY_MS", "50"))
+
+# Multi-household mode: one SQLite file per tenant under this directory,
+# selected per request by the X-Cashboard-Tenant header. Unset = DB_PATH only.
+TENANTS_DIR = os.environ.get("CASHBOARD_TENANTS_DIR") or None
+MAX_OPEN_TENANTS = int(os.environ.get("CASHBOARD_MAX_OPEN_TENANTS", "64"))
+TENANT_POOL_SIZE = int(os.environ.get("CASHBOARD_TENANT_POOL_SIZE", "4"))
+
+# Connections (each with its own worker thread) per database for the async read routes
+ASYNC_POOL_SIZE = int(os.environ.get("CASHBOARD_ASYNC_POOL_SIZE", "4"))
+
+# Analytics response cache (services/response_cache.py): entry limit, and TTL
+# in seconds for results that depend on today's date as well as the data
+RESPONSE_CACHE_SIZE = int(os.environ.get("CASHBOARD_RESPONSE_CACHE_SIZE", "256"))
+RESPONSE_CACHE_TTL = float(os.environ.get("CASHBOARD_RESPONSE_CACHE_TTL", "300"))
+
+# Balance snapshots older than this many whole months are compacted to one
+# point per account per month (scripts/compact_snapshots.py)
+SNAPSHOT_FULL_MONTHS = int(os.environ.get("CASHBOARD_SNAPSHOT_FULL_MONTHS", "3"))
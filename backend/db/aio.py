@@ -0,0 +1,242 @@
+"""Async access to SQLite for the API's read routes.
+
+Each AsyncConnection owns one sqlite3 connection and one worker thread that
+runs the statements submitted to it; callers await the result without
+holding a threadpool worker. AsyncConnectionPool hands out a fixed number
+of them per database, so any number of concurrent requests is multiplexed
+over a few threads, with waiting requests parked on futures.
+
+The pools serve read routes: pooled connections are not rolled back on
+release, so work submitted through run() must commit what it writes.
+
+Work runs in a copy of the caller's context, so the current tenant and the
+request profile (db/profiling.py) apply inside the worker thread too.
+"""
+
+import asyncio
+import contextvars
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from functools import partial
+
+import metrics
+from config import ASYNC_POOL_SIZE, MAX_OPEN_TENANTS
+from db import database
+
+_STOP = object()
+
+# Always on, unlike the per-statement histogram of db/profiling.py: two
+# clock reads per job
+_query_seconds = metrics.histogram(
+    "cashboard_db_query_seconds", "Time to run one async read-route query on its DB worker thread",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+
+class AsyncConnection:
+    """A sqlite3 connection confined to its own worker thread."""
+
+    def __init__(self, connect):
+        self.closed = False
+        self._jobs: queue.SimpleQueue = queue.SimpleQueue()
+        self._ready = threading.Event()
+        self._error: BaseException | None = None
+        self._conn: sqlite3.Connection | None = None
+        self._thread = threading.Thread(target=self._run, args=(connect,), daemon=True,
+                                        name="cashboard-db")
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self, connect) -> None:
+        try:
+            self._conn = connect()
+        except BaseException as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        while True:
+            job = self._jobs.get()
+            if job is _STOP:
+                break
+            fn, ctx, future, loop = job
+            start = time.perf_counter()
+            try:
+                result = ctx.run(fn, self._conn)
+            except BaseException as e:
+                loop.call_soon_threadsafe(_set_exception, future, e)
+            else:
+                loop.call_soon_threadsafe(_set_result, future, result)
+            _query_seconds.observe(time.perf_counter() - start)
+        self._conn.close()
+
+    def run(self, fn):
+        """Run fn(connection) on the worker thread; returns an awaitable."""
+        if self.closed:
+            raise RuntimeError("AsyncConnection is closed")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._jobs.put((fn, contextvars.copy_context(), future, loop))
+        return future
+
+    async def fetchall(self, sql: str, params=()) -> list[sqlite3.Row]:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def fetchone(self, sql: str, params=()) -> sqlite3.Row | None:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchone())
+
+    def close(self) -> None:
+        self.closed = True
+        self._jobs.put(_STOP)
+        self._thread.join()
+
+
+def _set_result(future: asyncio.Future, result) -> None:
+    if not future.cancelled():
+        future.set_result(result)
+
+
+def _set_exception(future: asyncio.Future, error: BaseException) -> None:
+    if not future.cancelled():
+        future.set_exception(error)
+
+
+class AsyncConnectionPool:
+    """Up to `size` AsyncConnections to one database, opened on demand."""
+
+    def __init__(self, connect, size: int = 4):
+        self._connect = connect
+        self.size = size
+        self._opened = 0
+        self._idle: deque[AsyncConnection] = deque()
+        self._waiters: deque[asyncio.Future] = deque()
+        self._all: list[AsyncConnection] = []
+        self._lock = threading.Lock()
+
+    @asynccontextmanager
+    async def connection(self):
+        conn = await self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    async def _acquire(self) -> AsyncConnection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            can_open = self._opened < self.size
+            if can_open:
+                self._opened += 1
+            else:
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+
+        if can_open:
+            try:
+                # Starts a thread and connects; keep that off the event loop
+                conn = await asyncio.to_thread(AsyncConnection, self._connect)
+            except BaseException:
+                with self._lock:
+                    self._opened -= 1
+                raise
+            with self._lock:
+                self._all.append(conn)
+            return conn
+
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            # Handed a connection just as we were cancelled: pass it on
+            if waiter.done() and not waiter.cancelled():
+                self._release(waiter.result())
+            raise
+
+    def _release(self, conn: AsyncConnection) -> None:
+        if conn.closed:
+            # The pool was closed while this connection was checked out
+            return
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(conn)
+                    return
+            self._idle.append(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            conns, self._all = self._all, []
+            waiters, self._waiters = self._waiters, deque()
+            self._idle.clear()
+            self._opened = 0
+        for waiter in waiters:
+            waiter.get_loop().call_soon_threadsafe(
+                _set_exception, waiter, RuntimeError("AsyncConnectionPool closed"))
+        for conn in conns:
+            conn.close()
+
+
+class _PoolRegistry:
+    """One pool per database (default DB or tenant), LRU-bounded like TenantRegistry.
+
+    get() runs on the event loop, so it only does bookkeeping there: a
+    tenant's database file is opened (and created or migrated) by the pool's
+    first connection on its worker thread, and evicted pools are closed in
+    a thread.
+    """
+
+    def __init__(self, pool_size: int, max_open: int):
+        self.pool_size = pool_size
+        self.max_open = max_open
+        self._pools: OrderedDict[str | None, AsyncConnectionPool] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, tenant: str | None) -> AsyncConnectionPool:
+        evicted = []
+        with self._lock:
+            pool = self._pools.get(tenant)
+            if pool is not None:
+                self._pools.move_to_end(tenant)
+                return pool
+            if tenant is None:
+                connect = database.get_connection
+            else:
+                connect = partial(_connect_tenant, tenant)
+            pool = self._pools[tenant] = AsyncConnectionPool(connect, self.pool_size)
+            while len(self._pools) > self.max_open:
+                evicted.append(self._pools.popitem(last=False)[1])
+        for old in evicted:
+            # Joins the pool's worker threads
+            await asyncio.to_thread(old.close)
+        return pool
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), OrderedDict()
+        for pool in pools:
+            pool.close()
+
+
+def _connect_tenant(tenant: str) -> sqlite3.Connection:
+    return database.tenant_registry().pool(tenant).connect()
+
+
+_pools = _PoolRegistry(ASYNC_POOL_SIZE, MAX_OPEN_TENANTS)
+
+
+async def get_async_db():
+    """FastAPI dependency that yields an AsyncConnection for the current database."""
+    pool = await _pools.get(database.current_tenant.get())
+    async with pool.connection() as conn:
+        yield conn
+
+
+def close_async_pools() -> None:
+    _pools.close()
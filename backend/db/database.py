@@ -1,20 +1,59 @@
+import re
 import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import lru_cache
 from pathlib import Path
 
-from config import DB_PATH
+from config import DB_PATH, MAX_OPEN_TENANTS, TENANT_POOL_SIZE, TENANTS_DIR
+from db import dedup, profiling
 
 SCHEMA_PATH = Path(__file__).parent / "schema.sql"
 SEED_PATH = Path(__file__).parent / "seed.sql"
 MIGRATIONS_DIR = Path(__file__).parent / "migrations"
 
+MIGRATIONS = {
+    2: MIGRATIONS_DIR / "002_charged_month.sql",
+    3: MIGRATIONS_DIR / "003_merchants.sql",
+    4: MIGRATIONS_DIR / "004_data_versions.sql",
+    5: MIGRATIONS_DIR / "005_dedup_indexes.sql",
+    6: MIGRATIONS_DIR / "006_ingest_metrics.sql",
+    7: MIGRATIONS_DIR / "007_account_latest_balance.sql",
+    8: MIGRATIONS_DIR / "008_balance_snapshot_account_index.sql",
+    9: MIGRATIONS_DIR / "009_unique_balance_snapshots.sql",
+    10: MIGRATIONS_DIR / "010_forecast_profiles.sql",
+    11: MIGRATIONS_DIR / "011_wedding_payment_due_index.sql",
+    12: MIGRATIONS_DIR / "012_category_month_spend.sql",
+    13: MIGRATIONS_DIR / "013_import_profiles.sql",
+    14: MIGRATIONS_DIR / "014_transaction_dedup_key.sql",
+    15: MIGRATIONS_DIR / "015_import_decimal_separator.sql",
+    16: MIGRATIONS_DIR / "016_spend_profile_month.sql",
+}
+
+# Prepare the migrating connection before a migration's script runs
+MIGRATION_HOOKS = {
+    # Backfills transactions.dedup_key with the hash ingestion computes
+    14: dedup.register_sql_function,
+}
+
+# Connections are opened with check_same_thread=False: FastAPI runs the get_db
+# dependency and the sync endpoint in different threadpool workers. Each
+# connection is still used by one request at a time.
+#
 # When using an in-memory DB, all connections must share the same database.
 # SQLite's shared-cache URI mode enables this. We keep one connection open
 # for the lifetime of the process so the DB isn't destroyed when others close.
 _keep_alive_conn: sqlite3.Connection | None = None
 
 
-def _connect_uri(uri: str) -> sqlite3.Connection:
-    conn = sqlite3.connect(uri, uri=True)
+def _connection_factory() -> type[sqlite3.Connection]:
+    return profiling.ProfilingConnection if profiling.ENABLED else sqlite3.Connection
+
+
+def _connect(database: str | Path, uri: bool = False) -> sqlite3.Connection:
+    conn = sqlite3.connect(database, uri=uri, check_same_thread=False, factory=_connection_factory())
     conn.execute("PRAGMA foreign_keys = ON")
     conn.row_factory = sqlite3.Row
     return conn
@@ -22,57 +61,144 @@ def _connect_uri(uri: str) -> sqlite3.Connection:
 
 def get_connection() -> sqlite3.Connection:
     global _keep_alive_conn
+    tenant = current_tenant.get()
+    if tenant is not None:
+        return _tenants.pool(tenant).connect()
     if DB_PATH == ":memory:":
         uri = "file:cashboard?mode=memory&cache=shared"
         if _keep_alive_conn is None:
-            _keep_alive_conn = _connect_uri(uri)
-        return _connect_uri(uri)
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON")
-    conn.row_factory = sqlite3.Row
-    return conn
+            _keep_alive_conn = _connect(uri, uri=True)
+        return _connect(uri, uri=True)
+    return _connect(DB_PATH)
 
 
 def init_db() -> None:
+    """Create or upgrade the database schema and seed data.
+
+    A database already initialized from the current schema.sql/seed.sql
+    (recorded in PRAGMA user_version) and at the latest migration is left
+    untouched, so startup on an up-to-date database costs two reads.
+    """
     conn = get_connection()
     try:
-        schema_sql = SCHEMA_PATH.read_text(encoding="utf-8")
-        conn.executescript(schema_sql)
+        _initialize(conn)
+    finally:
+        conn.close()
 
-        seed_sql = SEED_PATH.read_text(encoding="utf-8")
-        conn.executescript(seed_sql)
 
-        conn.commit()
+def _initialize(conn: sqlite3.Connection) -> None:
+    fingerprint = _init_fingerprint()
+    current = _current_version(conn)
+    if current >= max(MIGRATIONS) and _user_version(conn) == fingerprint:
+        return
+
+    # Bring an existing database's tables up to date before replaying
+    # schema.sql, whose indexes may cover columns added by migrations
+    if current:
+        _run_migrations(conn, current)
+
+    conn.executescript(SCHEMA_PATH.read_text(encoding="utf-8"))
+    # seed.sql marks every migration as applied; for an existing
+    # database they just ran, for a new one schema.sql is already current
+    conn.executescript(SEED_PATH.read_text(encoding="utf-8"))
+    conn.execute(f"PRAGMA user_version = {fingerprint}")
+    conn.commit()
+
+
+# A private in-memory database initialized once per process. New databases
+# are byte copies of it (sqlite3 backup API) instead of replaying schema.sql
+# and seed.sql each time.
+_template_conn: sqlite3.Connection | None = None
+_template_lock = threading.Lock()
+
+
+def _template() -> sqlite3.Connection:
+    global _template_conn
+    with _template_lock:
+        if _template_conn is None:
+            conn = sqlite3.connect(":memory:", check_same_thread=False)
+            _initialize(conn)
+            _template_conn = conn
+        return _template_conn
 
-        _run_migrations(conn)
+
+def copy_template(conn: sqlite3.Connection) -> None:
+    """Replace the database behind conn with a fresh, initialized copy.
+
+    The copy gets its own instance id, so data version stamps taken from
+    it never match those of another copy.
+    """
+    template = _template()
+    with _template_lock:
+        template.backup(conn)
+    conn.execute("UPDATE data_versions SET version = abs(random()) WHERE name = 'instance'")
+    conn.commit()
+
+
+def create_database(path: str | Path) -> None:
+    """Provision a new, initialized database file at path."""
+    conn = sqlite3.connect(path)
+    try:
+        copy_template(conn)
     finally:
         conn.close()
 
 
-def _run_migrations(conn: sqlite3.Connection) -> None:
-    """Apply pending migrations based on schema_version."""
-    current = conn.execute(
+@lru_cache(maxsize=1)
+def _init_fingerprint() -> int:
+    """Checksum of schema.sql + seed.sql, stored in PRAGMA user_version."""
+    data = SCHEMA_PATH.read_bytes() + SEED_PATH.read_bytes()
+    # user_version is a signed 32-bit integer
+    return zlib.crc32(data) & 0x7FFFFFFF
+
+
+def _user_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _current_version(conn: sqlite3.Connection) -> int:
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    if not exists:
+        return 0
+    return conn.execute(
         "SELECT MAX(version) FROM schema_version"
     ).fetchone()[0] or 0
 
-    migrations = {
-        2: MIGRATIONS_DIR / "002_charged_month.sql",
-    }
 
-    for version in sorted(migrations):
+def _run_migrations(conn: sqlite3.Connection, current: int) -> None:
+    """Apply migrations newer than the given schema version."""
+    for version in sorted(MIGRATIONS):
         if current < version:
-            sql = migrations[version].read_text(encoding="utf-8")
+            hook = MIGRATION_HOOKS.get(version)
+            if hook is not None:
+                hook(conn)
+            sql = MIGRATIONS[version].read_text(encoding="utf-8")
             conn.executescript(sql)
             conn.execute(
                 "INSERT OR REPLACE INTO schema_version (version) VALUES (?)",
                 (version,),
             )
             conn.commit()
-            print(f"Applied migration {version}: {migrations[version].name}")
+            print(f"Applied migration {version}: {MIGRATIONS[version].name}")
 
 
 def get_db():
-    """FastAPI dependency that yields a DB connection."""
+    """FastAPI dependency that yields a DB connection.
+
+    In multi-tenant mode the connection comes from the current tenant's
+    pool and is returned to it afterwards.
+    """
+    tenant = current_tenant.get()
+    if tenant is not None:
+        pool = _tenants.pool(tenant)
+        conn = pool.acquire()
+        try:
+            yield conn
+        finally:
+            pool.release(conn)
+        return
     conn = get_connection()
     try:
         yield conn
@@ -101,3 +227,181 @@ def set_schema_version(version: int) -> None:
         conn.commit()
     finally:
         conn.close()
+
+
+def get_data_version(conn: sqlite3.Connection, *names: str) -> tuple[int, ...]:
+    """Return a stamp for the current contents of the named tables.
+
+    The stamp starts with the database's instance id, so stamps taken from
+    different databases never compare equal. Writers must call
+    bump_data_version() for the stamp to change.
+    """
+    placeholders = ", ".join("?" for _ in names)
+    rows = dict(conn.execute(
+        f"SELECT name, version FROM data_versions WHERE name IN ('instance', {placeholders})",
+        names,
+    ).fetchall())
+    return (rows.get("instance", 0),) + tuple(rows.get(n, 0) for n in names)
+
+
+def bump_data_version(conn: sqlite3.Connection, *names: str) -> None:
+    """Mark the named tables as changed. Committed with the caller's transaction."""
+    conn.executemany(
+        "INSERT INTO data_versions (name, version) VALUES (?, 1) "
+        "ON CONFLICT(name) DO UPDATE SET version = version + 1",
+        [(n,) for n in names],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Multi-tenancy: one SQLite file per household under TENANTS_DIR
+# ---------------------------------------------------------------------------
+
+# Tenant of the current request, set by api/tenancy.py. None = single DB_PATH.
+current_tenant: ContextVar[str | None] = ContextVar("current_tenant", default=None)
+
+_TENANT_ID_RE = re.compile(r"[a-z0-9][a-z0-9_-]{0,63}")
+
+
+def is_valid_tenant_id(tenant: str) -> bool:
+    """Tenant ids become file names, so only a safe subset is allowed."""
+    return _TENANT_ID_RE.fullmatch(tenant) is not None
+
+
+class TenantPool:
+    """Idle connections to one tenant's database file."""
+
+    def __init__(self, path: Path, size: int):
+        self.path = path
+        self.size = size
+        self.closed = False
+        self._idle: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    def prepare(self, open_database) -> None:
+        """Run open_database(path) once, before the pool's first use.
+
+        Concurrent callers wait for the first one; if it fails, the next
+        caller tries again.
+        """
+        if self._ready:
+            return
+        with self._ready_lock:
+            if not self._ready:
+                open_database(self.path)
+                self._ready = True
+
+    @property
+    def ready(self) -> bool:
+        """Whether the database file has been created or migrated."""
+        return self._ready
+
+    def connect(self) -> sqlite3.Connection:
+        """Open an unpooled connection; the caller closes it."""
+        return _connect(self.path)
+
+    def acquire(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self.connect()
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        # Drop anything the request left uncommitted before reuse
+        conn.rollback()
+        with self._lock:
+            if not self.closed and len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        """Close idle connections; checked-out ones close on release."""
+        with self._lock:
+            self.closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class TenantRegistry:
+    """Lazily opened tenant pools, at most max_open kept at once (LRU).
+
+    A tenant's database is created from the template on first access, or
+    migrated if it already exists, before its pool is handed out. That
+    happens outside the registry lock, so a new or migrating tenant only
+    delays its own requests.
+    """
+
+    def __init__(self, directory: str | Path | None, max_open: int = 64, pool_size: int = 4):
+        self.directory = Path(directory) if directory else None
+        self.max_open = max_open
+        self.pool_size = pool_size
+        self._pools: OrderedDict[str, TenantPool] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def path(self, tenant: str) -> Path:
+        if self.directory is None:
+            raise RuntimeError("Multi-tenancy is not configured (CASHBOARD_TENANTS_DIR)")
+        if not is_valid_tenant_id(tenant):
+            raise ValueError(f"Invalid tenant id: {tenant!r}")
+        return self.directory / f"{tenant}.db"
+
+    def pool(self, tenant: str) -> TenantPool:
+        evicted = []
+        with self._lock:
+            pool = self._pools.get(tenant)
+            if pool is not None:
+                self._pools.move_to_end(tenant)
+            else:
+                pool = TenantPool(self.path(tenant), self.pool_size)
+                self._pools[tenant] = pool
+                while len(self._pools) > self.max_open:
+                    evicted.append(self._pools.popitem(last=False)[1])
+        for old in evicted:
+            old.close()
+        pool.prepare(self._open)
+        return pool
+
+    def _open(self, path: Path) -> None:
+        if not path.exists():
+            self.directory.mkdir(parents=True, exist_ok=True)
+            create_database(path)
+        else:
+            conn = _connect(path)
+            try:
+                _initialize(conn)
+            finally:
+                conn.close()
+
+    def open_tenants(self) -> list[str]:
+        with self._lock:
+            return list(self._pools)
+
+    def ready_pools(self) -> list[tuple[str, TenantPool]]:
+        """Open tenants whose database is ready, with their pools, without touching the LRU order."""
+        with self._lock:
+            return [(tenant, pool) for tenant, pool in self._pools.items() if pool.ready]
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), OrderedDict()
+        for pool in pools:
+            pool.close()
+
+
+_tenants = TenantRegistry(TENANTS_DIR, MAX_OPEN_TENANTS, TENANT_POOL_SIZE)
+
+
+def tenant_registry() -> TenantRegistry:
+    return _tenants
+
+
+def tenancy_enabled() -> bool:
+    return _tenants.enabled
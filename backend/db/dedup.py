@@ -0,0 +1,50 @@
+"""transactions.dedup_key: the content hash transactions are deduplicated by.
+
+Ingestion computes it for every new transaction (DedupKeys in
+ingestion/duplicate_checker.py). Migration 014 backfilled stored ones through
+the same function, registered as the SQL function dedup_key(), so both
+produce the same keys.
+"""
+
+import sqlite3
+
+# hashlib's own blake2b implementation. Importing hashlib also loads OpenSSL
+# (_hashlib), about 3.5 MB of RSS in every ingest process, for this one hash;
+# the digests are identical, so stored keys are unaffected.
+from _blake2 import blake2b
+
+# Columns dedup_key() hashes, in the order the SQL function takes them
+DEDUP_KEY_FIELDS = (
+    "source_type", "source_id", "date", "amount", "description",
+    "installment_number", "installment_total", "original_id",
+)
+
+
+def dedup_key(txn: dict, occurrence: int = 0) -> str:
+    """Content hash identifying a transaction within its source.
+
+    With an original_id the key is the source plus that id. Without one it
+    hashes the date, amount, normalized description and installment fields,
+    and occurrence tells identical rows of one batch apart (two equal
+    coffees on one day). The key is kept when a transaction is edited, so it
+    still matches the source row on the next ingest.
+    """
+    if txn.get("original_id") is not None:
+        parts = [txn["source_type"], txn["source_id"], "id", txn["original_id"]]
+    else:
+        description = " ".join((txn.get("description") or "").split()).casefold()
+        parts = [txn["source_type"], txn["source_id"], txn["date"], f"{txn['amount']:.2f}", description,
+                 txn.get("installment_number"), txn.get("installment_total")]
+    if occurrence:
+        parts.append(occurrence)
+    return blake2b("\x1f".join(map(str, parts)).encode(), digest_size=16).hexdigest()
+
+
+def sql_dedup_key(*values) -> str:
+    """dedup_key() as a SQL function of DEDUP_KEY_FIELDS plus the occurrence."""
+    return dedup_key(dict(zip(DEDUP_KEY_FIELDS, values)), values[-1])
+
+
+def register_sql_function(conn: sqlite3.Connection) -> None:
+    """Make dedup_key(<DEDUP_KEY_FIELDS>, occurrence) callable from SQL on conn."""
+    conn.create_function("dedup_key", len(DEDUP_KEY_FIELDS) + 1, sql_dedup_key, deterministic=True)
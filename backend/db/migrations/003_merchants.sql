@@ -0,0 +1,7 @@
+CREATE TABLE IF NOT EXISTS merchants (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    name TEXT,
+    category_id INTEGER REFERENCES categories(id)
+);
+ALTER TABLE transactions ADD COLUMN merchant_id INTEGER REFERENCES merchants(id);
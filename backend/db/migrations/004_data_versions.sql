@@ -0,0 +1,5 @@
+CREATE TABLE IF NOT EXISTS data_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO data_versions (name, version) VALUES ('instance', abs(random()));
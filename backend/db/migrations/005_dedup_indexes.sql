@@ -0,0 +1,5 @@
+-- check_duplicate filters on source_id plus original_id (or date); with only
+-- single-column indexes SQLite picks idx_transactions_source_id and scans
+-- every row of the source.
+CREATE INDEX IF NOT EXISTS idx_transactions_source_original ON transactions(source_id, original_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_source_date ON transactions(source_id, date);
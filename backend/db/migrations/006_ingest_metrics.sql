@@ -0,0 +1,20 @@
+CREATE TABLE IF NOT EXISTS ingest_metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file TEXT NOT NULL,
+    bank TEXT,
+    ingested_at TEXT NOT NULL DEFAULT (datetime('now')),
+    rows INTEGER NOT NULL DEFAULT 0,
+    inserted INTEGER NOT NULL DEFAULT 0,
+    updated INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    read_ms REAL,
+    parse_ms REAL,
+    normalize_ms REAL,
+    classify_ms REAL,
+    dedup_ms REAL,
+    insert_ms REAL,
+    balance_ms REAL,
+    commit_ms REAL,
+    total_ms REAL
+);
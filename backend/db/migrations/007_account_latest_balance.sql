@@ -0,0 +1,16 @@
+-- The overview needs each account's latest balance. Looking it up in
+-- balance_snapshots costs a MAX(date) per account over its whole history,
+-- so _upsert_balance_snapshot keeps the latest row here as well.
+CREATE TABLE IF NOT EXISTS account_latest_balance (
+    account_id INTEGER PRIMARY KEY REFERENCES accounts(id),
+    date TEXT NOT NULL,
+    balance REAL NOT NULL
+);
+
+INSERT OR REPLACE INTO account_latest_balance (account_id, date, balance)
+SELECT account_id, date, balance FROM (
+    SELECT account_id, date, balance,
+           ROW_NUMBER() OVER (PARTITION BY account_id ORDER BY date DESC, id DESC) AS rn
+    FROM balance_snapshots
+)
+WHERE rn = 1;
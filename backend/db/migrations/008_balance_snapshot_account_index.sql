@@ -0,0 +1,3 @@
+-- The balance series reads one account's snapshots in date order;
+-- idx_balance_snapshots_date alone makes that a scan of every account's rows.
+CREATE INDEX IF NOT EXISTS idx_balance_snapshots_account_date ON balance_snapshots(account_id, date);
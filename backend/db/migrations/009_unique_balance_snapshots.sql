@@ -0,0 +1,9 @@
+-- One snapshot per account per day, enforced so that snapshots can be
+-- upserted with ON CONFLICT(account_id, date). Duplicates left by racing
+-- ingestions are collapsed to the most recently written row first. The
+-- unique index replaces the plain one added by migration 008.
+DELETE FROM balance_snapshots WHERE id NOT IN (
+    SELECT MAX(id) FROM balance_snapshots GROUP BY account_id, date
+);
+DROP INDEX IF EXISTS idx_balance_snapshots_account_date;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_balance_snapshots_account_date_unique ON balance_snapshots(account_id, date);
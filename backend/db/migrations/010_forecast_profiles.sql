@@ -0,0 +1,63 @@
+-- Precomputed inputs of the end-of-month forecast (services/forecast.py),
+-- maintained as transactions arrive and backfilled here from history.
+
+-- Variable-expense totals per account, category and day of month
+CREATE TABLE IF NOT EXISTS spend_profiles (
+    account_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    day_of_month INTEGER NOT NULL,
+    total REAL NOT NULL DEFAULT 0,
+    txn_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (account_id, category_id, day_of_month)
+);
+
+-- Months each account has transactions in (the profile's denominator)
+CREATE TABLE IF NOT EXISTS spend_profile_months (
+    account_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    PRIMARY KEY (account_id, month)
+);
+
+-- Transactions that paid a fixed expense or income, by month
+CREATE TABLE IF NOT EXISTS fixed_matches (
+    kind TEXT NOT NULL CHECK (kind IN ('expense', 'income')),
+    fixed_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    transaction_id INTEGER NOT NULL REFERENCES transactions(id),
+    amount REAL NOT NULL,
+    PRIMARY KEY (kind, fixed_id, month, transaction_id)
+);
+
+-- Card transactions belong to the card's bank account
+CREATE TEMP VIEW txn_accounts AS
+SELECT t.*, CASE WHEN t.source_type = 'bank' THEN t.source_id ELSE cc.account_id END AS account_id
+FROM transactions t
+LEFT JOIN credit_cards cc ON t.source_type = 'credit_card' AND cc.id = t.source_id;
+
+INSERT OR IGNORE INTO spend_profiles (account_id, category_id, day_of_month, total, txn_count)
+SELECT account_id, category_id, CAST(substr(date, 9, 2) AS INTEGER), -SUM(amount), COUNT(*)
+FROM txn_accounts
+WHERE transaction_type = 'variable_expense' AND amount < 0
+  AND account_id IS NOT NULL AND category_id IS NOT NULL
+GROUP BY account_id, category_id, CAST(substr(date, 9, 2) AS INTEGER);
+
+INSERT OR IGNORE INTO spend_profile_months (account_id, month)
+SELECT DISTINCT account_id, substr(date, 1, 7) FROM txn_accounts WHERE account_id IS NOT NULL;
+
+DROP VIEW txn_accounts;
+
+INSERT OR IGNORE INTO fixed_matches (kind, fixed_id, month, transaction_id, amount)
+SELECT kind, fixed_id, month, id, amount FROM (
+    SELECT 'expense' AS kind, t.id, t.amount, COALESCE(t.charged_month, substr(t.date, 1, 7)) AS month,
+           (SELECT fe.id FROM fixed_expenses fe
+            WHERE fe.keyword IS NOT NULL AND instr(lower(t.description), lower(fe.keyword)) > 0
+            ORDER BY fe.id LIMIT 1) AS fixed_id
+    FROM transactions t WHERE t.transaction_type = 'fixed_expense'
+    UNION ALL
+    SELECT 'income', t.id, t.amount, COALESCE(t.charged_month, substr(t.date, 1, 7)),
+           (SELECT fi.id FROM fixed_incomes fi
+            WHERE fi.keyword IS NOT NULL AND instr(lower(t.description), lower(fi.keyword)) > 0
+            ORDER BY fi.id LIMIT 1)
+    FROM transactions t WHERE t.transaction_type = 'income'
+)
+WHERE fixed_id IS NOT NULL;
@@ -0,0 +1,5 @@
+-- Upcoming-payment alerts and the unpaid/paid payment lists filter on
+-- is_paid and read in due_date order. services/wedding.summary and timeline
+-- aggregate every payment, so they scan the table and do not use this index;
+-- a wedding has a few dozen payments, so the scan is not worth avoiding.
+CREATE INDEX IF NOT EXISTS idx_wedding_payments_paid_due ON wedding_payments(is_paid, due_date);
@@ -0,0 +1,15 @@
+-- Month-to-date spend per category, kept current by services/budget.py so
+-- budget figures don't SUM a month of transactions on every request.
+CREATE TABLE IF NOT EXISTS category_month_spend (
+    category_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    spent REAL NOT NULL DEFAULT 0,
+    txn_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (category_id, month)
+);
+
+INSERT OR REPLACE INTO category_month_spend (category_id, month, spent, txn_count)
+SELECT category_id, COALESCE(charged_month, substr(date, 1, 7)), -SUM(amount), COUNT(*)
+FROM transactions
+WHERE amount < 0 AND category_id IS NOT NULL
+GROUP BY category_id, COALESCE(charged_month, substr(date, 1, 7));
@@ -0,0 +1,20 @@
+-- Column mappings for manual statement imports (ingestion/csv_importer.py),
+-- one per statement layout of a source without a scraper.
+CREATE TABLE IF NOT EXISTS import_profiles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    source_type TEXT NOT NULL CHECK (source_type IN ('bank', 'credit_card')),
+    source_id INTEGER NOT NULL,
+    date_column TEXT NOT NULL,
+    date_format TEXT NOT NULL DEFAULT '%d/%m/%Y',
+    amount_column TEXT NOT NULL,
+    description_column TEXT NOT NULL,
+    identifier_column TEXT,
+    memo_column TEXT,
+    currency_column TEXT,
+    balance_column TEXT,
+    negate_amounts INTEGER NOT NULL DEFAULT 0,
+    delimiter TEXT NOT NULL DEFAULT ',',
+    encoding TEXT NOT NULL DEFAULT 'utf-8-sig',
+    skip_rows INTEGER NOT NULL DEFAULT 0
+);
@@ -0,0 +1,27 @@
+-- Content hash per transaction (db/dedup.py), so any source dedups with
+-- one lookup on a unique index, with or without an original_id.
+-- dedup_key() is registered on the migrating connection (MIGRATION_HOOKS).
+ALTER TABLE transactions ADD COLUMN dedup_key TEXT;
+
+-- Identical rows are numbered apart in id order, as ingestion numbers
+-- them within a batch. Duplicates stored before this change, e.g. by
+-- re-ingesting a file, are numbered the same way and stay separate rows;
+-- they aren't merged or deleted here.
+UPDATE transactions SET dedup_key = keyed.dedup_key
+FROM (
+    SELECT id, dedup_key(source_type, source_id, date, amount, description, installment_number,
+                         installment_total, original_id,
+                         ROW_NUMBER() OVER (PARTITION BY base_key ORDER BY id) - 1) AS dedup_key
+    FROM (
+        SELECT *, dedup_key(source_type, source_id, date, amount, description, installment_number,
+                            installment_total, original_id, 0) AS base_key
+        FROM transactions
+    )
+) AS keyed
+WHERE keyed.id = transactions.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_dedup_key ON transactions(dedup_key);
+
+-- Only check_duplicate used these
+DROP INDEX IF EXISTS idx_transactions_original_id;
+DROP INDEX IF EXISTS idx_transactions_source_original;
@@ -0,0 +1,4 @@
+-- Decimal separator of a statement's amounts; the other of '.' and ','
+-- is taken as the thousands separator (ingestion/csv_importer.py).
+ALTER TABLE import_profiles ADD COLUMN decimal_separator TEXT NOT NULL DEFAULT '.'
+    CHECK (decimal_separator IN ('.', ','));
@@ -0,0 +1,31 @@
+-- spend_profiles gains the month of the spend, so the forecast's variable
+-- estimate sums the same earlier months its denominator counts. The primary
+-- key changes, so the table is recreated and backfilled from history as in 010.
+
+CREATE TABLE spend_profiles_by_month (
+    account_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    day_of_month INTEGER NOT NULL,
+    total REAL NOT NULL DEFAULT 0,
+    txn_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (account_id, category_id, month, day_of_month)
+);
+
+-- Card transactions belong to the card's bank account
+CREATE TEMP VIEW txn_accounts AS
+SELECT t.*, CASE WHEN t.source_type = 'bank' THEN t.source_id ELSE cc.account_id END AS account_id
+FROM transactions t
+LEFT JOIN credit_cards cc ON t.source_type = 'credit_card' AND cc.id = t.source_id;
+
+INSERT INTO spend_profiles_by_month (account_id, category_id, month, day_of_month, total, txn_count)
+SELECT account_id, category_id, substr(date, 1, 7), CAST(substr(date, 9, 2) AS INTEGER), -SUM(amount), COUNT(*)
+FROM txn_accounts
+WHERE transaction_type = 'variable_expense' AND amount < 0
+  AND account_id IS NOT NULL AND category_id IS NOT NULL
+GROUP BY account_id, category_id, substr(date, 1, 7), CAST(substr(date, 9, 2) AS INTEGER);
+
+DROP VIEW txn_accounts;
+
+DROP TABLE spend_profiles;
+ALTER TABLE spend_profiles_by_month RENAME TO spend_profiles;
@@ -0,0 +1,105 @@
+"""Per-request SQL profiling.
+
+When CASHBOARD_PROFILING=1, get_connection() opens ProfilingConnection
+instead of a plain sqlite3.Connection, and the API middleware
+(api/profiling.py) starts a RequestProfile for every request. Statements
+run through the connection while a profile is active are counted and
+timed. Statements slower than CASHBOARD_SLOW_QUERY_MS also get their
+EXPLAIN QUERY PLAN captured.
+
+With profiling off, neither the middleware nor the connection subclass is
+installed, so the default request path is unchanged.
+"""
+
+import sqlite3
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+import metrics
+from config import PROFILING, SLOW_QUERY_MS
+
+ENABLED = PROFILING
+
+_statement_seconds = metrics.histogram(
+    "cashboard_sql_statement_seconds", "SQL statement latency (recorded when profiling is on)",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+_current: ContextVar["RequestProfile | None"] = ContextVar("request_profile", default=None)
+
+
+@dataclass
+class SlowStatement:
+    sql: str
+    seconds: float
+    plan: list[str] = field(default_factory=list)
+
+
+@dataclass
+class RequestProfile:
+    statements: int = 0
+    sql_seconds: float = 0.0
+    slowest: SlowStatement | None = None
+    slow: list[SlowStatement] = field(default_factory=list)
+
+
+def start_profile() -> tuple[RequestProfile, object]:
+    """Begin profiling the current context. Returns the profile and a reset token."""
+    profile = RequestProfile()
+    return profile, _current.set(profile)
+
+
+def end_profile(token) -> None:
+    _current.reset(token)
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """sqlite3 connection that records statement timings into the active profile.
+
+    Times cover execute()/executemany() — for a SELECT that is the time to
+    the first row, not the time spent fetching the rest.
+    """
+
+    def execute(self, sql, parameters=(), /):
+        profile = _current.get()
+        if profile is None:
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        cursor = super().execute(sql, parameters)
+        self._record(profile, sql, parameters, time.perf_counter() - start)
+        return cursor
+
+    def executemany(self, sql, seq_of_parameters, /):
+        profile = _current.get()
+        if profile is None:
+            return super().executemany(sql, seq_of_parameters)
+        start = time.perf_counter()
+        cursor = super().executemany(sql, seq_of_parameters)
+        self._record(profile, sql, None, time.perf_counter() - start)
+        return cursor
+
+    def _record(self, profile: RequestProfile, sql: str, parameters, elapsed: float) -> None:
+        profile.statements += 1
+        profile.sql_seconds += elapsed
+        _statement_seconds.observe(elapsed)
+        is_slow = elapsed * 1000 >= SLOW_QUERY_MS
+        is_slowest = profile.slowest is None or elapsed > profile.slowest.seconds
+        if not (is_slow or is_slowest):
+            return
+        stmt = SlowStatement(sql=" ".join(sql.split()), seconds=elapsed)
+        if is_slow:
+            stmt.plan = self._query_plan(sql, parameters)
+            profile.slow.append(stmt)
+        if is_slowest:
+            profile.slowest = stmt
+
+    def _query_plan(self, sql: str, parameters) -> list[str]:
+        if parameters is None:
+            # executemany: the plan doesn't depend on the values bound
+            parameters = [None] * sql.count("?")
+        try:
+            rows = super().execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+        except sqlite3.Error:
+            return []
+        return [row[-1] for row in rows]
@@ -44,6 +44,8 @@ CREATE TABLE IF NOT EXISTS transactions (
     original_id TEXT,
     notes TEXT,
     charged_month TEXT,
+    merchant_id INTEGER REFERENCES merchants(id),
+    dedup_key TEXT,
     created_at TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
@@ -153,9 +155,113 @@ CREATE TABLE IF NOT EXISTS scrape_log (
     error_message TEXT
 );
 
+-- 14. Merchants (canonical merchant per normalized description)
+CREATE TABLE IF NOT EXISTS merchants (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    name TEXT,
+    category_id INTEGER REFERENCES categories(id)
+);
+
+-- 15. Data Versions (per-table change counters; 'instance' identifies the DB)
+CREATE TABLE IF NOT EXISTS data_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+-- 16. Ingest Metrics (per-file stage timings of the ingestion pipeline)
+CREATE TABLE IF NOT EXISTS ingest_metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file TEXT NOT NULL,
+    bank TEXT,
+    ingested_at TEXT NOT NULL DEFAULT (datetime('now')),
+    rows INTEGER NOT NULL DEFAULT 0,
+    inserted INTEGER NOT NULL DEFAULT 0,
+    updated INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    read_ms REAL,
+    parse_ms REAL,
+    normalize_ms REAL,
+    classify_ms REAL,
+    dedup_ms REAL,
+    insert_ms REAL,
+    balance_ms REAL,
+    commit_ms REAL,
+    total_ms REAL
+);
+
+-- 17. Account Latest Balance (newest balance_snapshots row per account)
+CREATE TABLE IF NOT EXISTS account_latest_balance (
+    account_id INTEGER PRIMARY KEY REFERENCES accounts(id),
+    date TEXT NOT NULL,
+    balance REAL NOT NULL
+);
+
+-- 18. Spend Profiles (variable-expense totals per account/category/month/day of month)
+CREATE TABLE IF NOT EXISTS spend_profiles (
+    account_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    day_of_month INTEGER NOT NULL,
+    total REAL NOT NULL DEFAULT 0,
+    txn_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (account_id, category_id, month, day_of_month)
+);
+
+-- 19. Spend Profile Months (months each account has transactions in)
+CREATE TABLE IF NOT EXISTS spend_profile_months (
+    account_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    PRIMARY KEY (account_id, month)
+);
+
+-- 20. Fixed Matches (transactions that paid a fixed expense/income, by month)
+CREATE TABLE IF NOT EXISTS fixed_matches (
+    kind TEXT NOT NULL CHECK (kind IN ('expense', 'income')),
+    fixed_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    transaction_id INTEGER NOT NULL REFERENCES transactions(id),
+    amount REAL NOT NULL,
+    PRIMARY KEY (kind, fixed_id, month, transaction_id)
+);
+
+-- 21. Category Month Spend (running spend per category per budget month)
+CREATE TABLE IF NOT EXISTS category_month_spend (
+    category_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    spent REAL NOT NULL DEFAULT 0,
+    txn_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (category_id, month)
+);
+
+-- 22. Import Profiles (column mappings for manual CSV/XLSX statement imports)
+CREATE TABLE IF NOT EXISTS import_profiles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    source_type TEXT NOT NULL CHECK (source_type IN ('bank', 'credit_card')),
+    source_id INTEGER NOT NULL,
+    date_column TEXT NOT NULL,
+    date_format TEXT NOT NULL DEFAULT '%d/%m/%Y',
+    amount_column TEXT NOT NULL,
+    description_column TEXT NOT NULL,
+    identifier_column TEXT,
+    memo_column TEXT,
+    currency_column TEXT,
+    balance_column TEXT,
+    negate_amounts INTEGER NOT NULL DEFAULT 0,
+    delimiter TEXT NOT NULL DEFAULT ',',
+    encoding TEXT NOT NULL DEFAULT 'utf-8-sig',
+    skip_rows INTEGER NOT NULL DEFAULT 0,
+    decimal_separator TEXT NOT NULL DEFAULT '.' CHECK (decimal_separator IN ('.', ','))
+);
+
 -- Indexes
 CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date);
 CREATE INDEX IF NOT EXISTS idx_transactions_source_id ON transactions(source_id);
 CREATE INDEX IF NOT EXISTS idx_transactions_category_id ON transactions(category_id);
-CREATE INDEX IF NOT EXISTS idx_transactions_original_id ON transactions(original_id);
 CREATE INDEX IF NOT EXISTS idx_balance_snapshots_date ON balance_snapshots(date);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_balance_snapshots_account_date_unique ON balance_snapshots(account_id, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_source_date ON transactions(source_id, date);
+CREATE INDEX IF NOT EXISTS idx_wedding_payments_paid_due ON wedding_payments(is_paid, due_date);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_dedup_key ON transactions(dedup_key);
@@ -1,18 +1,61 @@
 """Automatic transaction classification.
 
-Matches transaction descriptions against classification_rules,
-fixed_expenses, and fixed_incomes keywords. Also applies billing day
-logic for credit card transactions.
+Matches transactions against merchant categories, then description
+keywords in classification_rules, fixed_expenses, and fixed_incomes.
+Also applies billing day logic for credit card transactions.
 """
 
 import sqlite3
 from datetime import date
 
+import metrics
+from cache import LRUCache
+from db.database import get_data_version
+
+# Tables whose contents a ClassificationContext is built from
+CONTEXT_TABLES = ("classification_rules", "fixed_expenses", "fixed_incomes", "merchants", "credit_cards")
+
+# Compiled contexts, keyed by the data version stamp they were built at
+_context_cache = LRUCache(maxsize=8)
+
+# (version stamp, merchant_id, lowercased description) → (category_id, transaction_type)
+_result_memo = LRUCache(maxsize=8192)
+
+
+_classified_total = metrics.counter(
+    "cashboard_classified_transactions",
+    "Transactions classified, by outcome (uncategorized = category_id 1)",
+    ("outcome",),
+)
+_categorized = _classified_total.labels("categorized")
+_uncategorized = _classified_total.labels("uncategorized")
+
+
+def classification_cache_stats() -> tuple[int, int]:
+    """Return (hits, misses) of the classification result memo."""
+    return _result_memo.hits, _result_memo.misses
+
+
+class MemoStats:
+    """Result memo hits and misses of the classify_transaction() calls it is passed to.
+
+    Unlike classification_cache_stats(), which is process-wide, this counts
+    only one caller's lookups, e.g. one file's ingest while others run.
+    """
+
+    __slots__ = ("hits", "misses")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
 
 class ClassificationContext:
-    """Cache of classification data, loaded once per ingestion batch."""
+    """Cache of classification data with keywords pre-lowered for matching."""
+
+    def __init__(self, db: sqlite3.Connection, version: tuple[int, ...] | None = None):
+        self.version = version if version is not None else get_data_version(db, *CONTEXT_TABLES)
 
-    def __init__(self, db: sqlite3.Connection):
         # Sort rules so exact > starts_with > contains for priority ordering
         _type_order = {"exact": 0, "starts_with": 1, "contains": 2}
         rules = db.execute(
@@ -23,28 +66,60 @@ class ClassificationContext:
             key=lambda r: _type_order.get(r["match_type"], 99),
         )
 
+        self.merchant_categories = {
+            r["id"]: r["category_id"] for r in db.execute(
+                "SELECT id, category_id FROM merchants WHERE category_id IS NOT NULL"
+            ).fetchall()
+        }
+
         self.fixed_expenses = [
             dict(r) for r in db.execute(
-                "SELECT id, keyword FROM fixed_expenses WHERE keyword IS NOT NULL"
+                "SELECT id, keyword FROM fixed_expenses WHERE keyword IS NOT NULL ORDER BY id"
             ).fetchall()
         ]
 
         self.fixed_incomes = [
             dict(r) for r in db.execute(
-                "SELECT id, keyword FROM fixed_incomes WHERE keyword IS NOT NULL"
+                "SELECT id, keyword FROM fixed_incomes WHERE keyword IS NOT NULL ORDER BY id"
             ).fetchall()
         ]
 
         self.billing_days = {}
-        for r in db.execute("SELECT id, billing_day FROM credit_cards").fetchall():
+        self.card_accounts = {}
+        for r in db.execute("SELECT id, billing_day, account_id FROM credit_cards").fetchall():
             if r["billing_day"] is not None:
                 self.billing_days[r["id"]] = r["billing_day"]
+            self.card_accounts[r["id"]] = r["account_id"]
+
+        # Compiled forms used by classify_transaction
+        self.compiled_rules = [
+            (r["keyword"].lower(), r["match_type"], r["category_id"])
+            for r in self.classification_rules
+        ]
+        self.fixed_expense_keywords = [fe["keyword"].lower() for fe in self.fixed_expenses if fe["keyword"]]
+        self.fixed_income_keywords = [fi["keyword"].lower() for fi in self.fixed_incomes if fi["keyword"]]
+
+
+def get_classification_context(db: sqlite3.Connection) -> ClassificationContext:
+    """Return the process-wide context for db, rebuilt only after a version bump.
+
+    Costs one small data_versions query when nothing changed.
+    """
+    version = get_data_version(db, *CONTEXT_TABLES)
+    ctx = _context_cache.get(version)
+    if ctx is None:
+        ctx = ClassificationContext(db, version)
+        _context_cache.set(version, ctx)
+    return ctx
 
 
 def _matches_keyword(description: str, keyword: str, match_type: str) -> bool:
     """Case-insensitive keyword matching."""
-    desc = description.lower()
-    kw = keyword.lower()
+    return _matches_lowered(description.lower(), keyword.lower(), match_type)
+
+
+def _matches_lowered(desc: str, kw: str, match_type: str) -> bool:
+    """Keyword matching on already-lowercased strings."""
     if match_type == "exact":
         return desc == kw
     elif match_type == "starts_with":
@@ -53,52 +128,71 @@ def _matches_keyword(description: str, keyword: str, match_type: str) -> bool:
         return kw in desc
 
 
-def classify_transaction(db: sqlite3.Connection, txn: dict, ctx: ClassificationContext | None = None) -> dict:
+def classify_transaction(db: sqlite3.Connection, txn: dict, ctx: ClassificationContext | None = None,
+                         memo_stats: MemoStats | None = None) -> dict:
     """Classify a transaction in-place. Returns the modified txn dict.
 
     Priority:
-    1. classification_rules → category_id (exact > starts_with > contains)
+    1. merchants.category_id for txn["merchant_id"], else
+       classification_rules → category_id (exact > starts_with > contains)
     2. fixed_expenses keywords → transaction_type = "fixed_expense"
     3. fixed_incomes keywords → transaction_type = "income"
     4. Rules matched but no fixed match → transaction_type = "variable_expense"
     5. No match → category_id = 1, transaction_type = None
+
+    Results are memoized per (ctx.version, merchant_id, description), so a
+    repeated description skips the rule scans until the rules change. The
+    lookup's hit or miss is counted in memo_stats, if given.
     """
     if ctx is None:
-        ctx = ClassificationContext(db)
+        ctx = get_classification_context(db)
 
     description = txn.get("description") or ""
     if not description.strip():
         txn["category_id"] = 1
         txn["transaction_type"] = None
+        _uncategorized.inc()
+        _apply_billing_day_logic(txn, ctx.billing_days)
+        return txn
+
+    # Same description under the same rules → same result; skip the scans
+    desc = description.lower()
+    memo_key = (ctx.version, txn.get("merchant_id"), desc)
+    cached = _result_memo.get(memo_key)
+    if cached is not None:
+        if memo_stats is not None:
+            memo_stats.hits += 1
+        txn["category_id"], txn["transaction_type"] = cached
+        _count_outcome(txn)
         _apply_billing_day_logic(txn, ctx.billing_days)
         return txn
 
-    # Step 1: Match classification rules (already sorted by priority)
+    # Step 1: Merchant category, then classification rules (already sorted by priority)
     rule_matched = False
-    for rule in ctx.classification_rules:
-        if _matches_keyword(description, rule["keyword"], rule["match_type"]):
-            txn["category_id"] = rule["category_id"]
-            rule_matched = True
-            break
+    merchant_category = ctx.merchant_categories.get(txn.get("merchant_id"))
+    if merchant_category is not None:
+        txn["category_id"] = merchant_category
+        rule_matched = True
+    else:
+        for keyword, match_type, category_id in ctx.compiled_rules:
+            if _matches_lowered(desc, keyword, match_type):
+                txn["category_id"] = category_id
+                rule_matched = True
+                break
 
     if not rule_matched:
         txn["category_id"] = 1
 
     # Step 2: Match fixed_expenses
     fixed_matched = False
-    for fe in ctx.fixed_expenses:
-        if fe["keyword"] and fe["keyword"].lower() in description.lower():
-            txn["transaction_type"] = "fixed_expense"
-            fixed_matched = True
-            break
+    if any(kw in desc for kw in ctx.fixed_expense_keywords):
+        txn["transaction_type"] = "fixed_expense"
+        fixed_matched = True
 
     # Step 3: Match fixed_incomes (only if no fixed_expense matched)
-    if not fixed_matched:
-        for fi in ctx.fixed_incomes:
-            if fi["keyword"] and fi["keyword"].lower() in description.lower():
-                txn["transaction_type"] = "income"
-                fixed_matched = True
-                break
+    if not fixed_matched and any(kw in desc for kw in ctx.fixed_income_keywords):
+        txn["transaction_type"] = "income"
+        fixed_matched = True
 
     # Step 4/5: Determine transaction_type when no fixed match
     if not fixed_matched:
@@ -107,10 +201,18 @@ def classify_transaction(db: sqlite3.Connection, txn: dict, ctx: ClassificationC
         else:
             txn["transaction_type"] = None
 
+    _result_memo.set(memo_key, (txn["category_id"], txn["transaction_type"]))
+    if memo_stats is not None:
+        memo_stats.misses += 1
+    _count_outcome(txn)
     _apply_billing_day_logic(txn, ctx.billing_days)
     return txn
 
 
+def _count_outcome(txn: dict) -> None:
+    (_uncategorized if txn["category_id"] == 1 else _categorized).inc()
+
+
 def _apply_billing_day_logic(txn: dict, billing_days: dict) -> None:
     """Set charged_month for credit card transactions based on billing day.
 
@@ -141,3 +243,37 @@ def _apply_billing_day_logic(txn: dict, billing_days: dict) -> None:
             charged = date(txn_date.year, txn_date.month + 1, 1)
 
     txn["charged_month"] = charged.strftime("%Y-%m")
+
+
+def recompute_charged_month(db: sqlite3.Connection, card_id: int | None = None) -> int:
+    """Recompute charged_month for stored credit card transactions in one UPDATE.
+
+    Same rule as _apply_billing_day_logic, evaluated by SQLite for every row
+    of the card (or of all cards when card_id is None). Used for backfills and
+    after a card's billing_day changes; the months of the rows' fixed_matches
+    move with them. Returns the number of transactions updated. Does not
+    commit.
+    """
+    sql = (
+        "UPDATE transactions SET charged_month = ("
+        "  SELECT CASE"
+        "    WHEN cc.billing_day IS NULL THEN NULL"
+        "    WHEN CAST(strftime('%d', transactions.date) AS INTEGER) <= cc.billing_day"
+        "      THEN strftime('%Y-%m', transactions.date)"
+        "    ELSE strftime('%Y-%m', transactions.date, 'start of month', '+1 month')"
+        "  END"
+        "  FROM credit_cards cc WHERE cc.id = transactions.source_id"
+        ") WHERE source_type = 'credit_card'"
+    )
+    card_filter, params = "", ()
+    if card_id is not None:
+        card_filter, params = " AND source_id = ?", (card_id,)
+    updated = db.execute(sql + card_filter, params).rowcount
+    db.execute(
+        "UPDATE fixed_matches SET month = ("
+        "  SELECT COALESCE(t.charged_month, substr(t.date, 1, 7)) FROM transactions t"
+        "  WHERE t.id = fixed_matches.transaction_id"
+        f") WHERE transaction_id IN (SELECT id FROM transactions WHERE source_type = 'credit_card'{card_filter})",
+        params,
+    )
+    return updated
@@ -0,0 +1,416 @@
+"""Manual statement import (CSV / XLSX) for sources without a scraper.
+
+An import profile (import_profiles) maps the columns of one statement
+layout to transaction fields and names the bank account or card the
+statement belongs to. Rows are read CHUNK_ROWS at a time and go through the
+same normalize → classify → dedup → insert steps as scraper files in
+ingest_file; the forecast and budget counters are flushed after every
+chunk, so memory use is bounded by the chunk, not the statement. The whole
+import commits once.
+
+Statements rarely carry a transaction reference; rows without one are
+deduplicated by their dedup_key (date, amount, description), so
+re-importing an overlapping statement skips the rows already stored.
+
+Usage:
+    cd backend && python -m ingestion.csv_importer <profile_id> path/to/statement.csv
+"""
+
+import codecs
+import csv
+import io
+import re
+import sqlite3
+import sys
+import time
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator
+
+from db.database import bump_data_version, get_connection
+from ingestion.classifier import MemoStats, classify_transaction, get_classification_context
+from ingestion.duplicate_checker import DedupKeys
+from ingestion.ingest import (
+    STAGES,
+    _export_metrics,
+    _finish_timings,
+    _insert_transactions,
+    _log_scrape,
+    _normalize_transaction,
+    _record_ingest_metrics,
+    _store_transaction,
+    _upsert_balance_snapshots,
+)
+from ingestion.merchants import MerchantResolver
+from services import budget
+from services.forecast import SpendRecorder
+
+FORMATS = ("csv", "xlsx")
+CHUNK_ROWS = 5000
+
+# Row errors reported in full; further ones are only counted
+MAX_ERRORS = 100
+
+# Transaction fields a profile can map, each from its <field>_column
+MAPPED_FIELDS = ("date", "amount", "description", "identifier", "memo", "currency", "balance")
+
+# Stands in for the scraper's bank name in normalization and metrics
+SOURCE_LABEL = "import"
+
+# Decimal separators a profile can set; the other one separates thousands
+DECIMAL_SEPARATORS = (".", ",")
+
+# Currency signs and codes, and spaces, around or inside an amount
+_AMOUNT_NOISE = re.compile(r"[^\d.,()\-]")
+
+
+class StatementError(ValueError):
+    """The statement can't be read with the import profile."""
+
+
+def get_profile(db: sqlite3.Connection, profile_id: int) -> dict | None:
+    row = db.execute("SELECT * FROM import_profiles WHERE id = ?", (profile_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def import_statement(db: sqlite3.Connection, profile: dict, stream: BinaryIO, fmt: str = "csv",
+                     name: str = "upload", progress: Callable[[dict], None] | None = None) -> dict:
+    """Import a statement read from a binary file object, and commit.
+
+    Returns the same shape as ingest_file plus "error_rows", the number of
+    rows that could not be imported (only the first MAX_ERRORS are listed
+    in "errors"). progress, if given, is called with the running result
+    after each chunk. Raises StatementError, with nothing written, when the
+    file can't be read or lacks a mapped column.
+    """
+    if fmt not in FORMATS:
+        raise StatementError(f"Unsupported statement format: {fmt}")
+    if profile["decimal_separator"] not in DECIMAL_SEPARATORS:
+        raise StatementError(f"Unsupported decimal separator: {profile['decimal_separator']}")
+    if profile["skip_rows"] < 0:
+        raise StatementError("skip_rows can't be negative")
+    if fmt == "csv":
+        _check_csv_options(profile)
+
+    result = {"file": name, "inserted": 0, "updated": 0, "skipped": 0, "errors": [], "error_rows": 0,
+              "classify_cache_hits": 0, "classify_cache_misses": 0, "rows": 0}
+    memo_stats = MemoStats()
+    clock = time.perf_counter
+    timings = dict.fromkeys(STAGES, 0.0)
+    started = clock()
+    source_type, source_id = profile["source_type"], profile["source_id"]
+    reader = _csv_rows(stream, profile) if fmt == "csv" else _xlsx_rows(stream)
+
+    try:
+        t0 = clock()
+        rows = islice(reader, profile["skip_rows"], None)
+        header = next(rows, None)
+        timings["read"] += clock() - t0
+        if header is None:
+            raise StatementError("Statement has no header row")
+        columns = _column_index(header, profile)
+
+        ctx = get_classification_context(db)
+        merchants = MerchantResolver(db)
+        spend = SpendRecorder(ctx)
+        keys = DedupKeys()
+        # Balance rows: the first and last seen, and (date, first, last balance) on the newest date
+        first_dated = last_dated = newest = None
+        line = 0
+
+        while True:
+            t0 = clock()
+            chunk = list(islice(rows, CHUNK_ROWS))
+            timings["read"] += clock() - t0
+            if not chunk:
+                break
+
+            txns = []
+            for row in chunk:
+                line += 1
+                if not any(cell not in (None, "") for cell in row):
+                    continue
+                result["rows"] += 1
+                try:
+                    t0 = clock()
+                    raw, balance = _parse_row(row, columns, profile)
+                    t1 = clock()
+                    txn = _normalize_transaction(raw, source_type, source_id, SOURCE_LABEL, merchants, keys)
+                    t2 = clock()
+                    classify_transaction(db, txn, ctx=ctx, memo_stats=memo_stats)
+                    timings["parse"] += t1 - t0
+                    timings["normalize"] += t2 - t1
+                    timings["classify"] += clock() - t2
+                except Exception as e:
+                    result["error_rows"] += 1
+                    if len(result["errors"]) < MAX_ERRORS:
+                        result["errors"].append(f"Row {line}: {e}")
+                    continue
+                txns.append(txn)
+                if balance is not None:
+                    first_dated = first_dated or txn["date"]
+                    last_dated = txn["date"]
+                    if newest is None or txn["date"] > newest[0]:
+                        newest = (txn["date"], balance, balance)
+                    elif txn["date"] == newest[0]:
+                        newest = (newest[0], newest[1], balance)
+
+            new_txns = _store_chunk(db, txns, spend, result, timings)
+            t0 = clock()
+            spend.flush(db)
+            budget.record_transactions(db, new_txns)
+            timings["insert"] += clock() - t0
+            if progress is not None:
+                progress(result)
+
+        # Only bank accounts have balance snapshots; the newest row's balance is the closing one.
+        # Within the newest date that is the first row of a newest-first statement, else the last.
+        latest_balance = None
+        if newest is not None:
+            latest_balance = (newest[0], newest[1] if first_dated > last_dated else newest[2])
+        if latest_balance is not None and source_type == "bank":
+            t0 = clock()
+            _upsert_balance_snapshots(db, [(source_id, *latest_balance)])
+            timings["balance"] += clock() - t0
+
+        total = result["inserted"] + result["updated"] + result["skipped"]
+        _log_scrape(db, source_type, source_id, "success", total)
+        changed = ["transactions"] if result["inserted"] or result["updated"] else []
+        if latest_balance is not None and source_type == "bank":
+            changed.append("balance_snapshots")
+        if changed:
+            bump_data_version(db, *changed)
+
+        t0 = clock()
+        db.commit()
+        timings["commit"] += clock() - t0
+    except (UnicodeDecodeError, csv.Error) as e:
+        db.rollback()
+        raise StatementError(f"Can't read statement: {e}") from e
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        reader.close()
+
+    _finish_timings(result, timings, started)
+    _record_ingest_metrics(db, result, f"{SOURCE_LABEL}:{profile['name']}")
+    db.commit()
+    _export_metrics(result, SOURCE_LABEL)
+    result["classify_cache_hits"] = memo_stats.hits
+    result["classify_cache_misses"] = memo_stats.misses
+    return result
+
+
+def import_file(file_path: str | Path, profile_id: int, db: sqlite3.Connection | None = None,
+                progress: Callable[[dict], None] | None = None) -> dict:
+    """Import a statement file; the format is taken from its extension."""
+    file_path = Path(file_path)
+    close_db = db is None
+    if db is None:
+        db = get_connection()
+    try:
+        profile = get_profile(db, profile_id)
+        if profile is None:
+            raise StatementError(f"Import profile {profile_id} not found")
+        with file_path.open("rb") as f:
+            return import_statement(db, profile, f, file_path.suffix.lower().lstrip("."),
+                                    name=str(file_path), progress=progress)
+    finally:
+        if close_db:
+            db.close()
+
+
+def _store_chunk(db: sqlite3.Connection, txns: list[dict], spend: SpendRecorder,
+                 result: dict, timings: dict[str, float]) -> list[dict]:
+    """Dedup and store one chunk's transactions; returns the inserted ones.
+
+    One lookup on the dedup_key index finds the rows already stored. Statement rows
+    are completed, so stored completed rows are skipped and only stored
+    pending ones go through check_duplicate; the rest are new and inserted
+    with one executemany.
+    """
+    if not txns:
+        return []
+    clock = time.perf_counter
+    t0 = clock()
+    keys = list({txn["dedup_key"] for txn in txns})
+    stored = dict(db.execute(
+        f"SELECT dedup_key, status FROM transactions WHERE dedup_key IN ({', '.join('?' for _ in keys)})",
+        keys,
+    ).fetchall())
+    timings["dedup"] += clock() - t0
+
+    new_txns, fresh, fresh_keys = [], [], set()
+    for txn in txns:
+        key = txn["dedup_key"]
+        status = stored.get(key)
+        if status == "pending":
+            result[_store_transaction(db, txn, spend, new_txns, timings)] += 1
+        elif status is not None or key in fresh_keys:
+            # Stored already, or an identifier repeated within the chunk
+            result["skipped"] += 1
+        else:
+            fresh_keys.add(key)
+            fresh.append(txn)
+
+    t0 = clock()
+    for txn, txn_id in zip(fresh, _insert_transactions(db, fresh)):
+        if txn_id is None:
+            # Stored by a concurrent sync or import since the lookup above
+            result["skipped"] += 1
+            continue
+        spend.add(txn, txn_id)
+        new_txns.append(txn)
+        result["inserted"] += 1
+    timings["insert"] += clock() - t0
+    return new_txns
+
+
+def _check_csv_options(profile: dict) -> None:
+    if len(profile["delimiter"]) != 1:
+        raise StatementError("delimiter must be a single character")
+    try:
+        codecs.lookup(profile["encoding"])
+    except LookupError:
+        raise StatementError(f"Unknown encoding: {profile['encoding']}") from None
+
+
+def _csv_rows(stream: BinaryIO, profile: dict) -> Iterator[list[str]]:
+    text = io.TextIOWrapper(stream, encoding=profile["encoding"], newline="")
+    try:
+        yield from csv.reader(text, delimiter=profile["delimiter"])
+    finally:
+        # Leave the caller's stream open
+        text.detach()
+
+
+def _xlsx_rows(stream: BinaryIO) -> Iterator[tuple]:
+    """Rows of the first sheet, read without loading the workbook into memory."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise StatementError("XLSX import needs openpyxl (pip install openpyxl)") from None
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise StatementError(f"Can't read workbook: {e}") from e
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _column_index(header, profile: dict) -> dict[str, int]:
+    """Position of each mapped field's column in the header row."""
+    names = [str(cell).strip() if cell is not None else "" for cell in header]
+    columns = {}
+    for field in MAPPED_FIELDS:
+        column = profile[f"{field}_column"]
+        if column is None:
+            continue
+        if column not in names:
+            raise StatementError(f"Column '{column}' not found in the statement header")
+        columns[field] = names.index(column)
+    return columns
+
+
+def _parse_row(row, columns: dict[str, int], profile: dict) -> tuple[dict, float | None]:
+    """Convert a statement row to (scraper-style txn, balance)."""
+    cells = {}
+    for field, i in columns.items():
+        if i >= len(row):
+            raise StatementError(f"row has {len(row)} cells, no '{profile[f'{field}_column']}' column")
+        value = row[i]
+        if isinstance(value, str):
+            value = value.strip() or None
+        cells[field] = value
+
+    txn_date = _parse_date(cells["date"], profile["date_format"])
+    decimal = profile["decimal_separator"]
+    amount = _parse_amount(cells["amount"], decimal)
+    if amount is None:
+        raise ValueError("missing amount")
+    if profile["negate_amounts"]:
+        amount = -amount
+    description = cells["description"]
+    description = str(description) if description is not None else None
+
+    memo = cells.get("memo")
+    raw = {
+        "date": txn_date,
+        "chargedAmount": amount,
+        "chargedCurrency": cells.get("currency"),
+        "description": description,
+        "identifier": cells.get("identifier"),
+        "memo": str(memo) if memo is not None else None,
+        "status": "completed",
+    }
+    return raw, _parse_amount(cells.get("balance"), decimal)
+
+
+def _parse_date(value, fmt: str) -> str:
+    # Statement dates are local already, unlike the scraper's UTC timestamps
+    if value is None:
+        raise ValueError("missing date")
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return _parse_date_text(str(value), fmt)
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_text(text: str, fmt: str) -> str:
+    return datetime.strptime(text, fmt).date().isoformat()
+
+
+def _parse_amount(value, decimal: str = ".") -> float | None:
+    """Parse an amount cell, e.g. "1,234.50", "(50.00)" or "50.00-".
+
+    Raises ValueError for text that isn't a number written with the
+    profile's separators, such as "1.234,50" when the decimal separator is
+    "." — a wrong guess would import a wrong amount without any error.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = _AMOUNT_NOISE.sub("", str(value).replace("\u2212", "-"))
+    # Accounting negatives: parenthesised, or a leading or trailing minus
+    negative = text[:1] == "(" and text[-1:] == ")"
+    if negative:
+        text = text[1:-1]
+    if text[:1] == "-" or text[-1:] == "-":
+        if negative:
+            raise ValueError(f"invalid amount: {value}")
+        negative = True
+        text = text[1:] if text[0] == "-" else text[:-1]
+    match = _amount_pattern(decimal).fullmatch(text)
+    if match is None:
+        raise ValueError(f"invalid amount: {value}")
+    amount = float(f"{re.sub(r'[.,]', '', match[1])}.{match[2] or 0}")
+    return -amount if negative else amount
+
+
+@lru_cache(maxsize=None)
+def _amount_pattern(decimal: str) -> re.Pattern:
+    # Digits with or without correctly grouped thousands, then the decimals
+    thousands = re.escape("," if decimal == "." else ".")
+    return re.compile(rf"(\d{{1,3}}(?:{thousands}\d{{3}})+|\d+)(?:{re.escape(decimal)}(\d+))?")
+
+
+def _print_progress(result: dict) -> None:
+    print(f"  {result['rows']} rows: +{result['inserted']} new, ~{result['updated']} updated, "
+          f"={result['skipped']} skipped, {result['error_rows']} errors")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(2)
+    result = import_file(sys.argv[2], int(sys.argv[1]), progress=_print_progress)
+    print(f"Done in {result['total_ms'] / 1000:.1f}s: {result['inserted']} inserted, "
+          f"{result['updated']} updated, {result['skipped']} skipped, {result['error_rows']} errors")
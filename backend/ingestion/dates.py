@@ -0,0 +1,82 @@
+"""UTC timestamp → Israel calendar date conversion.
+
+Scraper dates are UTC ISO 8601 strings (``2025-06-10T21:00:00.000Z``) and
+repeat heavily within a dump. IsraelDateConverter memoizes per string and,
+on a miss, looks the UTC day up in a precomputed table holding the UTC
+time at which the Israel date rolls over on that day (21:00 or 22:00,
+depending on DST), instead of going through datetime/ZoneInfo per value.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+ISRAEL_TZ = ZoneInfo("Asia/Jerusalem")
+
+
+class IsraelDateConverter:
+    """Converts UTC ISO timestamps to local dates (YYYY-MM-DD).
+
+    The day table assumes a timezone east of UTC (local midnight falls on
+    the previous UTC day), which holds for Asia/Jerusalem.
+    """
+
+    def __init__(self, tz: ZoneInfo = ISRAEL_TZ, memo_size: int = 4096):
+        self._tz = tz
+        # Per-string memo; a plain dict (reset when full) is cheaper than an
+        # LRU here, since a lookup costs about as much as a table hit
+        self._memo: dict[str, str] = {}
+        self._memo_size = memo_size
+        # UTC date → (UTC "HH:MM:SS" of the next local midnight, that date, the next date)
+        self._days: dict[str, tuple[str, str, str]] = {}
+        self._years: set[int] = set()
+
+    def prepare(self, first_year: int, last_year: int) -> None:
+        """Precompute the day table for a range of years."""
+        for year in range(first_year, last_year + 1):
+            self._prepare_year(year)
+
+    def to_date(self, iso_str: str | None) -> str | None:
+        if not iso_str:
+            return None
+        result = self._memo.get(iso_str)
+        if result is None:
+            result = self._convert(iso_str)
+            if len(self._memo) >= self._memo_size:
+                self._memo.clear()
+            self._memo[iso_str] = result
+        return result
+
+    def _convert(self, iso_str: str) -> str:
+        # Fast path: YYYY-MM-DDTHH:MM:SS[.fff]Z. Fixed-width times compare
+        # chronologically as strings.
+        if iso_str[-1:] == "Z" and len(iso_str) >= 20 and iso_str[10] == "T":
+            day = self._days.get(iso_str[:10])
+            if day is None and iso_str[:4].isdigit() and int(iso_str[:4]) not in self._years:
+                self._prepare_year(int(iso_str[:4]))
+                day = self._days.get(iso_str[:10])
+            if day is not None:
+                cutoff, same, following = day
+                return same if iso_str[11:19] < cutoff else following
+
+        dt = datetime.fromisoformat(iso_str.replace("Z", "+00:00"))
+        return dt.astimezone(self._tz).strftime("%Y-%m-%d")
+
+    def _prepare_year(self, year: int) -> None:
+        day = date(year, 1, 1)
+        while day.year == year:
+            following = day + timedelta(days=1)
+            midnight = datetime(following.year, following.month, following.day, tzinfo=self._tz)
+            rollover = midnight.astimezone(timezone.utc)
+            # Whole UTC day maps to `day` if local midnight lands on the next UTC day
+            cutoff = rollover.strftime("%H:%M:%S") if rollover.date() == day else "24:00:00"
+            self._days[day.isoformat()] = (cutoff, day.isoformat(), following.isoformat())
+            day = following
+        self._years.add(year)
+
+
+_default_converter = IsraelDateConverter()
+
+
+def to_israel_date(iso_str: str | None) -> str | None:
+    """Convert a UTC ISO 8601 string to an Israel date (YYYY-MM-DD)."""
+    return _default_converter.to_date(iso_str)
@@ -1,40 +1,40 @@
 import sqlite3
 
+from db.dedup import dedup_key
+
+
+class DedupKeys:
+    """Assigns dedup keys across one batch, numbering identical rows without an original_id."""
+
+    def __init__(self):
+        self._seen: dict[str, int] = {}
+
+    def __call__(self, txn: dict) -> str:
+        key = dedup_key(txn)
+        if txn.get("original_id") is not None:
+            return key
+        occurrence = self._seen.get(key, 0)
+        self._seen[key] = occurrence + 1
+        return dedup_key(txn, occurrence) if occurrence else key
+
 
 def check_duplicate(db: sqlite3.Connection, txn: dict) -> tuple[str, dict | None]:
     """Check if a transaction already exists in the database.
 
-    Returns (action, existing_row) where action is one of:
+    One lookup on the unique dedup_key index (computed here if the txn has
+    none). Returns (action, existing_row) where action is one of:
     - "new": no match found
     - "duplicate": exact match found, skip
     - "pending_to_completed": existing pending record should be updated
     """
-    original_id = txn.get("original_id")
-    source_type = txn["source_type"]
-    source_id = txn["source_id"]
-
-    if original_id is not None:
-        row = db.execute(
-            "SELECT * FROM transactions WHERE original_id = ? AND source_type = ? AND source_id = ?",
-            (original_id, source_type, source_id),
-        ).fetchone()
-        if row:
-            existing = dict(row)
-            if existing["status"] == "pending" and txn.get("status") == "completed":
-                return "pending_to_completed", existing
-            return "duplicate", existing
-
-    # Fallback for pending txns without original_id
-    if original_id is None and txn.get("status") == "pending":
-        row = db.execute(
-            "SELECT * FROM transactions WHERE date = ? AND amount = ? AND description = ? "
-            "AND source_type = ? AND source_id = ?",
-            (txn["date"], txn["amount"], txn.get("description"), source_type, source_id),
-        ).fetchone()
-        if row:
-            return "duplicate", dict(row)
-
-    return "new", None
+    key = txn.get("dedup_key") or dedup_key(txn)
+    row = db.execute("SELECT * FROM transactions WHERE dedup_key = ?", (key,)).fetchone()
+    if row is None:
+        return "new", None
+    existing = dict(row)
+    if existing["status"] == "pending" and txn.get("status") == "completed":
+        return "pending_to_completed", existing
+    return "duplicate", existing
 
 
 def update_pending_to_completed(
@@ -47,7 +47,11 @@ def update_pending_to_completed(
     transaction_type: str | None = None,
     charged_month: str | None = None,
 ) -> None:
-    """Update a pending transaction to completed status."""
+    """Update a pending transaction to completed status.
+
+    The caller commits, and bumps the "transactions" data version so cached
+    analytics (services/response_cache.py) are recomputed.
+    """
     db.execute(
         "UPDATE transactions SET status = 'completed', original_id = ?, "
         "processed_date = ?, amount = ?, category_id = ?, "
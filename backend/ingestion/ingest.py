@@ -11,30 +11,59 @@ Usage:
 import json
 import sqlite3
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
-from zoneinfo import ZoneInfo
 
-from db.database import get_connection
-from ingestion.classifier import ClassificationContext, classify_transaction
-from ingestion.duplicate_checker import check_duplicate, update_pending_to_completed
+import metrics
+from db.database import bump_data_version, get_connection
+from db.dedup import dedup_key
+from ingestion.classifier import MemoStats, classify_transaction, get_classification_context
+from ingestion.dates import ISRAEL_TZ, to_israel_date
+from ingestion.duplicate_checker import DedupKeys, check_duplicate, update_pending_to_completed
+from ingestion.merchants import MerchantResolver
+from services import budget
+from services.forecast import SpendRecorder, add_fixed_match, add_spend, remove_fixed_match, remove_spend
 
-ISRAEL_TZ = ZoneInfo("Asia/Jerusalem")
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 DEFAULT_OUTPUT_DIR = PROJECT_ROOT / "data-fetcher" / "output"
 
+# Pipeline stages timed by ingest_file, in order
+STAGES = ("read", "parse", "normalize", "classify", "dedup", "insert", "balance", "commit")
+
+_ingested_total = metrics.counter(
+    "cashboard_ingested_transactions", "Scraped transactions processed, by bank and result",
+    ("bank", "result"),
+)
+_ingest_errors_total = metrics.counter(
+    "cashboard_ingest_errors", "Errors while ingesting scraper files", ("bank",),
+)
+_ingest_file_seconds = metrics.histogram(
+    "cashboard_ingest_file_seconds", "Wall time to ingest one scraper file", ("bank",),
+)
+_ingest_stage_seconds = metrics.counter(
+    "cashboard_ingest_stage_seconds", "Time spent in each ingestion stage", ("stage",),
+)
+
 
 def _normalize_date(iso_str: str | None) -> str | None:
-    """Parse UTC ISO 8601 string and convert to Israel date (YYYY-MM-DD)."""
-    if not iso_str:
-        return None
-    dt = datetime.fromisoformat(iso_str.replace("Z", "+00:00"))
-    israel_dt = dt.astimezone(ISRAEL_TZ)
-    return israel_dt.strftime("%Y-%m-%d")
+    """Parse UTC ISO 8601 string and convert to Israel date (YYYY-MM-DD).
+
+    A bare date (statement imports) is local already and returned as is.
+    """
+    if iso_str and len(iso_str) == 10:
+        return iso_str
+    return to_israel_date(iso_str)
 
 
-def _normalize_transaction(txn: dict, source_type: str, source_id: int, bank: str) -> dict:
-    """Convert a scraper transaction dict to a DB-ready dict."""
+def _normalize_transaction(txn: dict, source_type: str, source_id: int, bank: str,
+                           merchants: MerchantResolver | None = None, keys: DedupKeys | None = None) -> dict:
+    """Convert a scraper transaction dict to a DB-ready dict.
+
+    When a MerchantResolver is given, the description is mapped to its
+    canonical merchant and merchant_id is set. dedup_key is taken from keys
+    when given, which numbers identical rows of one batch apart.
+    """
     charged = txn.get("chargedAmount", 0)
     original = txn.get("originalAmount", 0)
 
@@ -53,14 +82,18 @@ def _normalize_transaction(txn: dict, source_type: str, source_id: int, bank: st
     memo = txn.get("memo")
     notes = memo if memo else None
 
-    return {
+    description = txn.get("description")
+    merchant_id = merchants.resolve(description) if merchants is not None else None
+
+    normalized = {
         "source_type": source_type,
         "source_id": source_id,
         "date": _normalize_date(txn.get("date")),
         "processed_date": _normalize_date(txn.get("processedDate")),
         "amount": amount,
         "currency": currency,
-        "description": txn.get("description"),
+        "description": description,
+        "merchant_id": merchant_id,
         "category_id": None,
         "transaction_type": None,
         "status": txn.get("status", "completed"),
@@ -69,6 +102,8 @@ def _normalize_transaction(txn: dict, source_type: str, source_id: int, bank: st
         "original_id": original_id,
         "notes": notes,
     }
+    normalized["dedup_key"] = (keys or dedup_key)(normalized)
+    return normalized
 
 
 def _resolve_source(db: sqlite3.Connection, bank: str, account_number: str) -> tuple[str, int] | None:
@@ -103,40 +138,120 @@ def _resolve_source(db: sqlite3.Connection, bank: str, account_number: str) -> t
     return None
 
 
-def _insert_transaction(db: sqlite3.Connection, txn: dict) -> int:
-    """Insert a transaction and return the new row id."""
-    cols = [
-        "source_type", "source_id", "date", "processed_date", "amount",
-        "currency", "description", "category_id", "transaction_type",
-        "status", "installment_number", "installment_total", "original_id", "notes",
-        "charged_month",
-    ]
-    placeholders = ", ".join("?" for _ in cols)
-    col_names = ", ".join(cols)
-    values = [txn[c] for c in cols]
-    cursor = db.execute(
-        f"INSERT INTO transactions ({col_names}) VALUES ({placeholders})",
-        values,
-    )
-    return cursor.lastrowid
+_INSERT_COLUMNS = (
+    "source_type", "source_id", "date", "processed_date", "amount",
+    "currency", "description", "category_id", "transaction_type",
+    "status", "installment_number", "installment_total", "original_id", "notes",
+    "charged_month", "merchant_id", "dedup_key",
+)
+_INSERT_SQL = (
+    f"INSERT INTO transactions ({', '.join(_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _INSERT_COLUMNS)})"
+)
+_INSERT_OR_IGNORE_SQL = _INSERT_SQL.replace("INSERT", "INSERT OR IGNORE", 1)
+
+
+def _insert_transaction(db: sqlite3.Connection, txn: dict) -> int | None:
+    """Insert a transaction and return the new row id.
+
+    Returns None, inserting nothing, when a row with the same dedup_key is
+    already stored (e.g. by a concurrent ingest since check_duplicate ran).
+    """
+    cursor = db.execute(_INSERT_OR_IGNORE_SQL, [txn[c] for c in _INSERT_COLUMNS])
+    return cursor.lastrowid if cursor.rowcount else None
+
+
+def _insert_transactions(db: sqlite3.Connection, txns: list[dict]) -> list[int | None]:
+    """Insert transactions with one executemany and return their row ids, in order.
+
+    A row whose dedup_key is already stored (e.g. by a concurrent sync since
+    the caller's dedup lookup) is skipped and gets None, as in
+    _insert_transaction. The inserted rows get consecutive ids: the
+    statement holds the write lock throughout and each id is allocated as
+    the current maximum + 1.
+    """
+    if not txns:
+        return []
+    cursor = db.executemany(_INSERT_OR_IGNORE_SQL, ([txn[c] for c in _INSERT_COLUMNS] for txn in txns))
+    inserted = cursor.rowcount
+    if not inserted:
+        return [None] * len(txns)
+    last = db.execute("SELECT last_insert_rowid()").fetchone()[0]
+    if inserted == len(txns):
+        return list(range(last - len(txns) + 1, last + 1))
+    ids = dict(db.execute(
+        "SELECT dedup_key, id FROM transactions WHERE id BETWEEN ? AND ?", (last - inserted + 1, last),
+    ).fetchall())
+    return [ids.get(txn["dedup_key"]) for txn in txns]
 
 
 def _upsert_balance_snapshot(db: sqlite3.Connection, account_id: int, date: str, balance: float) -> None:
     """Insert or update a balance snapshot for a bank account."""
-    existing = db.execute(
-        "SELECT id FROM balance_snapshots WHERE account_id = ? AND date = ?",
-        (account_id, date),
-    ).fetchone()
-    if existing:
-        db.execute(
-            "UPDATE balance_snapshots SET balance = ? WHERE id = ?",
-            (balance, existing["id"]),
+    _upsert_balance_snapshots(db, [(account_id, date, balance)])
+
+
+def _upsert_balance_snapshots(db: sqlite3.Connection, rows: list[tuple[int, str, float]]) -> None:
+    """Insert or update (account_id, date, balance) snapshots in one batch.
+
+    Relies on the unique (account_id, date) index, so there is no read
+    before the write. Also keeps account_latest_balance pointing at the
+    newest snapshot.
+    """
+    db.executemany(
+        "INSERT INTO balance_snapshots (account_id, date, balance) VALUES (?, ?, ?) "
+        "ON CONFLICT(account_id, date) DO UPDATE SET balance = excluded.balance",
+        rows,
+    )
+    db.executemany(
+        "INSERT INTO account_latest_balance (account_id, date, balance) VALUES (?, ?, ?) "
+        "ON CONFLICT(account_id) DO UPDATE SET date = excluded.date, balance = excluded.balance "
+        "WHERE excluded.date >= account_latest_balance.date",
+        rows,
+    )
+
+
+def _move_counters(db: sqlite3.Connection, existing: dict, txn: dict) -> None:
+    """Move a completed pending transaction's spend in the budget and forecast counters."""
+    completed = {**existing, **{k: txn.get(k) for k in
+                                ("amount", "category_id", "transaction_type", "charged_month")}}
+    for remove, add in ((budget.remove_transaction, budget.add_transaction), (remove_spend, add_spend),
+                        (remove_fixed_match, add_fixed_match)):
+        remove(db, existing)
+        add(db, completed)
+
+
+def _store_transaction(db: sqlite3.Connection, txn: dict, spend: SpendRecorder,
+                       new_txns: list[dict], timings: dict[str, float]) -> str:
+    """Dedup and store one classified transaction.
+
+    Returns "inserted", "updated" (a pending transaction completed) or
+    "skipped". Inserted transactions are added to spend and new_txns for the
+    caller to flush; the dedup and insert times go into timings.
+    """
+    clock = time.perf_counter
+    t0 = clock()
+    action, existing = check_duplicate(db, txn)
+    t1 = clock()
+    timings["dedup"] += t1 - t0
+
+    txn_id = _insert_transaction(db, txn) if action == "new" else None
+    if txn_id is not None:
+        spend.add(txn, txn_id)
+        new_txns.append(txn)
+        outcome = "inserted"
+    elif action == "pending_to_completed":
+        update_pending_to_completed(
+            db, existing["id"], txn["original_id"],
+            txn["processed_date"], txn["amount"],
+            txn["category_id"], txn["transaction_type"],
+            txn.get("charged_month"),
         )
+        _move_counters(db, existing, txn)
+        outcome = "updated"
     else:
-        db.execute(
-            "INSERT INTO balance_snapshots (account_id, date, balance) VALUES (?, ?, ?)",
-            (account_id, date, balance),
-        )
+        outcome = "skipped"
+    timings["insert"] += clock() - t1
+    return outcome
 
 
 def _log_scrape(db: sqlite3.Connection, source_type: str, source_id: int,
@@ -149,23 +264,80 @@ def _log_scrape(db: sqlite3.Connection, source_type: str, source_id: int,
     )
 
 
+def _record_ingest_metrics(db: sqlite3.Connection, result: dict, bank: str | None) -> None:
+    """Insert the per-file stage timings into ingest_metrics."""
+    timings = result["timings_ms"]
+    cols = ["file", "bank", "rows", "inserted", "updated", "skipped", "errors"]
+    cols += [f"{stage}_ms" for stage in STAGES] + ["total_ms"]
+    values = [result["file"], bank, result["rows"], result["inserted"], result["updated"],
+              result["skipped"], len(result["errors"])]
+    values += [timings[stage] for stage in STAGES] + [result["total_ms"]]
+    db.execute(
+        f"INSERT INTO ingest_metrics ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})",
+        values,
+    )
+
+
+def _finish_timings(result: dict, timings: dict[str, float], started: float) -> None:
+    result["timings_ms"] = {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()}
+    result["total_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+
+def _export_metrics(result: dict, bank: str) -> None:
+    for key in ("inserted", "updated", "skipped"):
+        _ingested_total.labels(bank, key).inc(result[key])
+    if result["errors"]:
+        _ingest_errors_total.labels(bank).inc(len(result["errors"]))
+    _ingest_file_seconds.labels(bank).observe(result["total_ms"] / 1000)
+    for stage, ms in result["timings_ms"].items():
+        _ingest_stage_seconds.labels(stage).inc(ms / 1000)
+
+
+def sum_stage_timings(results: list[dict]) -> dict[str, float]:
+    """Add up the per-stage timings (ms) of several ingest_file results."""
+    return {
+        stage: round(sum(r.get("timings_ms", {}).get(stage, 0.0) for r in results), 3)
+        for stage in STAGES
+    }
+
+
 def ingest_file(file_path: str | Path, db: sqlite3.Connection | None = None) -> dict:
     """Process one scraper JSON file.
 
-    Returns {"file", "inserted", "updated", "skipped", "errors"}.
+    Returns {"file", "inserted", "updated", "skipped", "errors",
+    "classify_cache_hits", "classify_cache_misses", "rows", "timings_ms",
+    "total_ms"}. timings_ms holds the wall time (ms) spent in each of
+    STAGES; a successful run is also recorded in ingest_metrics.
     """
     file_path = Path(file_path)
     close_db = db is None
     if db is None:
         db = get_connection()
 
-    result = {"file": str(file_path), "inserted": 0, "updated": 0, "skipped": 0, "errors": []}
+    result = {"file": str(file_path), "inserted": 0, "updated": 0, "skipped": 0, "errors": [],
+              "classify_cache_hits": 0, "classify_cache_misses": 0, "rows": 0}
+    memo_stats = MemoStats()
+    clock = time.perf_counter
+    timings = dict.fromkeys(STAGES, 0.0)
+    started = clock()
+    bank = None
 
     try:
-        data = json.loads(file_path.read_text(encoding="utf-8"))
+        t0 = clock()
+        text = file_path.read_text(encoding="utf-8")
+        t1 = clock()
+        data = json.loads(text)
+        t2 = clock()
+        timings["read"] += t1 - t0
+        timings["parse"] += t2 - t1
         bank = data["bank"]
         scrape_date = _normalize_date(data.get("scrapedAt")) or datetime.now(ISRAEL_TZ).strftime("%Y-%m-%d")
-        classification_ctx = ClassificationContext(db)
+        classification_ctx = get_classification_context(db)
+        merchants = MerchantResolver(db)
+        keys = DedupKeys()
+        spend = SpendRecorder(classification_ctx)
+        new_txns = []
+        snapshots = []
 
         for account in data.get("accounts", []):
             account_number = account.get("accountNumber", "")
@@ -183,22 +355,20 @@ def ingest_file(file_path: str | Path, db: sqlite3.Connection | None = None) ->
             account_updated = 0
             account_skipped = 0
 
+            result["rows"] += len(txns)
+
             for raw_txn in txns:
                 try:
-                    txn = _normalize_transaction(raw_txn, source_type, source_id, bank)
-                    classify_transaction(db, txn, ctx=classification_ctx)
-                    action, existing = check_duplicate(db, txn)
-
-                    if action == "new":
-                        _insert_transaction(db, txn)
+                    t0 = clock()
+                    txn = _normalize_transaction(raw_txn, source_type, source_id, bank, merchants, keys)
+                    t1 = clock()
+                    classify_transaction(db, txn, ctx=classification_ctx, memo_stats=memo_stats)
+                    timings["normalize"] += t1 - t0
+                    timings["classify"] += clock() - t1
+                    outcome = _store_transaction(db, txn, spend, new_txns, timings)
+                    if outcome == "inserted":
                         account_inserted += 1
-                    elif action == "pending_to_completed":
-                        update_pending_to_completed(
-                            db, existing["id"], txn["original_id"],
-                            txn["processed_date"], txn["amount"],
-                            txn["category_id"], txn["transaction_type"],
-                            txn.get("charged_month"),
-                        )
+                    elif outcome == "updated":
                         account_updated += 1
                     else:
                         account_skipped += 1
@@ -209,7 +379,7 @@ def ingest_file(file_path: str | Path, db: sqlite3.Connection | None = None) ->
 
             # Balance snapshot for bank accounts with balance data
             if source_type == "bank" and "balance" in account:
-                _upsert_balance_snapshot(db, source_id, scrape_date, account["balance"])
+                snapshots.append((source_id, scrape_date, account["balance"]))
 
             # Log scrape result
             total = account_inserted + account_updated + account_skipped
@@ -222,14 +392,40 @@ def ingest_file(file_path: str | Path, db: sqlite3.Connection | None = None) ->
             print(f"  {source_type}:{source_id} ({bank}/{account_number}): "
                   f"+{account_inserted} new, ~{account_updated} updated, ={account_skipped} skipped")
 
+        t0 = clock()
+        spend.flush(db)
+        budget.record_transactions(db, new_txns)
+        timings["insert"] += clock() - t0
+
+        if snapshots:
+            t0 = clock()
+            _upsert_balance_snapshots(db, snapshots)
+            timings["balance"] += clock() - t0
+
+        changed = ["transactions"] if result["inserted"] or result["updated"] else []
+        if snapshots:
+            changed.append("balance_snapshots")
+        if changed:
+            bump_data_version(db, *changed)
+
+        t0 = clock()
+        db.commit()
+        timings["commit"] += clock() - t0
+
+        _finish_timings(result, timings, started)
+        _record_ingest_metrics(db, result, bank)
         db.commit()
     except Exception as e:
         result["errors"].append(str(e))
         print(f"  ERROR processing {file_path}: {e}")
+        _finish_timings(result, timings, started)
     finally:
         if close_db:
             db.close()
 
+    _export_metrics(result, bank or "unknown")
+    result["classify_cache_hits"] = memo_stats.hits
+    result["classify_cache_misses"] = memo_stats.misses
     return result
 
 
@@ -275,6 +471,8 @@ def ingest_all(output_dir: str | Path | None = None) -> list[dict]:
     total_errors = sum(len(r["errors"]) for r in results)
     print(f"\nDone: {total_inserted} inserted, {total_updated} updated, "
           f"{total_skipped} skipped, {total_errors} errors")
+    timings = sum_stage_timings(results)
+    print("Stage timings (ms): " + ", ".join(f"{stage}={ms:.1f}" for stage, ms in timings.items()))
 
     return results
 
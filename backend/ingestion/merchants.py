@@ -0,0 +1,72 @@
+"""Merchant normalization.
+
+Scraper descriptions for the same merchant vary between transactions
+(branch numbers, punctuation, legal suffixes). Each description is reduced
+to a canonical merchant key, stored once in the merchants table and
+referenced from transactions through merchant_id.
+"""
+
+import re
+import sqlite3
+from functools import lru_cache
+
+from cache import LRUCache
+
+# Runs of letters (Hebrew or Latin); digits and punctuation separate tokens
+_TOKEN_RE = re.compile(r"[^\W\d_]+")
+# Quote marks inside abbreviations (בע"מ, ממר"צ) are dropped, not split on
+_QUOTES_RE = re.compile(r"[\"'`״׳]")
+# Legal/domain suffixes that don't identify the merchant
+_STOP_TOKENS = frozenset({"בעמ", "ltd", "inc", "llc", "co", "com", "www"})
+
+_MISSING = object()
+
+
+@lru_cache(maxsize=4096)
+def merchant_key(description: str | None) -> str | None:
+    """Return the canonical merchant key for a description, or None if empty.
+
+    Digits never reach the key: scrapers put branch and terminal numbers in
+    the description, so "פז 123" and "פז 456" are deliberately one merchant
+    (classification rules and forecasts then see the chain, not each station).
+    """
+    if not description:
+        return None
+    text = _QUOTES_RE.sub("", description.casefold())
+    tokens = [t for t in _TOKEN_RE.findall(text) if t not in _STOP_TOKENS]
+    if not tokens:
+        return None
+    return " ".join(tokens)
+
+
+class MerchantResolver:
+    """Maps raw descriptions to merchant ids, creating merchants on first sight.
+
+    Repeat descriptions are served from an LRU memo without touching the DB.
+    """
+
+    def __init__(self, db: sqlite3.Connection, maxsize: int = 4096):
+        self._db = db
+        self._memo = LRUCache(maxsize)
+
+    def resolve(self, description: str | None) -> int | None:
+        if not description:
+            return None
+        merchant_id = self._memo.get(description, _MISSING)
+        if merchant_id is _MISSING:
+            merchant_id = self._lookup_or_create(description)
+            self._memo.set(description, merchant_id)
+        return merchant_id
+
+    def _lookup_or_create(self, description: str) -> int | None:
+        key = merchant_key(description)
+        if key is None:
+            return None
+        row = self._db.execute("SELECT id FROM merchants WHERE key = ?", (key,)).fetchone()
+        if row:
+            return row[0]
+        cursor = self._db.execute(
+            "INSERT INTO merchants (key, name) VALUES (?, ?)",
+            (key, description.strip()),
+        )
+        return cursor.lastrowid
@@ -0,0 +1,38 @@
+"""Downsample old balance snapshots to one month-end point per account.
+
+Usage:
+    cd backend && python -m scripts.compact_snapshots [full_months]
+
+Snapshots in the current month and the `full_months` before it (default
+CASHBOARD_SNAPSHOT_FULL_MONTHS) are kept as they are.
+"""
+
+import sys
+from datetime import date
+from pathlib import Path
+
+# Ensure backend/ is on the import path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import DB_PATH, SNAPSHOT_FULL_MONTHS
+from db.database import get_connection
+from services.balances import compact_snapshots
+
+
+def main() -> None:
+    full_months = int(sys.argv[1]) if len(sys.argv) > 1 else SNAPSHOT_FULL_MONTHS
+    today = date.today()
+    months = today.year * 12 + today.month - 1 - full_months
+    before = f"{months // 12:04d}-{months % 12 + 1:02d}"
+
+    conn = get_connection()
+    try:
+        deleted = compact_snapshots(conn, before)
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"Compacted snapshots before {before} in {DB_PATH}: {deleted} rows deleted")
+
+
+if __name__ == "__main__":
+    main()
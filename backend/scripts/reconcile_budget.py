@@ -0,0 +1,43 @@
+"""Check the budget spend counters against the transactions table.
+
+Usage:
+    cd backend && python -m scripts.reconcile_budget [--fix]
+
+Prints every (category, month) whose counter disagrees with the raw
+transactions; with --fix the counters are rebuilt. Exits 1 if any
+mismatch was found.
+"""
+
+import sys
+from pathlib import Path
+
+# Ensure backend/ is on the import path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import DB_PATH
+from db.database import bump_data_version, get_connection
+from services.budget import reconcile
+
+
+def main() -> None:
+    fix = "--fix" in sys.argv[1:]
+    conn = get_connection()
+    try:
+        mismatches = reconcile(conn, fix=fix)
+        if fix and mismatches:
+            bump_data_version(conn, "transactions")
+            conn.commit()
+    finally:
+        conn.close()
+
+    for m in mismatches:
+        print(f"category {m['category_id']} {m['month']}: counted {m['counted']:.2f}, actual {m['actual']:.2f}")
+    if not mismatches:
+        print(f"Budget counters in {DB_PATH} match the transactions table")
+    elif fix:
+        print(f"Rebuilt budget counters ({len(mismatches)} mismatches)")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Daily balance series for bank accounts, and snapshot compaction.
+
+balance_snapshots only has points on sync days. Between them the balance
+is reconstructed from the account's completed transactions: with C(d) the
+running total of transaction amounts up to and including day d, the
+balance at the end of day d is S.balance + C(d) - C(S.date) for the
+nearest snapshot S at or before d (or the first snapshot, for days before
+any). C is computed by SQLite in one windowed pass over daily sums.
+
+Snapshots are taken as end-of-day balances.
+"""
+
+import sqlite3
+from bisect import bisect_right
+from datetime import date, timedelta
+
+from db.database import bump_data_version
+from services.response_cache import cached
+
+
+@cached("balance_series", "balance_snapshots", "transactions")
+def daily_balance_series(conn: sqlite3.Connection, account_id: int, start: str, end: str) -> list[dict]:
+    """Return [{"date", "balance", "interpolated"}] for every day in [start, end].
+
+    "interpolated" is False on days that have a snapshot. Empty if the
+    account has no snapshots to anchor the series.
+    """
+    snapshots = conn.execute(
+        "SELECT date, balance FROM balance_snapshots WHERE account_id = ? ORDER BY date",
+        (account_id,),
+    ).fetchall()
+    if not snapshots:
+        return []
+    snap_dates = [s["date"] for s in snapshots]
+    snap_by_date = {s["date"]: s["balance"] for s in snapshots}
+
+    # Running total per transaction day, up to whichever is later: end or
+    # the last snapshot (days before the first snapshot count back from it)
+    upto = max(end, snap_dates[-1])
+    rows = conn.execute(
+        "SELECT date, SUM(SUM(amount)) OVER (ORDER BY date) AS running "
+        "FROM transactions "
+        "WHERE source_type = 'bank' AND source_id = ? AND status = 'completed' AND date <= ? "
+        "GROUP BY date",
+        (account_id, upto),
+    ).fetchall()
+    txn_dates = [r["date"] for r in rows]
+    running = [r["running"] for r in rows]
+
+    def running_at(day: str) -> float:
+        i = bisect_right(txn_dates, day)
+        return running[i - 1] if i else 0.0
+
+    series = []
+    for day in _days(start, end):
+        if day in snap_by_date:
+            series.append({"date": day, "balance": snap_by_date[day], "interpolated": False})
+            continue
+        i = bisect_right(snap_dates, day)
+        anchor = snap_dates[i - 1] if i else snap_dates[0]
+        balance = snap_by_date[anchor] + running_at(day) - running_at(anchor)
+        series.append({"date": day, "balance": round(balance, 2), "interpolated": True})
+    return series
+
+
+def month_open_close(conn: sqlite3.Connection, account_id: int, month: str) -> tuple[float, float] | None:
+    """Opening (end of the previous month) and closing balance for month (YYYY-MM)."""
+    first = date.fromisoformat(f"{month}-01")
+    last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    series = daily_balance_series(conn, account_id, (first - timedelta(days=1)).isoformat(), last.isoformat())
+    if not series:
+        return None
+    return series[0]["balance"], series[-1]["balance"]
+
+
+def compact_snapshots(conn: sqlite3.Connection, before_month: str) -> int:
+    """Downsample snapshots of months before before_month (YYYY-MM) to month-end points.
+
+    Keeps the last snapshot of each account in each such month and deletes
+    the rest; the daily series is unchanged as long as the transactions in
+    between are kept. Returns the number of rows deleted. Does not commit.
+    """
+    cutoff = f"{before_month}-01"
+    deleted = conn.execute(
+        "DELETE FROM balance_snapshots WHERE date < ? AND id NOT IN ("
+        "  SELECT id FROM ("
+        "    SELECT id, ROW_NUMBER() OVER ("
+        "      PARTITION BY account_id, substr(date, 1, 7) ORDER BY date DESC, id DESC"
+        "    ) AS rn FROM balance_snapshots WHERE date < ?"
+        "  ) WHERE rn = 1"
+        ")",
+        (cutoff, cutoff),
+    ).rowcount
+    if deleted:
+        bump_data_version(conn, "balance_snapshots")
+    return deleted
+
+
+def _days(start: str, end: str):
+    day, last = date.fromisoformat(start), date.fromisoformat(end)
+    while day <= last:
+        yield day.isoformat()
+        day += timedelta(days=1)
@@ -0,0 +1,119 @@
+"""Budget vs. actual per category, from running month-to-date spend counters.
+
+category_month_spend holds, per category and budget month, the total of
+that month's outgoing transactions. A transaction counts toward the month
+it is charged in (charged_month for card purchases, else its date's
+month). The counters are kept current on every write, so budget figures
+are a lookup rather than a SUM over the month:
+
+- ingest_file records new transactions with record_transactions() and
+  moves a pending transaction's spend when it completes,
+- the transaction routes call remove_transaction()/add_transaction()
+  around an edit,
+- a billing-day change, which moves card transactions between months,
+  rebuilds them with rebuild().
+
+reconcile() compares the counters with the transactions table
+(scripts/reconcile_budget.py).
+"""
+
+import sqlite3
+
+from services.response_cache import cached
+
+# Spend per (category, budget month), computed from the raw table
+_RAW_SPEND = (
+    "SELECT category_id, COALESCE(charged_month, substr(date, 1, 7)) AS month, "
+    "-SUM(amount) AS spent, COUNT(*) AS txn_count "
+    "FROM transactions WHERE amount < 0 AND category_id IS NOT NULL "
+    "GROUP BY category_id, COALESCE(charged_month, substr(date, 1, 7))"
+)
+
+
+def _counter_row(txn) -> tuple[int, str, float] | None:
+    if txn["amount"] >= 0 or txn["category_id"] is None:
+        return None
+    month = txn["charged_month"] or txn["date"][:7]
+    return txn["category_id"], month, -txn["amount"]
+
+
+def _add(conn: sqlite3.Connection, rows: list[tuple], count: int) -> None:
+    conn.executemany(
+        "INSERT INTO category_month_spend (category_id, month, spent, txn_count) "
+        f"VALUES (?, ?, ?, {count}) "
+        "ON CONFLICT(category_id, month) DO UPDATE SET "
+        "spent = spent + excluded.spent, txn_count = txn_count + excluded.txn_count",
+        rows,
+    )
+
+
+def record_transactions(conn: sqlite3.Connection, txns: list[dict]) -> None:
+    """Count newly inserted transactions. Does not commit."""
+    _add(conn, [row for row in map(_counter_row, txns) if row is not None], 1)
+
+
+def add_transaction(conn: sqlite3.Connection, txn) -> None:
+    """Count one stored transaction (row or dict) in its month's counter."""
+    row = _counter_row(txn)
+    if row is not None:
+        _add(conn, [row], 1)
+
+
+def remove_transaction(conn: sqlite3.Connection, txn) -> None:
+    """Undo add_transaction(), before the transaction's amount, category or month changes."""
+    row = _counter_row(txn)
+    if row is not None:
+        category_id, month, spent = row
+        _add(conn, [(category_id, month, -spent)], -1)
+
+
+def rebuild(conn: sqlite3.Connection) -> None:
+    """Recompute every counter from the transactions table. Does not commit."""
+    conn.execute("DELETE FROM category_month_spend")
+    conn.execute(f"INSERT INTO category_month_spend (category_id, month, spent, txn_count) {_RAW_SPEND}")
+
+
+def reconcile(conn: sqlite3.Connection, fix: bool = False) -> list[dict]:
+    """Return the counters that disagree with the transactions table.
+
+    Each mismatch is {"category_id", "month", "counted", "actual"}. With
+    fix=True the counters are rebuilt when any differ. Does not commit.
+    """
+    raw = {(r["category_id"], r["month"]): r["spent"] for r in conn.execute(_RAW_SPEND)}
+    counted = {
+        (r["category_id"], r["month"]): r["spent"]
+        for r in conn.execute("SELECT category_id, month, spent FROM category_month_spend WHERE txn_count != 0")
+    }
+    mismatches = [
+        {"category_id": key[0], "month": key[1], "counted": counted.get(key, 0.0), "actual": raw.get(key, 0.0)}
+        for key in sorted(raw.keys() | counted.keys())
+        if abs(counted.get(key, 0.0) - raw.get(key, 0.0)) > 0.005
+    ]
+    if fix and mismatches:
+        rebuild(conn)
+    return mismatches
+
+
+@cached("budget", "categories", "transactions")
+def month_budget(conn: sqlite3.Connection, month: str) -> dict:
+    """Budget vs. spent for month (YYYY-MM), per budgeted category and overall."""
+    rows = conn.execute(
+        "SELECT c.id AS category_id, c.name, c.monthly_budget AS budget, COALESCE(s.spent, 0) AS spent "
+        "FROM categories c "
+        "LEFT JOIN category_month_spend s ON s.category_id = c.id AND s.month = ? "
+        "WHERE c.monthly_budget IS NOT NULL ORDER BY c.id",
+        (month,),
+    ).fetchall()
+    categories = [_usage(dict(r)) for r in rows]
+    total = _usage({
+        "budget": sum(c["budget"] for c in categories),
+        "spent": sum(c["spent"] for c in categories),
+    })
+    return {"month": month, **total, "categories": categories}
+
+
+def _usage(item: dict) -> dict:
+    item["spent"] = round(item["spent"], 2)
+    item["remaining"] = round(item["budget"] - item["spent"], 2)
+    item["percent_used"] = round(100 * item["spent"] / item["budget"], 1) if item["budget"] else None
+    return item
@@ -0,0 +1,348 @@
+"""End-of-month forecast.
+
+forecast = current balance
+         + expected income still to arrive this month
+         - fixed expenses not yet paid this month
+         - estimated variable spend for the remaining days
+
+Two tables are kept up to date as transactions arrive, so a forecast never
+rescans transaction history:
+
+- spend_profiles: variable-expense totals per (account, category, month,
+  day of month), with spend_profile_months recording which months each
+  account has history for. The estimate for the remaining days is the sum
+  of the profile over those days in the months before the forecast month,
+  divided by the number of those months.
+- fixed_matches: which transactions paid which fixed expense/income in
+  which month, keyed for "was it seen in month M" lookups.
+
+ingest_file feeds both through SpendRecorder; the transaction write routes
+adjust them with remove_spend()/add_spend() and
+remove_fixed_match()/add_fixed_match(). A change to fixed_expenses or
+fixed_incomes rematches stored transactions with rematch_fixed(), and
+recompute_charged_month() moves card matches with a billing-day change,
+and rebuild_spend() reattributes card spend when a card's account changes.
+Card transactions are attributed to the card's bank account, by purchase
+date.
+"""
+
+import calendar
+import sqlite3
+from datetime import date
+
+from services.response_cache import cached
+
+# Months a fixed expense stays "paid" after a matching transaction
+PERIOD_MONTHS = {"monthly": 1, "bimonthly": 2, "yearly": 12}
+
+# Income frequencies paid several times a month: days between payments
+INTERVAL_DAYS = {"weekly": 7, "biweekly": 14}
+
+FORECAST_TABLES = ("transactions", "balance_snapshots", "fixed_expenses", "fixed_incomes", "credit_cards")
+
+
+class SpendRecorder:
+    """Collects profile and fixed-match rows for a batch of new transactions."""
+
+    def __init__(self, ctx):
+        self._ctx = ctx
+        self._spend: list[tuple] = []
+        self._months: set[tuple[int, str]] = set()
+        self._matches: list[tuple] = []
+
+    def add(self, txn: dict, txn_id: int) -> None:
+        account_id = _account_of(txn, self._ctx.card_accounts)
+        if account_id is None:
+            return
+        self._months.add((account_id, txn["date"][:7]))
+        key = _profile_key(txn, account_id)
+        if key is not None:
+            self._spend.append((*key, -txn["amount"]))
+
+        match = _fixed_match(txn, txn_id, self._ctx.fixed_expenses, self._ctx.fixed_incomes)
+        if match is not None:
+            self._matches.append(match)
+
+    def flush(self, conn: sqlite3.Connection) -> None:
+        _add_to_profile(conn, self._spend)
+        conn.executemany(
+            "INSERT OR IGNORE INTO spend_profile_months (account_id, month) VALUES (?, ?)",
+            sorted(self._months),
+        )
+        _insert_matches(conn, self._matches)
+        self._spend, self._months, self._matches = [], set(), []
+
+
+def add_spend(conn: sqlite3.Connection, txn) -> None:
+    """Count a stored transaction (row or dict) in the spend profile."""
+    _adjust_spend(conn, txn, 1)
+
+
+def remove_spend(conn: sqlite3.Connection, txn) -> None:
+    """Undo add_spend(), e.g. before the transaction's amount or category changes."""
+    _adjust_spend(conn, txn, -1)
+
+
+def _adjust_spend(conn: sqlite3.Connection, txn, sign: int) -> None:
+    txn = dict(txn)
+    card_accounts = {}
+    if txn["source_type"] == "credit_card":
+        row = conn.execute("SELECT account_id FROM credit_cards WHERE id = ?", (txn["source_id"],)).fetchone()
+        card_accounts = {txn["source_id"]: row["account_id"]} if row else {}
+    account_id = _account_of(txn, card_accounts)
+    key = _profile_key(txn, account_id) if account_id is not None else None
+    if key is not None:
+        _add_to_profile(conn, [(*key, -txn["amount"] * sign)], count=sign)
+
+
+def add_fixed_match(conn: sqlite3.Connection, txn) -> None:
+    """Record the fixed expense or income a stored transaction (row or dict) paid, if any."""
+    txn = dict(txn)
+    if txn.get("transaction_type") not in _FIXED_KINDS:
+        return
+    match = _fixed_match(txn, txn["id"], _fixed_items(conn, "fixed_expenses"), _fixed_items(conn, "fixed_incomes"))
+    if match is not None:
+        _insert_matches(conn, [match])
+
+
+def remove_fixed_match(conn: sqlite3.Connection, txn) -> None:
+    """Undo add_fixed_match(), e.g. before the transaction's type or amount changes."""
+    conn.execute("DELETE FROM fixed_matches WHERE transaction_id = ?", (txn["id"],))
+
+
+def rematch_fixed(conn: sqlite3.Connection, kind: str) -> None:
+    """Rebuild the 'expense' or 'income' matches after fixed_expenses/fixed_incomes change.
+
+    Reads only the transactions of the matching type. Does not commit.
+    """
+    txn_type, table = _FIXED_KINDS_BY_NAME[kind]
+    items = _fixed_items(conn, table)
+    expenses, incomes = (items, []) if kind == "expense" else ([], items)
+    rows = conn.execute(
+        "SELECT id, date, amount, description, transaction_type, charged_month FROM transactions "
+        "WHERE transaction_type = ?",
+        (txn_type,),
+    )
+    matches = [m for m in (_fixed_match(r, r["id"], expenses, incomes) for r in rows) if m is not None]
+    conn.execute("DELETE FROM fixed_matches WHERE kind = ?", (kind,))
+    _insert_matches(conn, matches)
+
+
+# transaction_type → (fixed_matches kind, table of fixed items)
+_FIXED_KINDS = {"fixed_expense": ("expense", "fixed_expenses"), "income": ("income", "fixed_incomes")}
+_FIXED_KINDS_BY_NAME = {kind: (txn_type, table) for txn_type, (kind, table) in _FIXED_KINDS.items()}
+
+
+def _fixed_items(conn: sqlite3.Connection, table: str) -> list[dict]:
+    # Same rows and order as ClassificationContext, so the first match agrees with ingest
+    return [dict(r) for r in conn.execute(f"SELECT id, keyword FROM {table} WHERE keyword IS NOT NULL ORDER BY id")]
+
+
+def _fixed_match(txn, txn_id: int, expenses: list[dict], incomes: list[dict]) -> tuple | None:
+    """The fixed_matches row for txn: the first fixed item whose keyword is in its description."""
+    if txn["transaction_type"] == "fixed_expense":
+        kind, items = "expense", expenses
+    elif txn["transaction_type"] == "income":
+        kind, items = "income", incomes
+    else:
+        return None
+    desc = (txn["description"] or "").lower()
+    for item in items:
+        if item["keyword"].lower() in desc:
+            month = txn["charged_month"] or txn["date"][:7]
+            return kind, item["id"], month, txn_id, txn["amount"]
+    return None
+
+
+def rebuild_spend(conn: sqlite3.Connection) -> None:
+    """Recompute spend_profiles and spend_profile_months from the transactions table. Does not commit."""
+    conn.execute("DELETE FROM spend_profiles")
+    conn.execute("DELETE FROM spend_profile_months")
+    conn.execute(
+        f"WITH txn_accounts AS ({_TXN_ACCOUNTS}) "
+        "INSERT INTO spend_profiles (account_id, category_id, month, day_of_month, total, txn_count) "
+        "SELECT account_id, category_id, substr(date, 1, 7), CAST(substr(date, 9, 2) AS INTEGER), "
+        "-SUM(amount), COUNT(*) FROM txn_accounts "
+        "WHERE transaction_type = 'variable_expense' AND amount < 0 "
+        "AND account_id IS NOT NULL AND category_id IS NOT NULL "
+        "GROUP BY account_id, category_id, substr(date, 1, 7), CAST(substr(date, 9, 2) AS INTEGER)"
+    )
+    conn.execute(
+        f"WITH txn_accounts AS ({_TXN_ACCOUNTS}) "
+        "INSERT INTO spend_profile_months (account_id, month) "
+        "SELECT DISTINCT account_id, substr(date, 1, 7) FROM txn_accounts WHERE account_id IS NOT NULL"
+    )
+
+
+# Transactions with the bank account they count against: a card's own account
+_TXN_ACCOUNTS = (
+    "SELECT t.*, CASE WHEN t.source_type = 'bank' THEN t.source_id ELSE cc.account_id END AS account_id "
+    "FROM transactions t "
+    "LEFT JOIN credit_cards cc ON t.source_type = 'credit_card' AND cc.id = t.source_id"
+)
+
+
+def _insert_matches(conn: sqlite3.Connection, rows: list[tuple]) -> None:
+    conn.executemany(
+        "INSERT OR IGNORE INTO fixed_matches (kind, fixed_id, month, transaction_id, amount) "
+        "VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+
+
+def _add_to_profile(conn: sqlite3.Connection, rows: list[tuple], count: int = 1) -> None:
+    conn.executemany(
+        "INSERT INTO spend_profiles (account_id, category_id, month, day_of_month, total, txn_count) "
+        f"VALUES (?, ?, ?, ?, ?, {count}) "
+        "ON CONFLICT(account_id, category_id, month, day_of_month) DO UPDATE SET "
+        "total = total + excluded.total, txn_count = txn_count + excluded.txn_count",
+        rows,
+    )
+
+
+def _account_of(txn: dict, card_accounts: dict[int, int]) -> int | None:
+    if txn["source_type"] == "bank":
+        return txn["source_id"]
+    return card_accounts.get(txn["source_id"])
+
+
+def _profile_key(txn: dict, account_id: int) -> tuple[int, int, str, int] | None:
+    if txn.get("transaction_type") != "variable_expense" or txn["amount"] >= 0:
+        return None
+    return account_id, txn["category_id"], txn["date"][:7], int(txn["date"][8:10])
+
+
+def forecast_month(conn: sqlite3.Connection, month: str, account_id: int | None = None,
+                   today: date | None = None) -> dict:
+    """Forecast the closing balance of month (YYYY-MM) as of today.
+
+    With account_id, only that account's balance, fixed items and spend
+    (including its cards') are included.
+    """
+    return _forecast(conn, month, account_id, (today or date.today()).isoformat())
+
+
+@cached("forecast", *FORECAST_TABLES)
+def _forecast(conn: sqlite3.Connection, month: str, account_id: int | None, today: str) -> dict:
+    year, mon = int(month[:4]), int(month[5:7])
+    days_in_month = calendar.monthrange(year, mon)[1]
+    # Day of the month the forecast starts from: 0 before the month begins
+    if today < f"{month}-01":
+        as_of_day = 0
+    elif today[:7] > month:
+        as_of_day = days_in_month
+    else:
+        as_of_day = int(today[8:10])
+    remaining_days = days_in_month - as_of_day
+
+    account_filter, account_params = "", ()
+    if account_id is not None:
+        account_filter, account_params = " WHERE account_id = ?", (account_id,)
+    balance = conn.execute(
+        f"SELECT COALESCE(SUM(balance), 0) FROM account_latest_balance{account_filter}", account_params,
+    ).fetchone()[0]
+
+    income = _expected_income(conn, month, account_id, as_of_day, remaining_days)
+    fixed = _unpaid_fixed_expenses(conn, month, account_id, as_of_day)
+    variable = _variable_estimate(conn, month, account_id, as_of_day)
+
+    income_total = sum(i["amount"] for i in income)
+    fixed_total = sum(f["amount"] for f in fixed)
+    variable_total = round(sum(variable.values()), 2)
+    return {
+        "month": month,
+        "account_id": account_id,
+        "as_of": today,
+        "remaining_days": remaining_days,
+        "current_balance": balance,
+        "expected_income": income,
+        "expected_income_total": income_total,
+        "remaining_fixed_expenses": fixed,
+        "remaining_fixed_total": fixed_total,
+        "variable_by_category": variable,
+        "estimated_variable_total": variable_total,
+        "forecast_balance": round(balance + income_total - fixed_total - variable_total, 2),
+    }
+
+
+def _shift_month(month: str, delta: int) -> str:
+    index = int(month[:4]) * 12 + int(month[5:7]) - 1 + delta
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _fixed_account_clause(alias: str, account_id: int | None, card_column: bool) -> tuple[str, tuple]:
+    if account_id is None:
+        return "", ()
+    if card_column:
+        return (f" AND ({alias}.account_id = ? OR {alias}.credit_card_id IN "
+                "(SELECT id FROM credit_cards WHERE account_id = ?))"), (account_id, account_id)
+    return f" AND {alias}.account_id = ?", (account_id,)
+
+
+def _unpaid_fixed_expenses(conn, month: str, account_id: int | None, as_of_day: int) -> list[dict]:
+    """Fixed expenses with no matching payment within their period ending at month."""
+    clause, params = _fixed_account_clause("fe", account_id, card_column=True)
+    rows = conn.execute(
+        "SELECT fe.id, fe.name, fe.expected_amount, fe.day_of_month FROM fixed_expenses fe "
+        "WHERE NOT EXISTS ("
+        "  SELECT 1 FROM fixed_matches m WHERE m.kind = 'expense' AND m.fixed_id = fe.id"
+        "  AND m.month BETWEEN (CASE fe.frequency WHEN 'bimonthly' THEN ? WHEN 'yearly' THEN ? ELSE ? END) AND ?"
+        f"){clause} ORDER BY fe.id",
+        (_shift_month(month, -1), _shift_month(month, -11), month, month, *params),
+    ).fetchall()
+    return [_fixed_item(r, r["expected_amount"], as_of_day) for r in rows]
+
+
+def _expected_income(conn, month: str, account_id: int | None, as_of_day: int,
+                     remaining_days: int) -> list[dict]:
+    clause, params = _fixed_account_clause("fi", account_id, card_column=False)
+    rows = conn.execute(
+        "SELECT fi.id, fi.name, fi.expected_amount, fi.frequency, fi.day_of_month, EXISTS ("
+        "  SELECT 1 FROM fixed_matches m WHERE m.kind = 'income' AND m.fixed_id = fi.id AND m.month = ?"
+        f") AS received FROM fixed_incomes fi WHERE 1 = 1{clause} ORDER BY fi.id",
+        (month, *params),
+    ).fetchall()
+    items = []
+    for r in rows:
+        interval = INTERVAL_DAYS.get(r["frequency"])
+        if interval is not None:
+            amount = r["expected_amount"] * (remaining_days // interval)
+        elif r["received"]:
+            continue
+        else:
+            amount = r["expected_amount"]
+        if amount:
+            items.append(_fixed_item(r, amount, as_of_day))
+    return items
+
+
+def _fixed_item(row, amount: float, as_of_day: int) -> dict:
+    day = row["day_of_month"]
+    return {
+        "id": row["id"],
+        "name": row["name"],
+        "amount": amount,
+        "day_of_month": day,
+        # Its day has passed but no matching transaction was seen
+        "overdue": day is not None and day <= as_of_day,
+    }
+
+
+def _variable_estimate(conn, month: str, account_id: int | None, as_of_day: int) -> dict[int, float]:
+    """Average spend per category over the remaining days, from earlier months."""
+    account_filter, params = "", ()
+    if account_id is not None:
+        account_filter, params = " AND account_id = ?", (account_id,)
+    months = conn.execute(
+        f"SELECT COUNT(DISTINCT month) FROM spend_profile_months WHERE month < ?{account_filter}",
+        (month, *params),
+    ).fetchone()[0]
+    if not months:
+        return {}
+    # Days past the end of a short month fold into its last day
+    rows = conn.execute(
+        "SELECT category_id, SUM(total) AS total FROM spend_profiles "
+        f"WHERE month < ? AND day_of_month > ?{account_filter} GROUP BY category_id ORDER BY category_id",
+        (month, as_of_day, *params),
+    ).fetchall()
+    return {r["category_id"]: round(r["total"] / months, 2) for r in rows if r["total"]}
@@ -0,0 +1,36 @@
+"""Overview screen: balances, savings and what is left of this month's budget."""
+
+import sqlite3
+
+from services.budget import month_budget
+from services.response_cache import cached
+
+
+@cached("overview", "accounts", "balance_snapshots", "savings", "categories", "transactions")
+def get_overview(conn: sqlite3.Connection, month: str) -> dict:
+    """Build the overview for month (YYYY-MM).
+
+    Balances come from account_latest_balance, one row per account, so the
+    cost does not grow with the snapshot history.
+    """
+    accounts = [dict(r) for r in conn.execute(
+        "SELECT a.id AS account_id, a.name, a.bank, a.type, l.balance, l.date "
+        "FROM accounts a LEFT JOIN account_latest_balance l ON l.account_id = a.id "
+        "ORDER BY a.id"
+    ).fetchall()]
+    savings = [dict(r) for r in conn.execute(
+        "SELECT id, name, account_id, current_amount FROM savings ORDER BY id"
+    ).fetchall()]
+    return {
+        "month": month,
+        "total_balance": sum(a["balance"] for a in accounts if a["balance"] is not None),
+        "accounts": accounts,
+        "savings_total": sum(s["current_amount"] or 0 for s in savings),
+        "savings": savings,
+        "budget": _budget(conn, month),
+    }
+
+
+def _budget(conn: sqlite3.Connection, month: str) -> dict:
+    totals = month_budget(conn, month)
+    return {"total": totals["budget"], "spent": totals["spent"], "remaining": totals["remaining"]}
@@ -0,0 +1,68 @@
+"""Cache for the computed analytics responses (overview, monthly, yearly, trends).
+
+Those results are pure functions of the database contents, which only
+change on sync or a manual edit. A cached service is keyed by endpoint,
+arguments and the data version stamp (get_data_version) of the tables it
+reads, so every writer that bumps a table's version — ingest_file, and the
+transaction/category/account write routes — invalidates exactly the entries
+computed from it, and stamps from different tenant databases never collide.
+The TTL bounds how long a result can lag behind the calendar ("this month",
+"days remaining").
+
+Cached values are shared between requests; callers must not mutate them.
+"""
+
+import functools
+import sqlite3
+
+import metrics
+from cache import LRUCache
+from config import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+from db.database import get_data_version
+
+_lookups = metrics.counter(
+    "cashboard_response_cache_lookups", "Analytics response cache lookups", ("endpoint", "result"),
+)
+
+_cache = LRUCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+
+_MISSING = object()
+
+
+def cached(endpoint: str, *tables: str):
+    """Cache fn(conn, *args, **kwargs) until one of tables changes.
+
+    Arguments become part of the key, so they must be hashable.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(conn: sqlite3.Connection, *args, **kwargs):
+            key = (endpoint, args, tuple(sorted(kwargs.items())), get_data_version(conn, *tables))
+            value = _cache.get(key, _MISSING)
+            if value is not _MISSING:
+                _lookups.labels(endpoint, "hit").inc()
+                return value
+            _lookups.labels(endpoint, "miss").inc()
+            value = fn(conn, *args, **kwargs)
+            _cache.set(key, value)
+            return value
+        return wrapper
+    return decorator
+
+
+def stats() -> dict:
+    hits, misses = _cache.hits, _cache.misses
+    lookups = hits + misses
+    return {
+        "size": len(_cache),
+        "maxsize": _cache.maxsize,
+        "ttl_seconds": _cache.ttl,
+        "hits": hits,
+        "misses": misses,
+        "evictions": _cache.evictions,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+def clear() -> None:
+    _cache.clear()
@@ -0,0 +1,93 @@
+"""Wedding screen data: budget summary and payment timeline.
+
+Each is one query, cached until a wedding table changes, so the screen
+renders from at most two queries.
+"""
+
+import sqlite3
+from datetime import date, timedelta
+
+from services.response_cache import cached
+
+WEDDING_TABLES = ("wedding_settings", "wedding_vendors", "wedding_payments")
+
+# Unpaid payments due within this many days (or overdue) are flagged
+UPCOMING_DAYS = 30
+
+
+@cached("wedding_summary", *WEDDING_TABLES)
+def summary(conn: sqlite3.Connection) -> dict:
+    """Cost, paid and remaining per vendor category, and the totals vs. budget.
+
+    A vendor without total_cost is costed at the sum of its payments.
+    """
+    # Driven from a one-row select so the budget comes back with no vendors too
+    rows = conn.execute(
+        "SELECT COALESCE(v.category, 'other') AS category, COUNT(v.id) AS vendors, "
+        "  COALESCE(SUM(COALESCE(v.total_cost, p.scheduled, 0)), 0) AS total_cost, "
+        "  COALESCE(SUM(p.paid), 0) AS paid, s.original_budget AS budget "
+        "FROM (SELECT 1) "
+        "LEFT JOIN wedding_settings s ON s.id = 1 "
+        "LEFT JOIN wedding_vendors v ON 1 = 1 "
+        "LEFT JOIN ("
+        "  SELECT vendor_id, SUM(amount) AS scheduled, SUM(CASE WHEN is_paid THEN amount ELSE 0 END) AS paid"
+        "  FROM wedding_payments GROUP BY vendor_id"
+        ") p ON p.vendor_id = v.id "
+        "GROUP BY COALESCE(v.category, 'other') ORDER BY category"
+    ).fetchall()
+
+    budget = rows[0]["budget"]
+    categories = [
+        {
+            "category": r["category"],
+            "vendors": r["vendors"],
+            "total_cost": r["total_cost"],
+            "paid": r["paid"],
+            "remaining": r["total_cost"] - r["paid"],
+        }
+        for r in rows if r["vendors"]
+    ]
+    total_cost = sum(c["total_cost"] for c in categories)
+    paid = sum(c["paid"] for c in categories)
+    return {
+        "budget": budget,
+        "total_cost": total_cost,
+        "paid": paid,
+        "remaining": total_cost - paid,
+        "budget_remaining": budget - total_cost if budget is not None else None,
+        "categories": categories,
+    }
+
+
+def timeline(conn: sqlite3.Connection, today: date | None = None) -> dict:
+    """Payments bucketed by due month, plus the unscheduled and upcoming ones."""
+    return _timeline(conn, (today or date.today()).isoformat())
+
+
+@cached("wedding_timeline", *WEDDING_TABLES)
+def _timeline(conn: sqlite3.Connection, today: str) -> dict:
+    rows = conn.execute(
+        "SELECT p.id, p.vendor_id, v.name AS vendor_name, p.payment_type, p.amount, "
+        "p.due_date, p.is_paid, p.paid_date "
+        "FROM wedding_payments p JOIN wedding_vendors v ON v.id = p.vendor_id "
+        "ORDER BY p.due_date, p.id"
+    ).fetchall()
+
+    horizon = (date.fromisoformat(today) + timedelta(days=UPCOMING_DAYS)).isoformat()
+    months: dict[str, dict] = {}
+    unscheduled, upcoming = [], []
+    for r in rows:
+        payment = {**dict(r), "is_paid": bool(r["is_paid"])}
+        if payment["due_date"] is None:
+            unscheduled.append(payment)
+            continue
+        month = payment["due_date"][:7]
+        bucket = months.get(month)
+        if bucket is None:
+            bucket = months[month] = {"month": month, "total": 0.0, "paid": 0.0, "unpaid": 0.0, "payments": []}
+        bucket["total"] += payment["amount"]
+        bucket["paid" if payment["is_paid"] else "unpaid"] += payment["amount"]
+        bucket["payments"].append(payment)
+        if not payment["is_paid"] and payment["due_date"] <= horizon:
+            upcoming.append({**payment, "overdue": payment["due_date"] < today})
+    return {"months": list(months.values()), "unscheduled": unscheduled, "upcoming": upcoming}
@@ -0,0 +1,212 @@
+"""Wedding affordability: will the money be there before and after the wedding?
+
+project() is the single projection from the plan (Task 16):
+
+    before = balance + months × (avg income − avg expenses) − remaining vendor costs
+    after  = before + expected gifts + additional income − additional expenses
+
+simulate() runs the same model over many scenarios in one NumPy batch and
+returns percentile bands. Per scenario it draws:
+
+- attendance: confirmed guests plus Binomial(undecided, reply rate),
+- the average gift per guest: the estimate × a lognormal error,
+- each remaining month's expenses: resampled from the history months.
+
+Cash flow is taken from bank-account transactions only; card purchases
+reach those accounts as the monthly card charge.
+"""
+
+import sqlite3
+from datetime import date
+from typing import TYPE_CHECKING
+
+from services.response_cache import cached
+
+WEDDING_TABLES = ("wedding_settings", "wedding_vendors", "wedding_payments", "transactions", "balance_snapshots")
+
+HISTORY_MONTHS = 12
+DAYS_PER_MONTH = 365.25 / 12
+# Reply rate assumed for undecided guests before anyone has replied
+DEFAULT_ATTENDANCE_RATE = 0.8
+# Spread of the average-gift estimate (sigma of its log)
+GIFT_SIGMA = 0.15
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# NumPy is imported inside the functions that use it: importing it costs more
+# than the rest of the app, and only the calculator endpoints need it.
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class WeddingNotConfigured(Exception):
+    """wedding_settings has no usable wedding date."""
+
+
+def is_iso_date(value: str) -> bool:
+    """Whether value is a YYYY-MM-DD date (fromisoformat alone also takes e.g. 20260901)."""
+    try:
+        return date.fromisoformat(value).isoformat() == value
+    except ValueError:
+        return False
+
+
+def project(conn: sqlite3.Connection, today: date | None = None) -> dict:
+    """Deterministic projection from averages."""
+    return _project(conn, (today or date.today()).isoformat())
+
+
+def simulate(conn: sqlite3.Connection, scenarios: int = 10_000, seed: int = 0,
+             today: date | None = None) -> dict:
+    """Monte Carlo projection: percentile bands over `scenarios` draws.
+
+    The seed makes results reproducible, so they can be cached until an
+    input table changes.
+    """
+    return _simulate(conn, scenarios, seed, (today or date.today()).isoformat())
+
+
+@cached("wedding_projection", *WEDDING_TABLES)
+def _project(conn: sqlite3.Connection, today: str) -> dict:
+    import numpy as np
+
+    inputs = _inputs(conn, today)
+    income = float(np.mean(inputs["monthly_income"])) if len(inputs["monthly_income"]) else 0.0
+    expenses = float(np.mean(inputs["monthly_expenses"])) if len(inputs["monthly_expenses"]) else 0.0
+    months = inputs["months"]
+    gifts = inputs["expected_guests"] * inputs["avg_gift"]
+
+    before = inputs["balance"] + months * (income - expenses) - inputs["remaining_vendor_costs"]
+    after = before + gifts + inputs["additional_income"] - inputs["additional_expenses"]
+    return {
+        **_summary(inputs),
+        "avg_monthly_income": round(income, 2),
+        "avg_monthly_expenses": round(expenses, 2),
+        "expected_gifts": round(gifts, 2),
+        "balance_before": round(before, 2),
+        "balance_after": round(after, 2),
+        "status": _status(after, expenses),
+    }
+
+
+@cached("wedding_simulation", *WEDDING_TABLES)
+def _simulate(conn: sqlite3.Connection, scenarios: int, seed: int, today: str) -> dict:
+    import numpy as np
+
+    inputs = _inputs(conn, today)
+    rng = np.random.default_rng(seed)
+    income_history = inputs["monthly_income"]
+    expense_history = inputs["monthly_expenses"]
+    income = income_history.mean() if len(income_history) else 0.0
+    months = inputs["months"]
+    whole_months = int(np.floor(months))
+
+    # Remaining months' expenses, resampled from history; the partial
+    # month at the end counts pro rata
+    if len(expense_history):
+        draws = rng.choice(expense_history, size=(scenarios, whole_months + 1))
+        draws[:, -1] *= months - whole_months
+        expenses = draws.sum(axis=1)
+    else:
+        expenses = np.zeros(scenarios)
+
+    guests = inputs["confirmed"] + rng.binomial(inputs["undecided"], inputs["attendance_rate"], size=scenarios)
+    gift = inputs["avg_gift"] * rng.lognormal(-GIFT_SIGMA ** 2 / 2, GIFT_SIGMA, size=scenarios)
+    gifts = guests * gift
+
+    before = inputs["balance"] + months * income - expenses - inputs["remaining_vendor_costs"]
+    after = before + gifts + inputs["additional_income"] - inputs["additional_expenses"]
+    return {
+        **_summary(inputs),
+        "scenarios": scenarios,
+        "seed": seed,
+        "balance_before": _bands(before),
+        "balance_after": _bands(after),
+        "gifts": _bands(gifts),
+        "probability_negative_after": round(float((after < 0).mean()), 4),
+    }
+
+
+def _inputs(conn: sqlite3.Connection, today: str) -> dict:
+    settings = conn.execute("SELECT * FROM wedding_settings WHERE id = 1").fetchone()
+    if settings is None or not settings["wedding_date"]:
+        raise WeddingNotConfigured("Set the wedding date in wedding settings first")
+    if not is_iso_date(settings["wedding_date"]):
+        raise WeddingNotConfigured(f"Wedding date {settings['wedding_date']!r} is not a YYYY-MM-DD date")
+    days = (date.fromisoformat(settings["wedding_date"]) - date.fromisoformat(today)).days
+
+    balance = conn.execute("SELECT COALESCE(SUM(balance), 0) FROM account_latest_balance").fetchone()[0]
+
+    # Payments still owed, plus vendor costs not yet scheduled as payments
+    remaining = conn.execute(
+        "SELECT COALESCE(SUM(CASE WHEN is_paid THEN 0 ELSE amount END), 0) FROM wedding_payments"
+    ).fetchone()[0]
+    remaining += conn.execute(
+        "SELECT COALESCE(SUM(MAX(v.total_cost - COALESCE(p.scheduled, 0), 0)), 0) FROM wedding_vendors v "
+        "LEFT JOIN (SELECT vendor_id, SUM(amount) AS scheduled FROM wedding_payments GROUP BY vendor_id) p "
+        "ON p.vendor_id = v.id WHERE v.total_cost IS NOT NULL"
+    ).fetchone()[0]
+
+    history = _monthly_history(conn, today)
+
+    invited = settings["total_invited"] or 0
+    confirmed = settings["confirmed_count"] or 0
+    declined = settings["declined_count"] or 0
+    replied = confirmed + declined
+    rate = confirmed / replied if replied else DEFAULT_ATTENDANCE_RATE
+    undecided = max(invited - replied, 0)
+
+    return {
+        "wedding_date": settings["wedding_date"],
+        "months": max(days, 0) / DAYS_PER_MONTH,
+        "balance": balance,
+        "remaining_vendor_costs": remaining,
+        "monthly_income": history[:, 0],
+        "monthly_expenses": history[:, 1],
+        "confirmed": confirmed,
+        "undecided": undecided,
+        "attendance_rate": rate,
+        "expected_guests": confirmed + undecided * rate,
+        "avg_gift": settings["avg_gift_estimate"] or 0.0,
+        "additional_income": settings["additional_income"] or 0.0,
+        "additional_expenses": settings["additional_expenses"] or 0.0,
+    }
+
+
+def _monthly_history(conn: sqlite3.Connection, today: str) -> "np.ndarray":
+    """(income, expenses) of each of the last HISTORY_MONTHS complete months with data."""
+    import numpy as np
+
+    first_of_month = today[:8] + "01"
+    rows = conn.execute(
+        "SELECT substr(date, 1, 7) AS month, "
+        "SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END), "
+        "SUM(CASE WHEN amount < 0 THEN -amount ELSE 0 END) "
+        "FROM transactions WHERE source_type = 'bank' AND status = 'completed' "
+        "AND date >= date(?, ?) AND date < ? GROUP BY month",
+        (first_of_month, f"-{HISTORY_MONTHS} months", first_of_month),
+    ).fetchall()
+    return np.array([(r[1], r[2]) for r in rows], dtype=float).reshape(-1, 2)
+
+
+def _summary(inputs: dict) -> dict:
+    return {
+        "wedding_date": inputs["wedding_date"],
+        "months_until_wedding": round(inputs["months"], 2),
+        "current_balance": inputs["balance"],
+        "remaining_vendor_costs": inputs["remaining_vendor_costs"],
+        "history_months": len(inputs["monthly_expenses"]),
+    }
+
+
+def _bands(values: "np.ndarray") -> dict[str, float]:
+    import numpy as np
+
+    return {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def _status(after: float, monthly_expenses: float) -> str:
+    if after < 0:
+        return "shortfall"
+    if after < monthly_expenses:
+        return "tight"
+    return "ok"
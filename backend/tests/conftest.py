@@ -12,7 +12,8 @@ import pytest
 # Force in-memory DB before any backend module is imported
 os.environ["CASHBOARD_DB_PATH"] = ":memory:"
 
-from db.database import get_connection, init_db  # noqa: E402
+from db.aio import close_async_pools  # noqa: E402
+from db.database import copy_template, get_connection  # noqa: E402
 
 
 @pytest.fixture(autouse=True)
@@ -25,11 +26,15 @@ def fresh_db():
         _db_mod._keep_alive_conn.close()
         _db_mod._keep_alive_conn = None
 
-    init_db()
+    # Copy the once-built template instead of replaying schema.sql/seed.sql
+    conn = get_connection()
+    copy_template(conn)
+    conn.close()
 
     yield
 
-    # Tear down
+    # Tear down; async pools hold connections bound to this test's databases
+    close_async_pools()
     if _db_mod._keep_alive_conn is not None:
         _db_mod._keep_alive_conn.close()
         _db_mod._keep_alive_conn = None
@@ -0,0 +1,158 @@
+"""Tests for the async database access layer."""
+
+import asyncio
+import contextvars
+import sqlite3
+import threading
+
+import pytest
+
+import db.database as database
+from db.aio import AsyncConnection, AsyncConnectionPool, _PoolRegistry
+from db.database import TenantRegistry, get_connection
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+# ---------------------------------------------------------------------------
+# AsyncConnection
+# ---------------------------------------------------------------------------
+
+class TestAsyncConnection:
+    def test_fetch(self):
+        async def main():
+            conn = AsyncConnection(get_connection)
+            try:
+                rows = await conn.fetchall("SELECT id FROM categories WHERE id <= ? ORDER BY id", (2,))
+                one = await conn.fetchone("SELECT name FROM categories WHERE id = 1")
+            finally:
+                conn.close()
+            return rows, one
+
+        rows, one = _run(main())
+        assert [r["id"] for r in rows] == [1, 2]
+        assert one["name"]
+
+    def test_runs_on_its_own_thread(self):
+        async def main():
+            conn = AsyncConnection(get_connection)
+            try:
+                return await conn.run(lambda _: threading.current_thread().name)
+            finally:
+                conn.close()
+
+        assert _run(main()) == "cashboard-db"
+
+    def test_errors_propagate(self):
+        async def main():
+            conn = AsyncConnection(get_connection)
+            try:
+                await conn.fetchall("SELECT * FROM no_such_table")
+            finally:
+                conn.close()
+
+        with pytest.raises(sqlite3.OperationalError):
+            _run(main())
+
+    def test_caller_context_is_used(self):
+        var = contextvars.ContextVar("var", default=None)
+
+        async def main():
+            conn = AsyncConnection(get_connection)
+            var.set("request-1")
+            try:
+                return await conn.run(lambda _: var.get())
+            finally:
+                conn.close()
+
+        assert _run(main()) == "request-1"
+
+    def test_closed_connection_rejects_work(self):
+        async def main():
+            conn = AsyncConnection(get_connection)
+            conn.close()
+            await conn.fetchall("SELECT 1")
+
+        with pytest.raises(RuntimeError):
+            _run(main())
+
+
+# ---------------------------------------------------------------------------
+# AsyncConnectionPool
+# ---------------------------------------------------------------------------
+
+class TestAsyncConnectionPool:
+    def test_many_requests_share_few_connections(self):
+        pool = AsyncConnectionPool(get_connection, size=2)
+        threads = set()
+
+        async def request():
+            async with pool.connection() as conn:
+                threads.add(await conn.run(lambda _: threading.get_ident()))
+                await asyncio.sleep(0)
+                return (await conn.fetchone("SELECT COUNT(*) FROM categories"))[0]
+
+        async def main():
+            return await asyncio.gather(*(request() for _ in range(100)))
+
+        try:
+            counts = _run(main())
+        finally:
+            pool.close()
+        assert len(set(counts)) == 1
+        assert len(threads) == 2
+
+    def test_connection_reused(self):
+        pool = AsyncConnectionPool(get_connection, size=1)
+
+        async def main():
+            async with pool.connection() as first:
+                pass
+            async with pool.connection() as second:
+                pass
+            return first, second
+
+        try:
+            first, second = _run(main())
+        finally:
+            pool.close()
+        assert first is second
+
+
+# ---------------------------------------------------------------------------
+# _PoolRegistry
+# ---------------------------------------------------------------------------
+
+class TestPoolRegistry:
+    def test_tenant_files_opened_and_closed_off_the_loop(self, tmp_path, monkeypatch):
+        tenants = TenantRegistry(tmp_path, max_open=2, pool_size=1)
+        monkeypatch.setattr(database, "_tenants", tenants)
+        threads = {}
+        create = database.create_database
+
+        def record_create(path):
+            threads["create"] = threading.current_thread()
+            create(path)
+
+        monkeypatch.setattr(database, "create_database", record_create)
+        pools = _PoolRegistry(pool_size=1, max_open=1)
+
+        async def main():
+            first = await pools.get("a")
+            assert "create" not in threads
+            async with first.connection() as conn:
+                await conn.fetchone("SELECT 1 FROM categories")
+            close = first.close
+            first.close = lambda: (threads.setdefault("close", threading.current_thread()), close())
+            await pools.get("b")
+            return threading.current_thread()
+
+        try:
+            loop_thread = _run(main())
+        finally:
+            pools.close()
+            tenants.close()
+        assert threads["create"] is not loop_thread
+        assert threads["close"] is not loop_thread
@@ -0,0 +1,140 @@
+"""Tests for the daily balance series and snapshot compaction."""
+
+from fastapi.testclient import TestClient
+
+from api.app import app
+from db.database import get_data_version
+from ingestion.ingest import _upsert_balance_snapshot
+from services.balances import compact_snapshots, daily_balance_series, month_open_close
+
+client = TestClient(app)
+
+
+# ---------------------------------------------------------------------------
+# daily_balance_series
+# ---------------------------------------------------------------------------
+
+class TestDailySeries:
+    def test_no_snapshots_gives_empty_series(self, db):
+        _add_account(db)
+        assert daily_balance_series(db, 1, "2025-01-01", "2025-01-05") == []
+
+    def test_forward_from_snapshot(self, db):
+        _add_account(db)
+        _upsert_balance_snapshot(db, 1, "2025-01-01", 1000)
+        _add_txns(db, [("2025-01-02", -100), ("2025-01-02", -50), ("2025-01-04", 500)])
+        series = daily_balance_series(db, 1, "2025-01-01", "2025-01-05")
+        assert [p["balance"] for p in series] == [1000, 850, 850, 1350, 1350]
+        assert [p["interpolated"] for p in series] == [False, True, True, True, True]
+
+    def test_backward_before_first_snapshot(self, db):
+        _add_account(db)
+        _upsert_balance_snapshot(db, 1, "2025-01-05", 1000)
+        _add_txns(db, [("2025-01-03", -200), ("2025-01-05", 100)])
+        series = daily_balance_series(db, 1, "2025-01-01", "2025-01-04")
+        # End of Jan 4 = 1000 - (Jan 5 txns)
+        assert [p["balance"] for p in series] == [1100, 1100, 900, 900]
+
+    def test_snapshot_reanchors_series(self, db):
+        _add_account(db)
+        _upsert_balance_snapshot(db, 1, "2025-01-01", 1000)
+        _upsert_balance_snapshot(db, 1, "2025-01-03", 2000)
+        _add_txns(db, [("2025-01-02", -100), ("2025-01-04", -10)])
+        series = daily_balance_series(db, 1, "2025-01-01", "2025-01-04")
+        assert [p["balance"] for p in series] == [1000, 900, 2000, 1990]
+
+    def test_ignores_pending_and_other_accounts(self, db):
+        _add_account(db)
+        _add_account(db, 2)
+        _upsert_balance_snapshot(db, 1, "2025-01-01", 1000)
+        _add_txns(db, [("2025-01-02", -100)], status="pending")
+        _add_txns(db, [("2025-01-02", -100)], account_id=2)
+        series = daily_balance_series(db, 1, "2025-01-01", "2025-01-02")
+        assert series[-1]["balance"] == 1000
+
+    def test_month_open_close(self, db):
+        _add_account(db)
+        _upsert_balance_snapshot(db, 1, "2025-01-15", 1000)
+        _add_txns(db, [("2025-01-31", -100), ("2025-02-01", -50), ("2025-02-28", 300), ("2025-03-01", 7)])
+        assert month_open_close(db, 1, "2025-02") == (900, 1150)
+
+
+# ---------------------------------------------------------------------------
+# compact_snapshots
+# ---------------------------------------------------------------------------
+
+class TestCompaction:
+    def test_keeps_month_end_points_before_cutoff(self, db):
+        _add_account(db)
+        for day, balance in [("2025-01-05", 1), ("2025-01-20", 2), ("2025-02-03", 3),
+                             ("2025-02-27", 4), ("2025-03-02", 5), ("2025-03-09", 6)]:
+            _upsert_balance_snapshot(db, 1, day, balance)
+        before = get_data_version(db, "balance_snapshots")
+
+        assert compact_snapshots(db, "2025-03") == 2
+        db.commit()
+        dates = [r[0] for r in db.execute("SELECT date FROM balance_snapshots ORDER BY date")]
+        assert dates == ["2025-01-20", "2025-02-27", "2025-03-02", "2025-03-09"]
+        assert get_data_version(db, "balance_snapshots") != before
+
+    def test_series_survives_compaction(self, db):
+        _add_account(db)
+        _upsert_balance_snapshot(db, 1, "2025-01-01", 1000)
+        _upsert_balance_snapshot(db, 1, "2025-01-10", 900)
+        _upsert_balance_snapshot(db, 1, "2025-01-31", 700)
+        _add_txns(db, [("2025-01-05", -100), ("2025-01-20", -200)])
+        full = daily_balance_series(db, 1, "2025-01-10", "2025-01-31")
+        compact_snapshots(db, "2025-02")
+        db.commit()
+        compacted = daily_balance_series(db, 1, "2025-01-10", "2025-01-31")
+        assert [p["balance"] for p in compacted] == [p["balance"] for p in full]
+
+    def test_nothing_to_compact(self, db):
+        _add_account(db)
+        _upsert_balance_snapshot(db, 1, "2025-01-05", 1)
+        before = get_data_version(db, "balance_snapshots")
+        assert compact_snapshots(db, "2025-03") == 0
+        assert get_data_version(db, "balance_snapshots") == before
+
+
+# ---------------------------------------------------------------------------
+# GET /api/accounts/{id}/balances
+# ---------------------------------------------------------------------------
+
+class TestBalancesRoute:
+    def test_returns_series(self, db):
+        _add_account(db)
+        _upsert_balance_snapshot(db, 1, "2025-01-01", 1000)
+        db.commit()
+        resp = client.get("/api/accounts/1/balances", params={"start": "2025-01-01", "end": "2025-01-03"})
+        assert resp.status_code == 200
+        assert [p["balance"] for p in resp.json()] == [1000, 1000, 1000]
+
+    def test_unknown_account(self):
+        assert client.get("/api/accounts/99/balances").status_code == 404
+
+    def test_invalid_range(self, db):
+        _add_account(db)
+        params = {"start": "2025-02-01", "end": "2025-01-01"}
+        assert client.get("/api/accounts/1/balances", params=params).status_code == 400
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _add_account(db, account_id=1):
+    db.execute(
+        "INSERT INTO accounts (id, name, bank, type, scraper_type) VALUES (?, ?, 'leumi', 'personal', 'leumi')",
+        (account_id, f"Account {account_id}"),
+    )
+    db.commit()
+
+
+def _add_txns(db, txns, account_id=1, status="completed"):
+    db.executemany(
+        "INSERT INTO transactions (source_type, source_id, date, amount, description, status) "
+        "VALUES ('bank', ?, ?, ?, 'x', ?)",
+        [(account_id, day, amount, status) for day, amount in txns],
+    )
+    db.commit()
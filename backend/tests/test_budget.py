@@ -0,0 +1,123 @@
+"""Tests for the budget spend counters and GET /api/budget."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app import app
+from db.database import MIGRATIONS
+from ingestion.ingest import ingest_file
+from services.budget import month_budget, rebuild, reconcile
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def setup(db):
+    db.execute("INSERT INTO accounts (id, name, bank, type, scraper_type) VALUES (1, 'A', 'leumi', 'personal', 'leumi')")
+    db.execute("INSERT INTO credit_cards (id, account_id, name, company, last_4_digits, billing_day, scraper_type) "
+               "VALUES (1, 1, 'Card', 'max', '1234', 10, 'max')")
+    db.execute("UPDATE categories SET monthly_budget = 1000 WHERE id = 2")
+    db.commit()
+    return db
+
+
+# ---------------------------------------------------------------------------
+# Counters
+# ---------------------------------------------------------------------------
+
+class TestCounters:
+    def test_ingest_counts_by_charged_month(self, setup, tmp_path):
+        _ingest(setup, tmp_path, "max", "1234", [
+            {"date": "2025-01-05", "amount": -100, "desc": "שופרסל"},
+            {"date": "2025-01-20", "amount": -40, "desc": "שופרסל"},
+        ])
+        assert _counters(setup) == [(2, "2025-01", 100), (2, "2025-02", 40)]
+        assert reconcile(setup) == []
+
+    def test_pending_completion_moves_spend(self, setup, tmp_path):
+        txn = {"date": "2025-01-05", "amount": -100, "desc": "שופרסל", "id": "a1", "status": "pending"}
+        _ingest(setup, tmp_path, "leumi", "123", [txn])
+        _ingest(setup, tmp_path, "leumi", "123", [{**txn, "amount": -120, "status": "completed"}])
+        assert _counters(setup) == [(2, "2025-01", 120)]
+        assert reconcile(setup) == []
+
+    def test_edit_and_reclassify_routes(self, setup, tmp_path):
+        _ingest(setup, tmp_path, "leumi", "123", [{"date": "2025-01-05", "amount": -100, "desc": "שופרסל"}])
+        txn_id = setup.execute("SELECT id FROM transactions").fetchone()[0]
+        client.put(f"/api/transactions/{txn_id}", json={"amount": -150})
+        assert _counters(setup) == [(2, "2025-01", 150)]
+        client.put(f"/api/transactions/{txn_id}", json={"category_id": 3})
+        client.put(f"/api/transactions/{txn_id}/classify", json={"category_id": 4})
+        assert _counters(setup) == [(4, "2025-01", 150)]
+        assert reconcile(setup) == []
+
+    def test_billing_day_change_rebuilds(self, setup, tmp_path):
+        _ingest(setup, tmp_path, "max", "1234", [{"date": "2025-01-20", "amount": -40, "desc": "שופרסל"}])
+        client.put("/api/credit-cards/1", json={"account_id": 1, "name": "Card", "company": "max",
+                                                "last_4_digits": "1234", "billing_day": 25, "scraper_type": "max"})
+        assert _counters(setup) == [(2, "2025-01", 40)]
+
+    def test_reconcile_reports_and_fixes_drift(self, setup):
+        setup.execute(
+            "INSERT INTO transactions (source_type, source_id, date, amount, description, category_id) "
+            "VALUES ('bank', 1, '2025-01-05', -70, 'raw insert', 2)"
+        )
+        setup.execute("INSERT INTO category_month_spend (category_id, month, spent, txn_count) VALUES (3, '2025-01', 5, 1)")
+        mismatches = reconcile(setup)
+        assert [(m["category_id"], m["counted"], m["actual"]) for m in mismatches] == [(2, 0, 70), (3, 5, 0)]
+        reconcile(setup, fix=True)
+        assert reconcile(setup) == []
+
+    def test_migration_backfill_matches_rebuild(self, setup, tmp_path):
+        _ingest(setup, tmp_path, "max", "1234", [
+            {"date": "2025-01-05", "amount": -100, "desc": "שופרסל"}, {"date": "2025-03-01", "amount": -5, "desc": "x"},
+        ])
+        setup.execute("DELETE FROM category_month_spend")
+        setup.executescript(MIGRATIONS[12].read_text(encoding="utf-8"))
+        migrated = _counters(setup)
+        rebuild(setup)
+        assert _counters(setup) == migrated
+
+
+# ---------------------------------------------------------------------------
+# Budget figures
+# ---------------------------------------------------------------------------
+
+class TestMonthBudget:
+    def test_budget_vs_spent(self, setup, tmp_path):
+        _ingest(setup, tmp_path, "leumi", "123", [
+            {"date": "2025-01-05", "amount": -250, "desc": "שופרסל"},
+            {"date": "2025-01-06", "amount": -900, "desc": "unknown shop"},
+        ])
+        result = month_budget(setup, "2025-01")
+        assert (result["budget"], result["spent"], result["remaining"], result["percent_used"]) == (1000, 250, 750, 25)
+        assert [c["category_id"] for c in result["categories"]] == [2]
+
+    def test_route(self, setup):
+        resp = client.get("/api/budget", params={"month": "2025-01"})
+        assert resp.status_code == 200
+        assert resp.json()["categories"][0]["spent"] == 0
+        assert client.get("/api/budget", params={"month": "January"}).status_code == 400
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _ingest(db, tmp_path, bank, number, txns):
+    path = tmp_path / f"{bank}.json"
+    raw = [{"date": f"{t['date']}T10:00:00.000Z", "chargedAmount": t["amount"], "description": t["desc"],
+            "identifier": t.get("id", f"{t['date']}-{t['desc']}"), "status": t.get("status", "completed")}
+           for t in txns]
+    path.write_text(json.dumps({"bank": bank, "accounts": [{"accountNumber": number, "txns": raw}]}))
+    result = ingest_file(path, db=db)
+    assert result["errors"] == []
+    return result
+
+
+def _counters(db):
+    rows = db.execute("SELECT category_id, month, spent FROM category_month_spend WHERE txn_count != 0 "
+                      "ORDER BY category_id, month").fetchall()
+    return [tuple(r) for r in rows]
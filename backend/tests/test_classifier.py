@@ -4,10 +4,17 @@ import pytest
 
 from ingestion.classifier import (
     ClassificationContext,
+    MemoStats,
     _apply_billing_day_logic,
     _matches_keyword,
+    classification_cache_stats,
     classify_transaction,
+    get_classification_context,
+    recompute_charged_month,
 )
+from db.database import bump_data_version
+from db.dedup import dedup_key
+from ingestion.merchants import MerchantResolver, merchant_key
 
 
 # ---------------------------------------------------------------------------
@@ -360,6 +367,65 @@ class TestBillingDayLogic:
         assert txn3["charged_month"] == "2026-02"
 
 
+# ---------------------------------------------------------------------------
+# recompute_charged_month — batch SQL version of the billing day logic
+# ---------------------------------------------------------------------------
+
+class TestRecomputeChargedMonth:
+    DATES = ["2025-06-01", "2025-06-10", "2025-06-11", "2025-12-25", "2026-01-02"]
+
+    def _insert(self, db, source_type="credit_card", source_id=1):
+        for d in self.DATES:
+            db.execute(
+                "INSERT INTO transactions (source_type, source_id, date, amount) VALUES (?, ?, ?, -1)",
+                (source_type, source_id, d),
+            )
+        db.commit()
+
+    def test_matches_per_txn_logic(self, db):
+        _setup_credit_card_source(db, billing_day=10)
+        self._insert(db)
+        assert recompute_charged_month(db, 1) == len(self.DATES)
+
+        got = [r[0] for r in db.execute("SELECT charged_month FROM transactions ORDER BY date")]
+        expected = []
+        for d in self.DATES:
+            txn = {"source_type": "credit_card", "source_id": 1, "date": d}
+            _apply_billing_day_logic(txn, {1: 10})
+            expected.append(txn["charged_month"])
+        assert got == expected
+
+    def test_null_billing_day_clears(self, db):
+        _setup_credit_card_source(db, billing_day=10)
+        self._insert(db)
+        recompute_charged_month(db)
+        db.execute("UPDATE credit_cards SET billing_day = NULL")
+        recompute_charged_month(db)
+        assert db.execute("SELECT COUNT(charged_month) FROM transactions").fetchone()[0] == 0
+
+    def test_bank_rows_untouched(self, db):
+        _setup_credit_card_source(db, billing_day=10)
+        self._insert(db, source_type="bank")
+        assert recompute_charged_month(db) == 0
+
+    def test_put_billing_day_recomputes(self, db):
+        from fastapi.testclient import TestClient
+        from api.app import app
+
+        _setup_credit_card_source(db, billing_day=10)
+        self._insert(db)
+        recompute_charged_month(db)
+        db.commit()
+
+        resp = TestClient(app).put("/api/credit-cards/1", json={
+            "account_id": 1, "name": "Card", "company": "visa",
+            "last_4_digits": "9999", "billing_day": 1, "scraper_type": "visa",
+        })
+        assert resp.status_code == 200
+        row = db.execute("SELECT charged_month FROM transactions WHERE date = '2025-06-10'").fetchone()
+        assert row[0] == "2025-07"
+
+
 # ---------------------------------------------------------------------------
 # classify_transaction — billing day integration
 # ---------------------------------------------------------------------------
@@ -384,6 +450,174 @@ class TestClassifyWithBillingDay:
         assert txn["charged_month"] is None
 
 
+# ---------------------------------------------------------------------------
+# Merchant normalization
+# ---------------------------------------------------------------------------
+
+class TestMerchantKey:
+    def test_strips_branch_numbers_and_punctuation(self):
+        assert merchant_key("שופרסל דיל 123") == merchant_key("שופרסל-דיל #456")
+
+    def test_branches_of_a_chain_are_one_merchant(self):
+        assert merchant_key("פז 123") == merchant_key("פז 456") == "פז"
+
+    def test_case_insensitive(self):
+        assert merchant_key("SPOTIFY Premium") == merchant_key("spotify premium")
+
+    def test_drops_legal_suffix(self):
+        assert merchant_key('פרטנר תקשורת בע"מ') == "פרטנר תקשורת"
+
+    def test_empty_and_digits_only(self):
+        assert merchant_key("") is None
+        assert merchant_key(None) is None
+        assert merchant_key("12345 - 678") is None
+
+
+class TestMerchantResolver:
+    def test_variants_share_merchant(self, db):
+        resolver = MerchantResolver(db)
+        a = resolver.resolve("שופרסל דיל 123")
+        b = resolver.resolve("שופרסל דיל 456")
+        assert a is not None and a == b
+        assert db.execute("SELECT COUNT(*) FROM merchants").fetchone()[0] == 1
+
+    def test_reuses_existing_merchant_across_resolvers(self, db):
+        first = MerchantResolver(db).resolve("WOLT 1")
+        second = MerchantResolver(db).resolve("WOLT 2")
+        assert first == second
+
+    def test_no_merchant_for_empty_description(self, db):
+        assert MerchantResolver(db).resolve("") is None
+        assert MerchantResolver(db).resolve("  123 ") is None
+
+    def test_merchant_category_beats_rules(self, db):
+        resolver = MerchantResolver(db)
+        merchant_id = resolver.resolve("שופרסל דיל")
+        db.execute("UPDATE merchants SET category_id = 10 WHERE id = ?", (merchant_id,))
+        db.commit()
+        txn = _make_txn("שופרסל דיל")
+        txn["merchant_id"] = merchant_id
+        classify_transaction(db, txn)
+        assert txn["category_id"] == 10  # Gifts, not Food from the keyword rule
+        assert txn["transaction_type"] == "variable_expense"
+
+    def test_unpinned_merchant_falls_back_to_rules(self, db):
+        txn = _make_txn("שופרסל דיל")
+        txn["merchant_id"] = MerchantResolver(db).resolve("שופרסל דיל")
+        classify_transaction(db, txn)
+        assert txn["category_id"] == 2
+
+    def test_ingest_sets_merchant_id(self, db, tmp_path):
+        _setup_source(db)
+        json_file = _write_scraper_json(tmp_path, "leumi", "1234", [
+            {"description": "WOLT 1001", "date": "2025-06-10T00:00:00Z",
+             "chargedAmount": -50, "status": "completed"},
+            {"description": "WOLT 2002", "date": "2025-06-11T00:00:00Z",
+             "chargedAmount": -60, "status": "completed"},
+        ])
+
+        from ingestion.ingest import ingest_file
+        ingest_file(json_file, db=db)
+
+        ids = {r[0] for r in db.execute("SELECT merchant_id FROM transactions").fetchall()}
+        assert len(ids) == 1
+        assert None not in ids
+
+
+# ---------------------------------------------------------------------------
+# Classification result memo
+# ---------------------------------------------------------------------------
+
+class TestClassificationMemo:
+    def test_repeated_description_hits_memo(self, db):
+        ctx = ClassificationContext(db)
+        hits, _ = classification_cache_stats()
+        classify_transaction(db, _make_txn("שופרסל דיל"), ctx=ctx)
+        txn = classify_transaction(db, _make_txn("שופרסל דיל"), ctx=ctx)
+        assert classification_cache_stats()[0] == hits + 1
+        assert txn["category_id"] == 2
+        assert txn["transaction_type"] == "variable_expense"
+
+    def test_memo_stats_count_only_their_calls(self, db):
+        ctx = ClassificationContext(db)
+        mine, other = MemoStats(), MemoStats()
+        classify_transaction(db, _make_txn("memo stats"), ctx=ctx, memo_stats=mine)
+        classify_transaction(db, _make_txn("memo stats"), ctx=ctx, memo_stats=other)
+        classify_transaction(db, _make_txn("memo stats"), ctx=ctx)
+        classify_transaction(db, _make_txn("memo stats"), ctx=ctx, memo_stats=mine)
+        assert (mine.hits, mine.misses) == (1, 1)
+        assert (other.hits, other.misses) == (1, 0)
+
+    def test_version_bump_invalidates(self, db):
+        classify_transaction(db, _make_txn("פז"))
+        db.execute(
+            "INSERT INTO classification_rules (category_id, keyword, match_type) "
+            "VALUES (4, 'פז', 'exact')"
+        )
+        bump_data_version(db, "classification_rules")
+        db.commit()
+        txn = classify_transaction(db, _make_txn("פז"))
+        assert txn["category_id"] == 4
+
+    def test_memo_keeps_billing_day_per_txn(self, db):
+        _setup_credit_card_source(db, billing_day=10)
+        ctx = ClassificationContext(db)
+        a = classify_transaction(db, _make_txn("x", "credit_card", 1, "2025-06-05"), ctx=ctx)
+        b = classify_transaction(db, _make_txn("x", "credit_card", 1, "2025-06-20"), ctx=ctx)
+        assert a["charged_month"] == "2025-06"
+        assert b["charged_month"] == "2025-07"
+
+    def test_ingest_reports_hits_and_misses(self, db, tmp_path):
+        _setup_source(db)
+        json_file = _write_scraper_json(tmp_path, "leumi", "1234", [
+            {"description": "PAYBOX", "date": f"2025-06-{d:02d}T00:00:00Z",
+             "chargedAmount": -10 * d, "status": "completed"}
+            for d in range(1, 6)
+        ])
+
+        from ingestion.ingest import ingest_file
+        result = ingest_file(json_file, db=db)
+        assert result["classify_cache_misses"] == 1
+        assert result["classify_cache_hits"] == 4
+
+
+# ---------------------------------------------------------------------------
+# Process-wide ClassificationContext cache
+# ---------------------------------------------------------------------------
+
+class TestContextCache:
+    def test_reused_until_version_changes(self, db):
+        ctx1 = get_classification_context(db)
+        assert get_classification_context(db) is ctx1
+
+        db.execute(
+            "INSERT INTO fixed_incomes (name, expected_amount, keyword) "
+            "VALUES ('Salary', 15000, 'משכורת')"
+        )
+        bump_data_version(db, "fixed_incomes")
+        db.commit()
+
+        ctx2 = get_classification_context(db)
+        assert ctx2 is not ctx1
+        assert ctx2.fixed_income_keywords == ["משכורת"]
+
+    def test_credit_card_route_invalidates_billing_days(self, db):
+        from fastapi.testclient import TestClient
+        from api.app import app
+
+        _setup_credit_card_source(db, billing_day=10)
+        bump_data_version(db, "credit_cards")
+        db.commit()
+        assert get_classification_context(db).billing_days == {1: 10}
+
+        resp = TestClient(app).put("/api/credit-cards/1", json={
+            "account_id": 1, "name": "Card", "company": "visa",
+            "last_4_digits": "9999", "billing_day": 20, "scraper_type": "visa",
+        })
+        assert resp.status_code == 200
+        assert get_classification_context(db).billing_days == {1: 20}
+
+
 # ---------------------------------------------------------------------------
 # Migration: charged_month column exists
 # ---------------------------------------------------------------------------
@@ -393,9 +627,14 @@ class TestMigration:
         cols = [row[1] for row in db.execute("PRAGMA table_info(transactions)").fetchall()]
         assert "charged_month" in cols
 
-    def test_schema_version_is_2(self, db):
+    def test_schema_version_is_latest(self, db):
+        from db.database import MIGRATIONS
         ver = db.execute("SELECT MAX(version) FROM schema_version").fetchone()[0]
-        assert ver == 2
+        assert ver == max(MIGRATIONS)
+
+    def test_merchant_id_column_exists(self, db):
+        cols = [row[1] for row in db.execute("PRAGMA table_info(transactions)").fetchall()]
+        assert "merchant_id" in cols
 
 
 # ---------------------------------------------------------------------------
@@ -496,8 +735,9 @@ class TestIngestWithClassification:
         # Pre-insert a pending transaction
         db.execute(
             "INSERT INTO transactions (source_type, source_id, date, amount, "
-            "description, status, original_id, category_id, transaction_type, currency) "
-            "VALUES ('bank', 1, '2025-06-10', -200, 'שופרסל דיל', 'pending', 'txn-1', 1, NULL, 'ILS')"
+            "description, status, original_id, category_id, transaction_type, currency, dedup_key) "
+            "VALUES ('bank', 1, '2025-06-10', -200, 'שופרסל דיל', 'pending', 'txn-1', 1, NULL, 'ILS', ?)",
+            (dedup_key({"source_type": "bank", "source_id": 1, "original_id": "txn-1"}),),
         )
         db.commit()
 
@@ -0,0 +1,231 @@
+"""Tests for manual statement import (ingestion/csv_importer.py) and /api/imports."""
+
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app import app
+from ingestion import csv_importer
+from ingestion.csv_importer import StatementError, get_profile, import_file, import_statement
+from ingestion.ingest import _insert_transaction, _insert_transactions, ingest_file
+from services.budget import reconcile
+
+client = TestClient(app)
+
+HEADER = "תאריך,תיאור,סכום,יתרה"
+
+
+@pytest.fixture
+def profile(db):
+    db.execute("INSERT INTO accounts (id, name, bank, type) VALUES (1, 'Pepper', 'pepper', 'personal')")
+    db.execute(
+        "INSERT INTO import_profiles (id, name, source_type, source_id, date_column, amount_column, "
+        "description_column, balance_column) VALUES (1, 'Pepper', 'bank', 1, 'תאריך', 'סכום', 'תיאור', 'יתרה')"
+    )
+    db.commit()
+    return get_profile(db, 1)
+
+
+# ---------------------------------------------------------------------------
+# Importer
+# ---------------------------------------------------------------------------
+
+class TestImportStatement:
+    def test_imports_classifies_and_snapshots_balance(self, db, profile):
+        result = _import(db, profile, [
+            "05/01/2025,שופרסל דיל,\"-1,200.50\",8800",
+            "07/01/2025,קפה,-20,8780",
+        ])
+        assert (result["rows"], result["inserted"], result["errors"]) == (2, 2, [])
+        rows = db.execute("SELECT date, amount, description, category_id, source_type, source_id "
+                          "FROM transactions ORDER BY date").fetchall()
+        assert [tuple(r) for r in rows] == [
+            ("2025-01-05", -1200.5, "שופרסל דיל", 2, "bank", 1),
+            ("2025-01-07", -20.0, "קפה", 1, "bank", 1),
+        ]
+        assert tuple(db.execute("SELECT date, balance FROM account_latest_balance").fetchone()) == ("2025-01-07", 8780)
+        assert reconcile(db) == []
+
+    def test_newest_first_statement_closing_balance(self, db, profile):
+        _import(db, profile, [
+            "07/01/2025,קפה,-20,8760",
+            "07/01/2025,מאפה,-10,8780",
+            "05/01/2025,שופרסל דיל,-200,8790",
+        ])
+        assert tuple(db.execute("SELECT date, balance FROM account_latest_balance").fetchone()) == ("2025-01-07", 8760)
+
+    def test_oldest_first_statement_closing_balance(self, db, profile):
+        _import(db, profile, [
+            "05/01/2025,שופרסל דיל,-200,8790",
+            "07/01/2025,מאפה,-10,8780",
+            "07/01/2025,קפה,-20,8760",
+        ])
+        assert tuple(db.execute("SELECT date, balance FROM account_latest_balance").fetchone()) == ("2025-01-07", 8760)
+
+    def test_reimport_skips_stored_rows(self, db, profile):
+        # Two identical purchases on one day are both kept, on every import
+        lines = ["05/01/2025,קפה,-20,100", "05/01/2025,קפה,-20,80"]
+        assert _import(db, profile, lines)["inserted"] == 2
+        result = _import(db, profile, lines + ["06/01/2025,קפה,-20,60"])
+        assert (result["inserted"], result["skipped"]) == (1, 2)
+        assert db.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 3
+
+    def test_row_stored_concurrently_is_skipped(self, db, profile, monkeypatch):
+        # A sync stores the first row between the dedup lookup and the insert
+        def insert_after_sync(db, txns):
+            _insert_transaction(db, txns[0])
+            return _insert_transactions(db, txns)
+
+        monkeypatch.setattr(csv_importer, "_insert_transactions", insert_after_sync)
+        result = _import(db, profile, ["05/01/2025,קפה,-20,100", "06/01/2025,קפה,-30,70"])
+        assert (result["inserted"], result["skipped"]) == (1, 1)
+        assert [r[0] for r in db.execute("SELECT amount FROM transactions ORDER BY date")] == [-20, -30]
+
+    def test_identifier_column_completes_pending_row(self, db, profile, tmp_path):
+        db.execute("UPDATE accounts SET scraper_type = 'leumi' WHERE id = 1")
+        db.commit()
+        path = tmp_path / "leumi.json"
+        txn = {"date": "2025-01-05T10:00:00.000Z", "chargedAmount": -90, "description": "שופרסל",
+               "identifier": "r1", "status": "pending"}
+        path.write_text(json.dumps({"bank": "leumi", "accounts": [{"accountNumber": "1", "txns": [txn]}]}))
+        ingest_file(path, db=db)
+
+        profile = {**profile, "identifier_column": "אסמכתא"}
+        result = _import(db, profile, ["05/01/2025,שופרסל,-100,0,r1", "06/01/2025,שופרסל,-5,0,r1"],
+                         header=HEADER + ",אסמכתא")
+        assert (result["updated"], result["skipped"], result["inserted"]) == (1, 1, 0)
+        row = db.execute("SELECT status, amount FROM transactions").fetchone()
+        assert tuple(row) == ("completed", -100)
+        assert reconcile(db) == []
+
+    def test_bad_rows_are_reported_and_skipped(self, db, profile):
+        result = _import(db, profile, ["2025-01-05,קפה,-20,0", "06/01/2025,קפה,,0", "", "07/01/2025,קפה,-20,0"])
+        assert (result["rows"], result["inserted"], result["error_rows"]) == (3, 1, 2)
+        assert result["errors"][0].startswith("Row 1:")
+        assert result["errors"][1].startswith("Row 2:")
+
+    def test_short_row_is_reported(self, db, profile):
+        result = _import(db, profile, ["05/01/2025,קפה", "06/01/2025,קפה,-20,0"])
+        assert (result["inserted"], result["error_rows"]) == (1, 1)
+        assert result["errors"] == ["Row 1: row has 2 cells, no 'סכום' column"]
+
+    def test_undecodable_statement_writes_nothing(self, db, profile):
+        data = (HEADER + "\n05/01/2025,קפה,-20,0\n").encode("utf-8")
+        with pytest.raises(StatementError, match="Can't read statement"):
+            import_statement(db, {**profile, "encoding": "ascii"}, io.BytesIO(data))
+        assert db.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 0
+
+    def test_missing_column_writes_nothing(self, db, profile):
+        with pytest.raises(StatementError, match="סכום"):
+            _import(db, profile, ["05/01/2025,קפה,-20"], header="תאריך,תיאור,Amount")
+        assert db.execute("SELECT COUNT(*) FROM scrape_log").fetchone()[0] == 0
+
+    def test_accounting_negatives(self, db, profile):
+        result = _import(db, profile, ["05/01/2025,קפה,(50.00),0", "06/01/2025,קפה,₪ 50.00-,0",
+                                       "07/01/2025,קפה,\"1.234,50\",0"])
+        assert (result["inserted"], result["error_rows"]) == (2, 1)
+        # Not a "." decimal amount: reported, not read as 1.2345
+        assert result["errors"] == ["Row 3: invalid amount: 1.234,50"]
+        assert [r[0] for r in db.execute("SELECT amount FROM transactions")] == [-50, -50]
+
+    def test_decimal_comma(self, db, profile):
+        profile = {**profile, "decimal_separator": ","}
+        result = _import(db, profile, ["05/01/2025,קפה,\"-1.234,50\",\"9.000,25\"",
+                                       "06/01/2025,קפה,\"1,234.50\",0"])
+        assert (result["inserted"], result["error_rows"]) == (1, 1)
+        assert db.execute("SELECT amount FROM transactions").fetchone()[0] == -1234.5
+        assert db.execute("SELECT balance FROM account_latest_balance").fetchone()[0] == 9000.25
+
+    def test_profile_options(self, db, profile):
+        profile = {**profile, "delimiter": ";", "negate_amounts": 1, "skip_rows": 2,
+                   "date_format": "%Y-%m-%d", "balance_column": None}
+        text = "Pepper export\n\n" + HEADER.replace(",", ";") + "\n2025-01-05;קפה;20;0\n"
+        import_statement(db, profile, io.BytesIO(text.encode("utf-8-sig")))
+        assert tuple(db.execute("SELECT date, amount FROM transactions").fetchone()) == ("2025-01-05", -20)
+
+    def test_reads_in_chunks_with_progress(self, db, profile, monkeypatch):
+        monkeypatch.setattr(csv_importer, "CHUNK_ROWS", 2)
+        seen = []
+        lines = [f"0{d}/01/2025,קפה,-{d},0" for d in range(1, 6)]
+        result = _import(db, profile, lines, progress=lambda r: seen.append(r["rows"]))
+        assert seen == [2, 4, 5]
+        assert result["inserted"] == 5
+        assert db.execute("SELECT SUM(txn_count) FROM category_month_spend").fetchone()[0] == 5
+
+    def test_unusable_stored_profile(self, db, profile):
+        with pytest.raises(StatementError, match="encoding"):
+            _import(db, {**profile, "encoding": "utf-9"}, [])
+        with pytest.raises(StatementError, match="skip_rows"):
+            _import(db, {**profile, "skip_rows": -1}, [])
+        with pytest.raises(StatementError, match="delimiter"):
+            _import(db, {**profile, "delimiter": ";;"}, [])
+
+    def test_import_file_takes_format_from_extension(self, db, profile, tmp_path):
+        path = tmp_path / "statement.csv"
+        path.write_text(HEADER + "\n05/01/2025,קפה,-20,0\n", encoding="utf-8")
+        assert import_file(path, 1, db=db)["inserted"] == 1
+        with pytest.raises(StatementError, match="format"):
+            import_file(path.rename(tmp_path / "statement.txt"), 1, db=db)
+
+    def test_xlsx_needs_openpyxl(self, db, profile):
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            with pytest.raises(StatementError, match="openpyxl"):
+                import_statement(db, profile, io.BytesIO(b""), "xlsx")
+        else:
+            pytest.skip("openpyxl is installed")
+
+
+# ---------------------------------------------------------------------------
+# API
+# ---------------------------------------------------------------------------
+
+class TestImportRoutes:
+    def test_profile_crud(self, db):
+        db.execute("INSERT INTO accounts (id, name, bank, type) VALUES (1, 'Pepper', 'pepper', 'personal')")
+        db.commit()
+        body = {"name": "Pepper", "source_type": "bank", "source_id": 1, "date_column": "תאריך",
+                "amount_column": "סכום", "description_column": "תיאור"}
+        resp = client.post("/api/imports/profiles", json=body)
+        assert resp.status_code == 201
+        profile_id = resp.json()["id"]
+        assert resp.json()["negate_amounts"] is False
+
+        assert client.post("/api/imports/profiles", json=body).status_code == 409
+        assert client.post("/api/imports/profiles", json={**body, "name": "X", "source_id": 9}).status_code == 400
+        assert client.post("/api/imports/profiles", json={**body, "decimal_separator": " "}).status_code == 400
+        assert client.post("/api/imports/profiles", json={**body, "encoding": "utf-9"}).status_code == 400
+        assert client.post("/api/imports/profiles", json={**body, "skip_rows": -1}).status_code == 422
+        assert client.put(f"/api/imports/profiles/{profile_id}", json={**body, "delimiter": ";"}).status_code == 200
+        assert client.get(f"/api/imports/profiles/{profile_id}").json()["delimiter"] == ";"
+
+        assert client.delete("/api/accounts/1").status_code == 409
+        assert client.delete(f"/api/imports/profiles/{profile_id}").status_code == 204
+        assert client.get(f"/api/imports/profiles/{profile_id}").status_code == 404
+
+    def test_upload_statement(self, profile):
+        content = (HEADER + "\n05/01/2025,שופרסל,-100,900\n").encode("utf-8")
+        resp = client.post("/api/imports/profiles/1/statement?filename=jan.csv", content=content)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert (data["file"], data["inserted"], data["error_rows"]) == ("jan.csv", 1, 0)
+        assert set(data["stage_timings_ms"]) >= {"parse", "insert"}
+        assert client.get("/api/transactions").json()[0]["category_id"] == 2
+
+    def test_upload_errors(self, profile):
+        resp = client.post("/api/imports/profiles/1/statement", content="Date,Amount\n".encode())
+        assert resp.status_code == 400
+        assert client.post("/api/imports/profiles/1/statement?format=pdf", content=b"x").status_code == 400
+        assert client.post("/api/imports/profiles/2/statement", content=b"x").status_code == 404
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _import(db, profile, lines, header=HEADER, **kwargs):
+    data = "\n".join([header, *lines]).encode("utf-8")
+    return import_statement(db, profile, io.BytesIO(data), **kwargs)
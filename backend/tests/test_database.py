@@ -0,0 +1,192 @@
+"""Tests for database initialization and migrations."""
+
+import re
+import sqlite3
+
+import pytest
+
+import db.database as database
+from db.database import MIGRATIONS, SCHEMA_PATH, create_database, get_data_version, init_db
+from db.dedup import dedup_key
+
+
+@pytest.fixture
+def file_db(tmp_path, monkeypatch):
+    """Point the backend at an empty file database."""
+    path = tmp_path / "cashboard.db"
+    monkeypatch.setattr(database, "DB_PATH", str(path))
+    return path
+
+
+# ---------------------------------------------------------------------------
+# init_db — skipping the replay on an up-to-date database
+# ---------------------------------------------------------------------------
+
+class TestInitDbFingerprint:
+    def test_records_fingerprint(self, file_db):
+        init_db()
+        conn = sqlite3.connect(file_db)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == database._init_fingerprint()
+        conn.close()
+
+    def test_up_to_date_database_is_not_replayed(self, file_db):
+        init_db()
+        _delete_category(file_db, 1)
+        init_db()
+        assert _category_exists(file_db, 1) is False
+
+    def test_changed_seed_is_replayed(self, file_db, monkeypatch):
+        init_db()
+        _delete_category(file_db, 1)
+        monkeypatch.setattr(database, "_init_fingerprint", lambda: 12345)
+        init_db()
+        assert _category_exists(file_db, 1) is True
+
+
+# ---------------------------------------------------------------------------
+# init_db — upgrading an old database
+# ---------------------------------------------------------------------------
+
+class TestInitDbUpgrade:
+    def test_v1_database_is_migrated(self, file_db):
+        # Version 1 schema: transactions without the columns added by migrations
+        schema = SCHEMA_PATH.read_text(encoding="utf-8")
+        schema = re.sub(r"\n\s*(charged_month|merchant_id|dedup_key|decimal_separator) [^\n]*", "", schema)
+        schema = schema.replace("skip_rows INTEGER NOT NULL DEFAULT 0,", "skip_rows INTEGER NOT NULL DEFAULT 0")
+        schema = re.sub(r"\n[^\n]*\(dedup_key\);", "", schema)
+        conn = sqlite3.connect(file_db)
+        conn.executescript(schema)
+        conn.execute("INSERT INTO schema_version (version) VALUES (1)")
+        conn.commit()
+        conn.close()
+
+        init_db()
+
+        conn = sqlite3.connect(file_db)
+        cols = [row[1] for row in conn.execute("PRAGMA table_info(transactions)").fetchall()]
+        version = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0]
+        conn.close()
+        assert "charged_month" in cols
+        assert "merchant_id" in cols
+        assert "dedup_key" in cols
+        assert version == max(MIGRATIONS)
+
+    def test_duplicate_snapshots_are_collapsed(self, file_db):
+        init_db()
+        # A version 8 database, which had no unique (account_id, date) index
+        conn = sqlite3.connect(file_db)
+        conn.execute("DROP INDEX idx_balance_snapshots_account_date_unique")
+        _downgrade_to_v13(conn)
+        conn.execute("DELETE FROM schema_version WHERE version >= 9")
+        conn.execute("INSERT INTO accounts (id, name, bank, type) VALUES (1, 'A', 'leumi', 'personal')")
+        conn.executemany(
+            "INSERT INTO balance_snapshots (account_id, date, balance) VALUES (1, ?, ?)",
+            [("2025-01-01", 10), ("2025-01-01", 20), ("2025-01-02", 30)],
+        )
+        conn.commit()
+        conn.close()
+
+        init_db()
+
+        conn = sqlite3.connect(file_db)
+        rows = conn.execute("SELECT date, balance FROM balance_snapshots ORDER BY date").fetchall()
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO balance_snapshots (account_id, date, balance) VALUES (1, '2025-01-02', 0)")
+        conn.close()
+        assert rows == [("2025-01-01", 20), ("2025-01-02", 30)]
+
+    def test_dedup_keys_are_backfilled(self, file_db):
+        init_db()
+        # A version 13 database: transactions without dedup_key
+        conn = sqlite3.connect(file_db)
+        _downgrade_to_v13(conn)
+        conn.execute("DELETE FROM schema_version WHERE version >= 14")
+        txns = [
+            {"source_type": "bank", "source_id": 1, "date": "2025-01-05", "amount": -20.0,
+             "description": "קפה", "installment_number": None, "installment_total": None, "original_id": None},
+            {"source_type": "bank", "source_id": 1, "date": "2025-01-05", "amount": -20.0,
+             "description": "קפה", "installment_number": None, "installment_total": None, "original_id": None},
+            {"source_type": "credit_card", "source_id": 1, "date": "2025-01-05", "amount": -20.0,
+             "description": "קפה", "installment_number": None, "installment_total": None, "original_id": "a1"},
+        ]
+        conn.executemany(
+            "INSERT INTO transactions (source_type, source_id, date, amount, description, original_id) "
+            "VALUES (:source_type, :source_id, :date, :amount, :description, :original_id)",
+            txns,
+        )
+        conn.commit()
+        conn.close()
+
+        init_db()
+
+        conn = sqlite3.connect(file_db)
+        keys = [r[0] for r in conn.execute("SELECT dedup_key FROM transactions ORDER BY id")]
+        conn.close()
+        assert keys == [dedup_key(txns[0]), dedup_key(txns[1], 1), dedup_key(txns[2])]
+
+
+    def test_migration_hook_runs_only_for_pending_migration(self):
+        conn = sqlite3.connect(":memory:")
+        database._initialize(conn)
+        database._run_migrations(conn, max(MIGRATIONS))
+        with pytest.raises(sqlite3.OperationalError, match="no such function"):
+            conn.execute("SELECT dedup_key(1, 2, 3, 4, 5, 6, 7, 8, 0)")
+        conn.close()
+
+# ---------------------------------------------------------------------------
+# Template database
+# ---------------------------------------------------------------------------
+
+class TestTemplate:
+    def test_created_database_is_initialized(self, tmp_path):
+        path = tmp_path / "tenant.db"
+        create_database(path)
+        conn = sqlite3.connect(path)
+        version = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0]
+        categories = conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+        fingerprint = conn.execute("PRAGMA user_version").fetchone()[0]
+        conn.close()
+        assert version == max(MIGRATIONS)
+        assert categories > 0
+        assert fingerprint == database._init_fingerprint()
+
+    def test_copies_get_distinct_instance_ids(self, tmp_path):
+        stamps = []
+        for name in ("a.db", "b.db"):
+            create_database(tmp_path / name)
+            conn = sqlite3.connect(tmp_path / name)
+            stamps.append(get_data_version(conn, "transactions"))
+            conn.close()
+        assert stamps[0] != stamps[1]
+
+    def test_copies_are_independent(self, tmp_path):
+        create_database(tmp_path / "a.db")
+        _delete_category(tmp_path / "a.db", 1)
+        create_database(tmp_path / "b.db")
+        assert _category_exists(tmp_path / "b.db", 1) is True
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _delete_category(path, category_id):
+    conn = sqlite3.connect(path)
+    conn.execute("DELETE FROM classification_rules WHERE category_id = ?", (category_id,))
+    conn.execute("DELETE FROM categories WHERE id = ?", (category_id,))
+    conn.commit()
+    conn.close()
+
+
+def _category_exists(path, category_id):
+    conn = sqlite3.connect(path)
+    row = conn.execute("SELECT 1 FROM categories WHERE id = ?", (category_id,)).fetchone()
+    conn.close()
+    return row is not None
+
+
+def _downgrade_to_v13(conn):
+    """Undo migrations 014 and 015, to simulate an older database."""
+    conn.execute("DROP INDEX idx_transactions_dedup_key")
+    conn.execute("ALTER TABLE transactions DROP COLUMN dedup_key")
+    conn.execute("ALTER TABLE import_profiles DROP COLUMN decimal_separator")
@@ -0,0 +1,99 @@
+"""Tests for ETag / If-None-Match handling on the read routes."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app import app
+from api.etag import etag_matches
+from ingestion.ingest import ingest_file
+
+client = TestClient(app)
+
+
+# ---------------------------------------------------------------------------
+# etag_matches
+# ---------------------------------------------------------------------------
+
+class TestEtagMatches:
+    @pytest.mark.parametrize("header, expected", [
+        ('"1-2"', True),
+        ('W/"1-2"', True),
+        ('"0-0", "1-2"', True),
+        ("*", True),
+        ('"1-3"', False),
+        ("", False),
+        (None, False),
+    ])
+    def test_matching(self, header, expected):
+        assert etag_matches(header, '"1-2"') is expected
+
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+class TestConditionalGet:
+    def test_get_sets_etag(self):
+        resp = client.get("/api/categories")
+        assert resp.status_code == 200
+        assert resp.headers["etag"].startswith('"')
+
+    def test_unchanged_returns_304(self):
+        tag = client.get("/api/categories").headers["etag"]
+        resp = client.get("/api/categories", headers={"If-None-Match": tag})
+        assert resp.status_code == 304
+        assert resp.content == b""
+        assert resp.headers["etag"] == tag
+
+    def test_write_changes_etag(self):
+        tag = client.get("/api/categories").headers["etag"]
+        client.post("/api/categories", json={"name": "Pets"})
+        resp = client.get("/api/categories", headers={"If-None-Match": tag})
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != tag
+
+    def test_other_tables_keep_their_etag(self):
+        tag = client.get("/api/accounts").headers["etag"]
+        client.post("/api/categories", json={"name": "Pets"})
+        assert client.get("/api/accounts", headers={"If-None-Match": tag}).status_code == 304
+
+    def test_detail_route_shares_table_etag(self):
+        list_tag = client.get("/api/classification-rules").headers["etag"]
+        assert client.get("/api/classification-rules/1").headers["etag"] == list_tag
+
+    def test_transaction_update_changes_etag(self, db):
+        _insert_transaction(db)
+        tag = client.get("/api/transactions").headers["etag"]
+        client.put("/api/transactions/1", json={"notes": "checked"})
+        assert client.get("/api/transactions", headers={"If-None-Match": tag}).status_code == 200
+
+    def test_ingestion_changes_transactions_etag(self, db, tmp_path):
+        db.execute(
+            "INSERT INTO accounts (id, name, bank, type, scraper_type) "
+            "VALUES (1, 'Test Account', 'leumi', 'personal', 'leumi')"
+        )
+        db.commit()
+        tag = client.get("/api/transactions").headers["etag"]
+        path = tmp_path / "leumi.json"
+        txns = [{"date": "2025-06-10T08:00:00.000Z", "chargedAmount": -5, "description": "x", "identifier": 1}]
+        path.write_text(json.dumps({"bank": "leumi", "accounts": [{"accountNumber": "1", "txns": txns}]}))
+        ingest_file(path, db=db)
+        assert client.get("/api/transactions", headers={"If-None-Match": tag}).status_code == 200
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _insert_transaction(db):
+    db.execute(
+        "INSERT INTO accounts (id, name, bank, type, scraper_type) "
+        "VALUES (1, 'Test Account', 'leumi', 'personal', 'leumi')"
+    )
+    db.execute(
+        "INSERT INTO transactions (id, source_type, source_id, date, amount, description, category_id) "
+        "VALUES (1, 'bank', 1, '2025-01-15', -100, 'test', 1)"
+    )
+    db.commit()
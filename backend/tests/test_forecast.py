@@ -0,0 +1,233 @@
+"""Tests for the end-of-month forecast and its precomputed profiles."""
+
+import json
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app import app
+from db.database import MIGRATIONS
+from ingestion.ingest import _upsert_balance_snapshot, ingest_file
+from services.forecast import forecast_month, rebuild_spend
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def setup(db):
+    db.execute("INSERT INTO accounts (id, name, bank, type, scraper_type) VALUES (1, 'A', 'leumi', 'personal', 'leumi')")
+    db.execute("INSERT INTO credit_cards (id, account_id, name, company, last_4_digits, scraper_type) "
+               "VALUES (1, 1, 'Card', 'max', '1234', 'max')")
+    db.execute("INSERT INTO fixed_expenses (id, name, expected_amount, keyword, day_of_month, account_id) "
+               "VALUES (1, 'Rent', 4000, 'rent', 1, 1)")
+    db.execute("INSERT INTO fixed_incomes (id, name, expected_amount, keyword, day_of_month, account_id) "
+               "VALUES (1, 'Salary', 10000, 'salary', 10, 1)")
+    db.commit()
+    return db
+
+
+# ---------------------------------------------------------------------------
+# Profiles maintained at ingest
+# ---------------------------------------------------------------------------
+
+class TestProfiles:
+    def test_ingest_records_profile_months_and_matches(self, setup, tmp_path):
+        _ingest(setup, tmp_path, "leumi", "123", [
+            ("2025-01-05", -100, "שופרסל 1"),
+            ("2025-01-05", -50, "שופרסל 2"),
+            ("2025-01-01", -4000, "rent jan"),
+        ])
+        profile = setup.execute("SELECT account_id, category_id, day_of_month, total, txn_count FROM spend_profiles").fetchall()
+        assert [tuple(r) for r in profile] == [(1, 2, 5, 150, 2)]
+        months = setup.execute("SELECT account_id, month FROM spend_profile_months").fetchall()
+        assert [tuple(r) for r in months] == [(1, "2025-01")]
+        matches = setup.execute("SELECT kind, fixed_id, month FROM fixed_matches").fetchall()
+        assert [tuple(r) for r in matches] == [("expense", 1, "2025-01")]
+
+    def test_card_spend_goes_to_card_account(self, setup, tmp_path):
+        _ingest(setup, tmp_path, "max", "1234", [("2025-01-07", -80, "שופרסל")])
+        row = setup.execute("SELECT account_id, day_of_month, total FROM spend_profiles").fetchone()
+        assert tuple(row) == (1, 7, 80)
+
+    def test_duplicates_are_not_counted_twice(self, setup, tmp_path):
+        txns = [("2025-01-05", -100, "שופרסל")]
+        _ingest(setup, tmp_path, "leumi", "123", txns)
+        _ingest(setup, tmp_path, "leumi", "123", txns)
+        assert setup.execute("SELECT total FROM spend_profiles").fetchone()[0] == 100
+
+    def test_migration_backfill_matches_incremental(self, setup, tmp_path):
+        _ingest(setup, tmp_path, "leumi", "123", [
+            ("2025-01-05", -100, "שופרסל"), ("2025-02-10", 10000, "salary feb"), ("2025-01-01", -4000, "rent"),
+        ])
+        _ingest(setup, tmp_path, "max", "1234", [("2025-01-07", -80, "שופרסל")])
+        tables = ("spend_profiles", "spend_profile_months", "fixed_matches")
+        incremental = {t: _rows(setup, t) for t in tables}
+        for t in tables:
+            setup.execute(f"DELETE FROM {t}")
+        setup.executescript(MIGRATIONS[10].read_text(encoding="utf-8"))
+        setup.executescript(MIGRATIONS[16].read_text(encoding="utf-8"))
+        assert {t: _rows(setup, t) for t in tables} == incremental
+        rebuild_spend(setup)
+        assert {t: _rows(setup, t) for t in tables} == incremental
+
+    def test_reclassify_moves_spend(self, setup, tmp_path):
+        _ingest(setup, tmp_path, "leumi", "123", [("2025-01-05", -100, "שופרסל")])
+        txn_id = setup.execute("SELECT id FROM transactions").fetchone()[0]
+        resp = client.put(f"/api/transactions/{txn_id}/classify",
+                          json={"category_id": 3, "transaction_type": "variable_expense"})
+        assert resp.status_code == 200
+        client.put(f"/api/transactions/{txn_id}", json={"amount": -120})
+        rows = setup.execute("SELECT category_id, total FROM spend_profiles WHERE total != 0").fetchall()
+        assert [tuple(r) for r in rows] == [(3, 120)]
+
+    def test_reclassify_moves_fixed_match(self, setup, tmp_path):
+        _ingest(setup, tmp_path, "leumi", "123", [("2025-03-01", -3000, "RENT payment")])
+        txn_id = setup.execute("SELECT id FROM transactions").fetchone()[0]
+
+        def unpaid():
+            return [f["name"] for f in forecast_month(setup, "2025-03", today=date(2025, 3, 15))
+                    ["remaining_fixed_expenses"]]
+
+        assert unpaid() == []
+        client.put(f"/api/transactions/{txn_id}/classify",
+                   json={"category_id": 3, "transaction_type": "variable_expense"})
+        assert unpaid() == ["Rent"]
+        client.put(f"/api/transactions/{txn_id}/classify",
+                   json={"category_id": 3, "transaction_type": "fixed_expense"})
+        assert unpaid() == []
+        client.put(f"/api/transactions/{txn_id}", json={"amount": -3100})
+        assert _rows(setup, "fixed_matches") == [("expense", 1, "2025-03", txn_id, -3100)]
+
+    def test_fixed_item_changes_rematch(self, setup, tmp_path):
+        _ingest(setup, tmp_path, "leumi", "123", [("2025-03-01", -3000, "rent payment")])
+        body = {"name": "Parking", "expected_amount": 300, "keyword": "payment", "account_id": 1}
+        parking = client.post("/api/fixed-expenses", json=body).json()["id"]
+        assert _matched(setup) == [("expense", 1)]
+
+        rent = {"name": "Rent", "expected_amount": 4000, "keyword": "lease", "day_of_month": 1, "account_id": 1}
+        client.put("/api/fixed-expenses/1", json=rent)
+        assert _matched(setup) == [("expense", parking)]
+        client.delete(f"/api/fixed-expenses/{parking}")
+        assert _matched(setup) == []
+
+    def test_income_changes_rematch(self, setup, tmp_path):
+        _ingest(setup, tmp_path, "leumi", "123", [("2025-03-10", 12000, "bonus")])
+        client.put("/api/fixed-incomes/1", json={"name": "Salary", "expected_amount": 10000,
+                                                 "keyword": "bonus", "account_id": 1})
+        # Only transactions classified as income are matched
+        assert _matched(setup) == []
+        txn_id = setup.execute("SELECT id FROM transactions").fetchone()[0]
+        client.put(f"/api/transactions/{txn_id}/classify", json={"category_id": 1, "transaction_type": "income"})
+        assert _matched(setup) == [("income", 1)]
+
+    def test_card_account_change_moves_spend(self, setup, tmp_path):
+        setup.execute("INSERT INTO accounts (id, name, bank, type) VALUES (2, 'B', 'hapoalim', 'shared')")
+        setup.commit()
+        _ingest(setup, tmp_path, "max", "1234", [("2025-01-07", -80, "שופרסל")])
+        client.put("/api/credit-cards/1", json={"account_id": 2, "name": "Card", "company": "max",
+                                               "last_4_digits": "1234", "scraper_type": "max"})
+        assert _rows(setup, "spend_profiles") == [(2, 2, "2025-01", 7, 80, 1)]
+        assert _rows(setup, "spend_profile_months") == [(2, "2025-01")]
+
+    def test_billing_day_change_moves_match_month(self, setup, tmp_path):
+        _ingest(setup, tmp_path, "max", "1234", [("2025-03-20", -3000, "rent")])
+        assert setup.execute("SELECT month FROM fixed_matches").fetchone()[0] == "2025-03"
+        client.put("/api/credit-cards/1", json={"account_id": 1, "name": "Card", "company": "max",
+                                               "last_4_digits": "1234", "billing_day": 10, "scraper_type": "max"})
+        assert setup.execute("SELECT month FROM fixed_matches").fetchone()[0] == "2025-04"
+
+
+# ---------------------------------------------------------------------------
+# forecast_month
+# ---------------------------------------------------------------------------
+
+class TestForecast:
+    def test_forecast_combines_components(self, setup, tmp_path):
+        # Two months of history: 300 per month spent after the 15th
+        _ingest(setup, tmp_path, "leumi", "123", [
+            ("2025-01-20", -200, "שופרסל"), ("2025-01-05", -999, "שופרסל"),
+            ("2025-02-25", -400, "שופרסל"), ("2025-03-01", -4000, "rent mar"),
+        ])
+        _upsert_balance_snapshot(setup, 1, "2025-03-15", 5000)
+        setup.commit()
+
+        result = forecast_month(setup, "2025-03", today=date(2025, 3, 15))
+        assert result["remaining_days"] == 16
+        assert result["current_balance"] == 5000
+        assert [i["name"] for i in result["expected_income"]] == ["Salary"]
+        assert result["expected_income"][0]["overdue"] is True
+        assert result["remaining_fixed_expenses"] == []
+        assert result["variable_by_category"] == {2: 300}
+        assert result["forecast_balance"] == 5000 + 10000 - 300
+
+    def test_past_month_averages_earlier_months_only(self, setup, tmp_path):
+        _ingest(setup, tmp_path, "leumi", "123", [
+            ("2025-01-20", -200, "שופרסל"), ("2025-02-20", -400, "שופרסל"), ("2025-03-20", -900, "שופרסל"),
+        ])
+        # February looks back at January only, whatever was spent since
+        result = forecast_month(setup, "2025-02", today=date(2025, 2, 1))
+        assert result["variable_by_category"] == {2: 200}
+        result = forecast_month(setup, "2025-04", today=date(2025, 4, 1))
+        assert result["variable_by_category"] == {2: 500}
+
+    def test_unpaid_fixed_expense_is_expected(self, setup):
+        result = forecast_month(setup, "2025-03", today=date(2025, 3, 15))
+        assert [(f["name"], f["amount"]) for f in result["remaining_fixed_expenses"]] == [("Rent", 4000)]
+        assert result["estimated_variable_total"] == 0
+
+    def test_period_of_fixed_expense(self, setup, tmp_path):
+        setup.execute("UPDATE fixed_expenses SET frequency = 'yearly' WHERE id = 1")
+        setup.commit()
+        _ingest(setup, tmp_path, "leumi", "123", [("2024-06-01", -4000, "rent")])
+        assert forecast_month(setup, "2025-05", today=date(2025, 5, 1))["remaining_fixed_total"] == 0
+        assert forecast_month(setup, "2025-06", today=date(2025, 6, 1))["remaining_fixed_total"] == 4000
+
+    def test_weekly_income_counts_remaining_weeks(self, setup):
+        setup.execute("UPDATE fixed_incomes SET frequency = 'weekly', expected_amount = 100 WHERE id = 1")
+        setup.commit()
+        result = forecast_month(setup, "2025-03", today=date(2025, 3, 10))
+        assert result["expected_income_total"] == 300
+
+    def test_other_account_is_excluded(self, setup):
+        setup.execute("INSERT INTO accounts (id, name, bank, type) VALUES (2, 'B', 'hapoalim', 'shared')")
+        setup.commit()
+        result = forecast_month(setup, "2025-03", account_id=2, today=date(2025, 3, 10))
+        assert result["expected_income"] == []
+        assert result["remaining_fixed_expenses"] == []
+
+
+# ---------------------------------------------------------------------------
+# GET /api/forecast
+# ---------------------------------------------------------------------------
+
+class TestForecastRoute:
+    def test_defaults_to_current_month(self, setup):
+        resp = client.get("/api/forecast")
+        assert resp.status_code == 200
+        assert resp.json()["month"] == date.today().strftime("%Y-%m")
+
+    def test_invalid_month(self):
+        assert client.get("/api/forecast", params={"month": "2025-13"}).status_code == 400
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _ingest(db, tmp_path, bank, number, txns):
+    path = tmp_path / f"{bank}.json"
+    raw = [{"date": f"{day}T10:00:00.000Z", "chargedAmount": amount, "description": desc,
+            "identifier": f"{day}-{desc}-{amount}"} for day, amount, desc in txns]
+    path.write_text(json.dumps({"bank": bank, "accounts": [{"accountNumber": number, "txns": raw}]}))
+    result = ingest_file(path, db=db)
+    assert result["errors"] == []
+    return result
+
+
+def _rows(db, table):
+    return sorted(tuple(r) for r in db.execute(f"SELECT * FROM {table}").fetchall())
+
+
+def _matched(db):
+    return [tuple(r) for r in db.execute("SELECT kind, fixed_id FROM fixed_matches ORDER BY kind, fixed_id")]
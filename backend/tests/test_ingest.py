@@ -0,0 +1,145 @@
+"""Tests for ingestion normalization helpers."""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from db.dedup import dedup_key
+from ingestion.dates import ISRAEL_TZ, IsraelDateConverter
+from ingestion.duplicate_checker import check_duplicate
+from ingestion.ingest import STAGES, _insert_transaction, _normalize_date, ingest_file
+
+
+# ---------------------------------------------------------------------------
+# _normalize_date / IsraelDateConverter
+# ---------------------------------------------------------------------------
+
+class TestNormalizeDate:
+    def test_utc_midnight_is_same_israel_day(self):
+        assert _normalize_date("2025-06-10T00:00:00.000Z") == "2025-06-10"
+
+    def test_evening_utc_rolls_to_next_israel_day(self):
+        # 21:00Z = 00:00 IDT (summer), 22:00Z = 00:00 IST (winter)
+        assert _normalize_date("2025-06-10T21:00:00.000Z") == "2025-06-11"
+        assert _normalize_date("2025-01-10T21:00:00.000Z") == "2025-01-10"
+        assert _normalize_date("2025-01-10T22:00:00.000Z") == "2025-01-11"
+
+    def test_year_end_rollover(self):
+        assert _normalize_date("2025-12-31T22:30:00Z") == "2026-01-01"
+
+    def test_offset_form_uses_fallback(self):
+        assert _normalize_date("2025-06-10T21:00:00+00:00") == "2025-06-11"
+
+    def test_empty(self):
+        assert _normalize_date(None) is None
+        assert _normalize_date("") is None
+
+    @pytest.mark.parametrize("year", [2024, 2025])
+    def test_matches_zoneinfo_across_dst(self, year):
+        converter = IsraelDateConverter(memo_size=16)
+        t = datetime(year, 3, 20, tzinfo=timezone.utc)
+        end = datetime(year, 11, 1, tzinfo=timezone.utc)
+        while t < end:
+            iso = t.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            assert converter.to_date(iso) == t.astimezone(ISRAEL_TZ).strftime("%Y-%m-%d"), iso
+            t += timedelta(minutes=30)
+
+
+# ---------------------------------------------------------------------------
+# Stage timings
+# ---------------------------------------------------------------------------
+
+class TestStageTimings:
+    def test_result_has_every_stage(self, db, tmp_path):
+        path = _write_dump(db, tmp_path)
+        result = ingest_file(path, db=db)
+        assert result["rows"] == 2
+        assert set(result["timings_ms"]) == set(STAGES)
+        assert all(ms >= 0 for ms in result["timings_ms"].values())
+        assert result["total_ms"] >= sum(result["timings_ms"].values())
+
+    def test_recorded_in_ingest_metrics(self, db, tmp_path):
+        path = _write_dump(db, tmp_path)
+        result = ingest_file(path, db=db)
+        row = db.execute("SELECT * FROM ingest_metrics").fetchone()
+        assert row["file"] == str(path)
+        assert row["bank"] == "leumi"
+        assert row["rows"] == 2
+        assert row["inserted"] == 2
+        assert row["classify_ms"] == result["timings_ms"]["classify"]
+
+    def test_failed_file_still_timed(self, db, tmp_path):
+        path = tmp_path / "broken.json"
+        path.write_text("{not json", encoding="utf-8")
+        result = ingest_file(path, db=db)
+        assert result["errors"]
+        assert set(result["timings_ms"]) == set(STAGES)
+        assert db.execute("SELECT COUNT(*) FROM ingest_metrics").fetchone()[0] == 0
+
+
+# ---------------------------------------------------------------------------
+# Dedup keys
+# ---------------------------------------------------------------------------
+
+class TestDedupKeys:
+    def test_completed_rows_without_identifier_are_not_reinserted(self, db, tmp_path):
+        coffee = {"date": "2025-06-11T08:00:00.000Z", "chargedAmount": -20, "description": "קפה",
+                  "status": "completed"}
+        # Two equal purchases on one day are two transactions, on every ingest
+        path = _write_dump(db, tmp_path, [coffee, dict(coffee)])
+        assert ingest_file(path, db=db)["inserted"] == 2
+        result = ingest_file(path, db=db)
+        assert (result["inserted"], result["skipped"]) == (0, 2)
+        assert db.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 2
+
+    def test_pending_row_without_identifier_completes(self, db, tmp_path):
+        txn = {"date": "2025-06-11T08:00:00.000Z", "chargedAmount": -20, "description": "קפה",
+               "status": "pending"}
+        ingest_file(_write_dump(db, tmp_path, [txn]), db=db)
+        path = tmp_path / "completed.json"
+        path.write_text(json.dumps({"bank": "leumi", "accounts": [
+            {"accountNumber": "123", "txns": [{**txn, "status": "completed"}]}]}), encoding="utf-8")
+        assert ingest_file(path, db=db)["updated"] == 1
+        assert [r[0] for r in db.execute("SELECT status FROM transactions")] == ["completed"]
+
+    def test_key_normalizes_description(self):
+        txn = {"source_type": "bank", "source_id": 1, "date": "2025-06-11", "amount": -20,
+               "description": "Cafe  Joe", "original_id": None}
+        assert dedup_key(txn) == dedup_key({**txn, "description": " cafe joe", "amount": -20.0})
+        assert dedup_key(txn) != dedup_key({**txn, "installment_number": 1, "installment_total": 3})
+        assert dedup_key(txn) != dedup_key({**txn, "source_id": 2})
+        # With an identifier only the source and the identifier count
+        assert dedup_key({**txn, "original_id": "7"}) == dedup_key({**txn, "amount": -5, "original_id": "7"})
+
+    def test_insert_ignores_stored_key(self, db, tmp_path):
+        ingest_file(_write_dump(db, tmp_path), db=db)
+        stored = dict(db.execute("SELECT * FROM transactions ORDER BY id").fetchone())
+        assert check_duplicate(db, stored)[0] == "duplicate"
+        assert _insert_transaction(db, {**stored, "notes": "again"}) is None
+        assert db.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 2
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _write_dump(db, tmp_path, txns=None):
+    """Create a leumi account and write a dump for it (two transactions by default)."""
+    db.execute(
+        "INSERT INTO accounts (id, name, bank, type, scraper_type) "
+        "VALUES (1, 'Test Account', 'leumi', 'personal', 'leumi')"
+    )
+    db.commit()
+
+    txns = txns or [
+        {"date": "2025-06-10T08:00:00.000Z", "chargedAmount": -50, "description": "שופרסל",
+         "identifier": 1, "status": "completed"},
+        {"date": "2025-06-11T08:00:00.000Z", "chargedAmount": -20, "description": "קפה",
+         "identifier": 2, "status": "completed"},
+    ]
+    dump = {"bank": "leumi", "scrapedAt": "2025-06-12T08:00:00.000Z",
+            "accounts": [{"accountNumber": "123", "balance": 1000, "txns": txns}]}
+    path = tmp_path / "leumi.json"
+    path.write_text(json.dumps(dump, ensure_ascii=False), encoding="utf-8")
+    return path
@@ -0,0 +1,141 @@
+"""Tests for the metrics registry and the /metrics endpoint."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import db.database as database
+from api.app import app
+from db.database import TenantRegistry
+from ingestion.ingest import ingest_file
+from metrics import REGISTRY, Registry, Counter, Gauge, Histogram
+
+client = TestClient(app)
+
+
+# ---------------------------------------------------------------------------
+# Registry rendering
+# ---------------------------------------------------------------------------
+
+class TestRegistry:
+    def test_counter_with_labels(self):
+        registry = Registry()
+        c = registry.register(Counter("jobs", "Jobs run", ("status",)))
+        c.labels("ok").inc()
+        c.labels("ok").inc(2)
+        c.labels("failed").inc()
+        text = registry.render()
+        assert "# TYPE jobs_total counter" in text
+        assert 'jobs_total{status="ok"} 3' in text
+        assert 'jobs_total{status="failed"} 1' in text
+
+    def test_unlabelled_gauge(self):
+        registry = Registry()
+        g = registry.register(Gauge("size_bytes", "Size"))
+        g.set(1.5)
+        assert "size_bytes 1.5\n" in registry.render()
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        h = registry.register(Histogram("latency_seconds", "Latency", buckets=(0.1, 1)))
+        for v in (0.05, 0.5, 5):
+            h.observe(v)
+        text = registry.render()
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1"} 2' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "latency_seconds_count 3" in text
+        assert "latency_seconds_sum 5.55" in text
+
+    def test_label_values_escaped(self):
+        registry = Registry()
+        c = registry.register(Counter("files", "Files", ("name",)))
+        c.labels('a"b\\c').inc()
+        assert 'files_total{name="a\\"b\\\\c"} 1' in registry.render()
+
+    def test_wrong_label_count(self):
+        c = Counter("x", "X", ("a", "b"))
+        with pytest.raises(ValueError):
+            c.labels("only-one")
+
+    def test_register_same_name_returns_existing(self):
+        registry = Registry()
+        first = registry.register(Counter("dup", "Dup"))
+        assert registry.register(Counter("dup", "Dup")) is first
+
+    def test_collectors_run_before_render(self):
+        registry = Registry()
+        g = registry.register(Gauge("ticks", "Ticks"))
+        registry.add_collector(lambda: g.set(7))
+        assert "ticks 7" in registry.render()
+
+
+# ---------------------------------------------------------------------------
+# /metrics endpoint
+# ---------------------------------------------------------------------------
+
+class TestMetricsEndpoint:
+    def test_text_exposition(self):
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain")
+        assert "# TYPE cashboard_db_size_bytes gauge" in resp.text
+
+    def test_ingestion_and_classification_counted(self, db, tmp_path):
+        before = _sample(REGISTRY.render(), 'cashboard_ingested_transactions_total{bank="leumi",result="inserted"}')
+        uncategorized = _sample(REGISTRY.render(), 'cashboard_classified_transactions_total{outcome="uncategorized"}')
+
+        db.execute(
+            "INSERT INTO accounts (id, name, bank, type, scraper_type) "
+            "VALUES (1, 'Test Account', 'leumi', 'personal', 'leumi')"
+        )
+        db.commit()
+        txns = [{"date": "2025-06-10T08:00:00.000Z", "chargedAmount": -50,
+                 "description": "unknown merchant xyz", "identifier": 1}]
+        path = tmp_path / "leumi.json"
+        path.write_text(json.dumps({"bank": "leumi", "accounts": [{"accountNumber": "1", "txns": txns}]}))
+        ingest_file(path, db=db)
+
+        text = client.get("/metrics").text
+        assert _sample(text, 'cashboard_ingested_transactions_total{bank="leumi",result="inserted"}') == before + 1
+        assert _sample(text, 'cashboard_classified_transactions_total{outcome="uncategorized"}') == uncategorized + 1
+        assert _sample(text, 'cashboard_transactions{state="uncategorized"}') == 1
+
+    def test_async_queries_are_timed(self):
+        before = _sample(REGISTRY.render(), "cashboard_db_query_seconds_count")
+        assert client.get("/api/categories").status_code == 200
+        assert _sample(REGISTRY.render(), "cashboard_db_query_seconds_count") > before
+
+    def test_db_stats_per_open_tenant(self, tmp_path, monkeypatch):
+        registry = TenantRegistry(tmp_path, max_open=2)
+        monkeypatch.setattr(database, "_tenants", registry)
+        try:
+            conn = registry.pool("alpha").connect()
+            conn.execute("INSERT INTO transactions (date, amount, category_id, source_type, source_id) "
+                         "VALUES ('2025-01-01', -5, 1, 'bank', 1)")
+            conn.commit()
+            conn.close()
+            registry.pool("beta")
+            text = REGISTRY.render()
+            assert _sample(text, 'cashboard_tenant_transactions{tenant="alpha",state="uncategorized"}') == 1
+            assert 'cashboard_tenant_transactions{tenant="beta",state="uncategorized"} 0' in text
+            assert _sample(text, 'cashboard_tenant_db_size_bytes{tenant="beta"}') > 0
+
+            registry.pool("gamma")
+            assert 'tenant="alpha"' not in REGISTRY.render()
+        finally:
+            registry.close()
+            REGISTRY.render()
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _sample(text: str, series: str) -> float:
+    """Return the value of one series in exposition text (0 if absent)."""
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
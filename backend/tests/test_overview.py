@@ -0,0 +1,128 @@
+"""Tests for GET /api/overview and the account_latest_balance table."""
+
+import json
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from api.app import app
+from db.database import MIGRATIONS
+from ingestion.ingest import _upsert_balance_snapshot, _upsert_balance_snapshots, ingest_file
+from services import budget as budget_service
+
+client = TestClient(app)
+
+
+# ---------------------------------------------------------------------------
+# account_latest_balance
+# ---------------------------------------------------------------------------
+
+class TestLatestBalance:
+    def test_upsert_tracks_newest_snapshot(self, db):
+        _add_account(db, 1)
+        _upsert_balance_snapshot(db, 1, "2025-01-10", 100)
+        _upsert_balance_snapshot(db, 1, "2025-01-20", 200)
+        _upsert_balance_snapshot(db, 1, "2025-01-15", 150)
+        assert _latest(db, 1) == ("2025-01-20", 200)
+
+    def test_same_day_snapshot_updates_balance(self, db):
+        _add_account(db, 1)
+        _upsert_balance_snapshot(db, 1, "2025-01-20", 200)
+        _upsert_balance_snapshot(db, 1, "2025-01-20", 250)
+        assert _latest(db, 1) == ("2025-01-20", 250)
+        count = db.execute("SELECT COUNT(*) FROM balance_snapshots").fetchone()[0]
+        assert count == 1
+
+    def test_batch_upsert(self, db):
+        _add_account(db, 1)
+        _add_account(db, 2)
+        _upsert_balance_snapshots(db, [(1, "2025-01-20", 200), (2, "2025-01-20", 50), (1, "2025-01-20", 210)])
+        assert _latest(db, 1) == ("2025-01-20", 210)
+        assert _latest(db, 2) == ("2025-01-20", 50)
+        count = db.execute("SELECT COUNT(*) FROM balance_snapshots").fetchone()[0]
+        assert count == 2
+
+    def test_ingestion_maintains_table(self, db, tmp_path):
+        _add_account(db, 1)
+        path = tmp_path / "leumi.json"
+        path.write_text(json.dumps({"bank": "leumi", "accounts": [{"accountNumber": "123", "balance": 1000, "txns": []}]}))
+        ingest_file(path, db=db)
+        assert _latest(db, 1)[1] == 1000
+
+    def test_migration_backfills_from_history(self, db):
+        _add_account(db, 1)
+        _add_account(db, 2)
+        db.executemany(
+            "INSERT INTO balance_snapshots (account_id, date, balance) VALUES (?, ?, ?)",
+            [(1, "2025-01-01", 10), (1, "2025-03-01", 30), (1, "2025-02-01", 20), (2, "2025-01-05", 5)],
+        )
+        db.executescript(MIGRATIONS[7].read_text(encoding="utf-8"))
+        assert _latest(db, 1) == ("2025-03-01", 30)
+        assert _latest(db, 2) == ("2025-01-05", 5)
+
+
+# ---------------------------------------------------------------------------
+# GET /api/overview
+# ---------------------------------------------------------------------------
+
+class TestOverview:
+    def test_empty_database(self):
+        body = client.get("/api/overview").json()
+        assert body["month"] == date.today().strftime("%Y-%m")
+        assert body["total_balance"] == 0
+        assert body["accounts"] == []
+        assert body["savings"] == []
+
+    def test_balances_and_savings(self, db):
+        _add_account(db, 1)
+        _add_account(db, 2)
+        _upsert_balance_snapshot(db, 1, "2025-01-10", 100)
+        _upsert_balance_snapshot(db, 1, "2025-02-10", 300)
+        db.execute("INSERT INTO savings (name, account_id, current_amount) VALUES ('Deposit', 1, 5000)")
+        db.commit()
+
+        body = client.get("/api/overview").json()
+        assert body["total_balance"] == 300
+        assert [(a["account_id"], a["balance"]) for a in body["accounts"]] == [(1, 300), (2, None)]
+        assert body["savings_total"] == 5000
+
+    def test_remaining_budget(self, db):
+        _add_account(db, 1)
+        month = date.today().strftime("%Y-%m")
+        db.execute("UPDATE categories SET monthly_budget = 1000 WHERE id = 2")
+        db.executemany(
+            "INSERT INTO transactions (source_type, source_id, date, amount, description, category_id) "
+            "VALUES ('bank', 1, ?, ?, 'x', ?)",
+            [(f"{month}-01", -300, 2), (f"{month}-02", -50, 1), ("2000-01-01", -999, 2)],
+        )
+        # Inserted behind the budget counters' back
+        budget_service.rebuild(db)
+        db.commit()
+
+        budget = client.get("/api/overview").json()["budget"]
+        assert budget == {"total": 1000, "spent": 300, "remaining": 700}
+
+    def test_category_write_refreshes_cached_overview(self, db):
+        assert client.get("/api/overview").json()["budget"]["total"] == 0
+        resp = client.put("/api/categories/2", json={"name": "Groceries", "monthly_budget": 400})
+        assert resp.status_code == 200
+        assert client.get("/api/overview").json()["budget"]["total"] == 400
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _add_account(db, account_id):
+    db.execute(
+        "INSERT INTO accounts (id, name, bank, type, scraper_type) VALUES (?, ?, 'leumi', 'personal', 'leumi')",
+        (account_id, f"Account {account_id}"),
+    )
+    db.commit()
+
+
+def _latest(db, account_id):
+    row = db.execute(
+        "SELECT date, balance FROM account_latest_balance WHERE account_id = ?", (account_id,)
+    ).fetchone()
+    return tuple(row) if row else None
@@ -0,0 +1,114 @@
+"""Tests for per-request timing and SQL profiling."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import db.profiling as profiling
+from api.profiling import ProfilingMiddleware, RollingHistogram, metrics_store
+from api.routes import categories, debug
+from db.database import get_connection
+from db.profiling import ProfilingConnection, end_profile, start_profile
+
+
+@pytest.fixture
+def profiled_client(monkeypatch):
+    monkeypatch.setattr(profiling, "ENABLED", True)
+    metrics_store.clear()
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(categories.router)
+    app.include_router(debug.router)
+    yield TestClient(app)
+    metrics_store.clear()
+
+
+# ---------------------------------------------------------------------------
+# ProfilingConnection
+# ---------------------------------------------------------------------------
+
+class TestProfilingConnection:
+    def test_connection_factory_follows_flag(self, monkeypatch):
+        conn = get_connection()
+        assert not isinstance(conn, ProfilingConnection)
+        conn.close()
+
+        monkeypatch.setattr(profiling, "ENABLED", True)
+        conn = get_connection()
+        assert isinstance(conn, ProfilingConnection)
+        conn.close()
+
+    def test_no_profile_records_nothing(self, monkeypatch):
+        monkeypatch.setattr(profiling, "ENABLED", True)
+        conn = get_connection()
+        assert conn.execute("SELECT 1").fetchone()[0] == 1
+        conn.close()
+
+    def test_counts_and_times_statements(self, monkeypatch):
+        monkeypatch.setattr(profiling, "ENABLED", True)
+        conn = get_connection()
+        profile, token = start_profile()
+        try:
+            conn.execute("SELECT COUNT(*) FROM categories").fetchone()
+            conn.executemany("INSERT INTO data_versions (name) VALUES (?)", [("a",), ("b",)])
+        finally:
+            end_profile(token)
+            conn.close()
+        assert profile.statements == 2
+        assert profile.sql_seconds > 0
+        assert profile.slowest is not None
+
+    def test_slow_statement_captures_plan(self, monkeypatch):
+        monkeypatch.setattr(profiling, "ENABLED", True)
+        monkeypatch.setattr(profiling, "SLOW_QUERY_MS", 0)
+        conn = get_connection()
+        profile, token = start_profile()
+        try:
+            conn.execute("SELECT * FROM transactions WHERE source_id = ? AND date = ?", (1, "2024-01-01"))
+        finally:
+            end_profile(token)
+            conn.close()
+        assert len(profile.slow) == 1
+        assert any("idx_transactions_source_date" in line for line in profile.slow[0].plan)
+
+
+# ---------------------------------------------------------------------------
+# Middleware and debug endpoint
+# ---------------------------------------------------------------------------
+
+class TestProfilingMiddleware:
+    def test_server_timing_header(self, profiled_client):
+        resp = profiled_client.get("/api/categories")
+        assert resp.status_code == 200
+        timing = resp.headers["server-timing"]
+        assert "app;dur=" in timing
+        assert "sql;dur=" in timing
+        assert "statements" in timing
+
+    def test_metrics_grouped_by_route_template(self, profiled_client):
+        profiled_client.get("/api/categories/1")
+        profiled_client.get("/api/categories/2")
+        data = profiled_client.get("/api/_debug/metrics").json()
+        route = data["routes"]["GET /api/categories/{category_id}"]
+        assert route["wall_ms"]["count"] == 2
+        assert route["statements"]["p50"] >= 1
+
+    def test_reset_metrics(self, profiled_client):
+        profiled_client.get("/api/categories")
+        assert profiled_client.delete("/api/_debug/metrics").status_code == 204
+        routes = profiled_client.get("/api/_debug/metrics").json()["routes"]
+        assert "GET /api/categories" not in routes
+
+
+class TestRollingHistogram:
+    def test_window_keeps_latest_values(self):
+        hist = RollingHistogram(window=3)
+        for v in (100, 1, 2, 3):
+            hist.observe(v)
+        snap = hist.snapshot()
+        assert snap["count"] == 4
+        assert snap["window"] == 3
+        assert snap["max"] == 3
+        assert snap["buckets"]["1"] == 1
+        assert snap["buckets"]["2"] == 1
+        assert snap["buckets"]["5"] == 1
@@ -0,0 +1,145 @@
+"""Tests for the analytics response cache and its TTL-aware LRU."""
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes import categories, debug, transactions
+from cache import LRUCache
+from db.database import bump_data_version
+from ingestion.ingest import ingest_file
+from services import response_cache
+from services.response_cache import cached
+
+calls = []
+
+
+@cached("test_spend", "transactions", "categories")
+def _total_spend(conn, month=None):
+    calls.append(month)
+    return conn.execute("SELECT COALESCE(SUM(amount), 0) FROM transactions").fetchone()[0]
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    response_cache.clear()
+    calls.clear()
+    yield
+    response_cache.clear()
+
+
+# ---------------------------------------------------------------------------
+# LRUCache TTL
+# ---------------------------------------------------------------------------
+
+class TestLRUCacheTTL:
+    def test_expired_entry_is_a_miss(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr("cache.time.monotonic", lambda: now[0])
+        c = LRUCache(maxsize=4, ttl=10)
+        c.set("a", 1)
+        assert c.get("a") == 1
+        now[0] = 110.0
+        assert c.get("a") is None
+        assert "a" not in c
+        assert (c.hits, c.misses) == (1, 1)
+
+    def test_counts_evictions(self):
+        c = LRUCache(maxsize=2)
+        for key in "abc":
+            c.set(key, key)
+        assert c.evictions == 1
+        assert "a" not in c
+
+
+# ---------------------------------------------------------------------------
+# cached()
+# ---------------------------------------------------------------------------
+
+class TestCached:
+    def test_repeat_call_is_a_hit(self, db):
+        assert _total_spend(db) == _total_spend(db)
+        assert calls == [None]
+        stats = response_cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+    def test_arguments_are_part_of_the_key(self, db):
+        _total_spend(db, month="2025-01")
+        _total_spend(db, month="2025-02")
+        _total_spend(db, month="2025-01")
+        assert calls == ["2025-01", "2025-02"]
+
+    def test_bump_of_a_read_table_invalidates(self, db):
+        _total_spend(db)
+        bump_data_version(db, "categories")
+        db.commit()
+        _total_spend(db)
+        assert len(calls) == 2
+
+    def test_bump_of_other_table_keeps_entry(self, db):
+        _total_spend(db)
+        bump_data_version(db, "accounts")
+        db.commit()
+        _total_spend(db)
+        assert len(calls) == 1
+
+    def test_ingestion_invalidates(self, db, tmp_path):
+        db.execute(
+            "INSERT INTO accounts (id, name, bank, type, scraper_type) "
+            "VALUES (1, 'Test Account', 'leumi', 'personal', 'leumi')"
+        )
+        db.commit()
+        assert _total_spend(db) == 0
+        path = tmp_path / "leumi.json"
+        txns = [{"date": "2025-06-10T08:00:00.000Z", "chargedAmount": -5, "description": "x", "identifier": 1}]
+        path.write_text(json.dumps({"bank": "leumi", "accounts": [{"accountNumber": "1", "txns": txns}]}))
+        ingest_file(path, db=db)
+        assert _total_spend(db) == -5
+
+    def test_write_routes_invalidate(self, db):
+        client = _client()
+        db.execute(
+            "INSERT INTO accounts (id, name, bank, type, scraper_type) "
+            "VALUES (1, 'Test Account', 'leumi', 'personal', 'leumi')"
+        )
+        db.execute(
+            "INSERT INTO transactions (id, source_type, source_id, date, amount, description, category_id) "
+            "VALUES (1, 'bank', 1, '2025-01-15', -100, 'test', 1)"
+        )
+        db.commit()
+        _total_spend(db)
+        client.put("/api/transactions/1", json={"notes": "checked"})
+        _total_spend(db)
+        client.post("/api/categories", json={"name": "Pets"})
+        _total_spend(db)
+        assert len(calls) == 3
+
+
+# ---------------------------------------------------------------------------
+# Debug route
+# ---------------------------------------------------------------------------
+
+class TestDebugRoute:
+    def test_stats_and_clear(self, db):
+        client = _client()
+        _total_spend(db)
+        _total_spend(db)
+        body = client.get("/api/_debug/cache").json()
+        assert body["size"] == 1
+        assert body["hits"] == 1
+        assert client.delete("/api/_debug/cache").status_code == 204
+        assert client.get("/api/_debug/cache").json()["size"] == 0
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(categories.router)
+    app.include_router(transactions.router)
+    app.include_router(debug.router)
+    return TestClient(app)
@@ -256,6 +256,42 @@ class TestSyncIngestion:
         assert ingestion["skipped"] == 5
         assert ingestion["errors"] == ["bad row"]
 
+    def test_classify_cache_counters_aggregated(self):
+        mock_results = [
+            {"file": "a.json", "inserted": 5, "updated": 0, "skipped": 0, "errors": [],
+             "classify_cache_hits": 3, "classify_cache_misses": 2},
+            {"file": "b.json", "inserted": 4, "updated": 0, "skipped": 0, "errors": [],
+             "classify_cache_hits": 4, "classify_cache_misses": 0},
+        ]
+        with patch("api.routes.sync.subprocess") as mock_sub, \
+             patch("api.routes.sync.ingest_all", return_value=mock_results):
+            mock_sub.run.return_value = _mock_subprocess_success("leumi")
+            mock_sub.TimeoutExpired = subprocess.TimeoutExpired
+            resp = client.post("/api/sync", json={"banks": ["leumi"]})
+        ingestion = resp.json()["ingestion"]
+        assert ingestion["classify_cache_hits"] == 7
+        assert ingestion["classify_cache_misses"] == 2
+
+    def test_stage_timings_aggregated(self):
+        mock_results = [
+            {"file": "a.json", "inserted": 5, "updated": 0, "skipped": 0, "errors": [], "rows": 5,
+             "total_ms": 4.0, "timings_ms": {"parse": 1.0, "insert": 2.0}},
+            {"file": "b.json", "inserted": 4, "updated": 0, "skipped": 0, "errors": [], "rows": 4,
+             "total_ms": 3.0, "timings_ms": {"parse": 0.5, "insert": 1.5}},
+        ]
+        with patch("api.routes.sync.subprocess") as mock_sub, \
+             patch("api.routes.sync.ingest_all", return_value=mock_results):
+            mock_sub.run.return_value = _mock_subprocess_success("leumi")
+            mock_sub.TimeoutExpired = subprocess.TimeoutExpired
+            resp = client.post("/api/sync", json={"banks": ["leumi"]})
+        ingestion = resp.json()["ingestion"]
+        assert ingestion["rows"] == 9
+        assert ingestion["stage_timings_ms"]["parse"] == 1.5
+        assert ingestion["stage_timings_ms"]["insert"] == 3.5
+        assert ingestion["stage_timings_ms"]["commit"] == 0
+        assert [f["file"] for f in ingestion["files"]] == ["a.json", "b.json"]
+        assert ingestion["files"][0]["total_ms"] == 4.0
+
     def test_no_files_ingested(self):
         with patch("api.routes.sync.subprocess") as mock_sub, \
              patch("api.routes.sync.ingest_all", return_value=[]):
@@ -0,0 +1,142 @@
+"""Tests for multi-household tenancy (per-tenant SQLite files)."""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import db.database as database
+from api.routes import categories, sync
+from api.tenancy import TenantMiddleware
+from db.database import TenantRegistry, current_tenant, get_connection
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    reg = TenantRegistry(tmp_path / "tenants", max_open=2, pool_size=2)
+    monkeypatch.setattr(database, "_tenants", reg)
+    yield reg
+    reg.close()
+
+
+@pytest.fixture
+def tenant_client(registry):
+    app = FastAPI()
+    app.add_middleware(TenantMiddleware)
+    app.include_router(categories.router)
+    app.include_router(sync.router)
+    return TestClient(app)
+
+
+# ---------------------------------------------------------------------------
+# TenantRegistry
+# ---------------------------------------------------------------------------
+
+class TestTenantRegistry:
+    def test_database_created_on_first_access(self, registry):
+        path = registry.path("alpha")
+        assert not path.exists()
+        registry.pool("alpha")
+        assert path.exists()
+
+    def test_lru_bounds_open_pools(self, registry):
+        for tenant in ("a", "b", "c"):
+            registry.pool(tenant)
+        assert registry.open_tenants() == ["b", "c"]
+
+    def test_eviction_closes_idle_connections(self, registry):
+        pool = registry.pool("a")
+        pool.release(pool.acquire())
+        registry.pool("b")
+        registry.pool("c")
+        assert pool.closed
+        assert pool._idle == []
+
+    def test_pool_reuses_released_connection(self, registry):
+        pool = registry.pool("a")
+        conn = pool.acquire()
+        pool.release(conn)
+        assert pool.acquire() is conn
+
+    def test_release_rolls_back(self, registry):
+        pool = registry.pool("a")
+        conn = pool.acquire()
+        conn.execute("INSERT INTO categories (name) VALUES ('uncommitted')")
+        pool.release(conn)
+        row = pool.acquire().execute("SELECT 1 FROM categories WHERE name = 'uncommitted'").fetchone()
+        assert row is None
+
+    def test_new_tenant_does_not_block_others(self, registry, monkeypatch):
+        registry.pool("b")
+        started, release = threading.Event(), threading.Event()
+        create = database.create_database
+
+        def slow_create(path):
+            started.set()
+            release.wait(5)
+            create(path)
+
+        monkeypatch.setattr(database, "create_database", slow_create)
+        creating = threading.Thread(target=registry.pool, args=("a",))
+        creating.start()
+        try:
+            assert started.wait(5)
+            other = threading.Thread(target=registry.pool, args=("b",))
+            other.start()
+            other.join(1)
+            assert not other.is_alive()
+        finally:
+            release.set()
+            creating.join()
+        assert registry.path("a").exists()
+
+    @pytest.mark.parametrize("tenant", ["../etc", "A", "", "a/b", "x" * 65])
+    def test_rejects_unsafe_ids(self, registry, tenant):
+        with pytest.raises(ValueError):
+            registry.path(tenant)
+
+    def test_get_connection_follows_current_tenant(self, registry):
+        token = current_tenant.set("alpha")
+        try:
+            conn = get_connection()
+            conn.execute("INSERT INTO categories (name) VALUES ('only alpha')")
+            conn.commit()
+            conn.close()
+        finally:
+            current_tenant.reset(token)
+        conn = get_connection()
+        assert conn.execute("SELECT 1 FROM categories WHERE name = 'only alpha'").fetchone() is None
+        conn.close()
+
+
+# ---------------------------------------------------------------------------
+# TenantMiddleware
+# ---------------------------------------------------------------------------
+
+class TestTenantMiddleware:
+    def test_tenants_are_isolated(self, tenant_client):
+        created = tenant_client.post("/api/categories", json={"name": "Boat"},
+                                     headers={"X-Cashboard-Tenant": "alpha"})
+        assert created.status_code == 201
+        alpha = tenant_client.get("/api/categories", headers={"X-Cashboard-Tenant": "alpha"}).json()
+        beta = tenant_client.get("/api/categories", headers={"X-Cashboard-Tenant": "beta"}).json()
+        assert "Boat" in [c["name"] for c in alpha]
+        assert "Boat" not in [c["name"] for c in beta]
+
+    def test_missing_header(self, tenant_client):
+        resp = tenant_client.get("/api/categories")
+        assert resp.status_code == 400
+        assert "X-Cashboard-Tenant" in resp.json()["detail"]
+
+    def test_invalid_tenant(self, tenant_client):
+        resp = tenant_client.get("/api/categories", headers={"X-Cashboard-Tenant": "../x"})
+        assert resp.status_code == 400
+
+    def test_sync_is_refused(self, tenant_client):
+        with patch("api.routes.sync.subprocess.run") as run, patch("api.routes.sync.ingest_all") as ingest:
+            resp = tenant_client.post("/api/sync", headers={"X-Cashboard-Tenant": "alpha"})
+        assert resp.status_code == 409
+        run.assert_not_called()
+        ingest.assert_not_called()
@@ -0,0 +1,229 @@
+"""Tests for the wedding routes, summary/timeline and affordability calculator."""
+
+import time
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app import app
+from db.database import bump_data_version
+from ingestion.ingest import _upsert_balance_snapshot
+from services.wedding import summary, timeline
+from services.wedding_calculator import WeddingNotConfigured, project, simulate
+
+client = TestClient(app)
+
+TODAY = date(2025, 6, 1)
+
+
+@pytest.fixture
+def wedding(db):
+    db.execute("INSERT INTO accounts (id, name, bank, type) VALUES (1, 'A', 'leumi', 'personal')")
+    _upsert_balance_snapshot(db, 1, "2025-05-31", 20000)
+    db.execute(
+        "INSERT INTO wedding_settings (id, wedding_date, total_invited, confirmed_count, declined_count, "
+        "avg_gift_estimate, additional_income, additional_expenses) "
+        "VALUES (1, '2025-12-01', 300, 150, 50, 400, 1000, 2000)"
+    )
+    db.execute("INSERT INTO wedding_vendors (id, name, total_cost) VALUES (1, 'Venue', 50000)")
+    db.executemany(
+        "INSERT INTO wedding_payments (vendor_id, payment_type, amount, is_paid) VALUES (1, ?, ?, ?)",
+        [("advance", 10000, 1), ("interim", 15000, 0)],
+    )
+    # Three months of history: 12000 in, 9000/10000/11000 out
+    for month, spent in (("2025-03", 9000), ("2025-04", 10000), ("2025-05", 11000)):
+        db.executemany(
+            "INSERT INTO transactions (source_type, source_id, date, amount, description) VALUES ('bank', 1, ?, ?, 'x')",
+            [(f"{month}-10", 12000), (f"{month}-15", -spent)],
+        )
+    db.commit()
+    return db
+
+
+# ---------------------------------------------------------------------------
+# Deterministic projection
+# ---------------------------------------------------------------------------
+
+class TestProjection:
+    def test_projection(self, wedding):
+        result = project(wedding, today=TODAY)
+        months = 183 / (365.25 / 12)
+        # Unpaid interim + unscheduled 25000 of the venue's cost
+        assert result["remaining_vendor_costs"] == 40000
+        assert result["history_months"] == 3
+        assert result["avg_monthly_expenses"] == 10000
+        # 150 confirmed + 100 undecided × 0.75 reply rate
+        assert result["expected_gifts"] == 225 * 400
+        before = 20000 + months * 2000 - 40000
+        assert result["balance_before"] == pytest.approx(before, abs=0.01)
+        assert result["balance_after"] == pytest.approx(before + 90000 - 1000, abs=0.01)
+        assert result["status"] == "ok"
+
+    def test_not_configured(self, db):
+        with pytest.raises(WeddingNotConfigured):
+            project(db, today=TODAY)
+
+
+# ---------------------------------------------------------------------------
+# Simulation
+# ---------------------------------------------------------------------------
+
+class TestSimulation:
+    def test_bands_are_ordered_around_projection(self, wedding):
+        result = simulate(wedding, scenarios=5000, today=TODAY)
+        after = result["balance_after"]
+        assert after["p5"] < after["p50"] < after["p95"]
+        expected = project(wedding, today=TODAY)["balance_after"]
+        assert after["p5"] < expected < after["p95"]
+        assert 0 <= result["probability_negative_after"] <= 1
+
+    def test_seed_is_reproducible(self, wedding):
+        first = simulate(wedding, scenarios=1000, seed=7, today=TODAY)
+        again = simulate(wedding, scenarios=1000, seed=7, today=TODAY)
+        other = simulate(wedding, scenarios=1000, seed=8, today=TODAY)
+        assert first == again
+        assert first["balance_after"] != other["balance_after"]
+
+    def test_ten_thousand_scenarios_are_fast(self, wedding):
+        start = time.perf_counter()
+        simulate(wedding, scenarios=10_000, seed=123, today=TODAY)
+        assert time.perf_counter() - start < 0.5
+
+    def test_no_history(self, db):
+        db.execute("INSERT INTO wedding_settings (id, wedding_date) VALUES (1, '2025-12-01')")
+        db.commit()
+        result = simulate(db, scenarios=100, today=TODAY)
+        assert result["history_months"] == 0
+        assert result["balance_after"]["p50"] == 0
+
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+class TestRoutes:
+    def test_calculator(self, wedding):
+        resp = client.get("/api/wedding/calculator")
+        assert resp.status_code == 200
+        assert resp.json()["status"] in ("ok", "tight", "shortfall")
+
+    def test_simulation(self, wedding):
+        resp = client.get("/api/wedding/calculator/simulation", params={"scenarios": 1000})
+        assert resp.status_code == 200
+        assert set(resp.json()["balance_after"]) == {"p5", "p25", "p50", "p75", "p95"}
+
+    def test_not_configured_is_409(self):
+        assert client.get("/api/wedding/calculator").status_code == 409
+
+    def test_scenario_limit(self, wedding):
+        resp = client.get("/api/wedding/calculator/simulation", params={"scenarios": 10})
+        assert resp.status_code == 422
+
+    def test_negative_seed_is_rejected(self, wedding):
+        resp = client.get("/api/wedding/calculator/simulation", params={"seed": -1})
+        assert resp.status_code == 422
+
+
+# ---------------------------------------------------------------------------
+# CRUD routes
+# ---------------------------------------------------------------------------
+
+class TestCrud:
+    def test_vendor_and_payment_lifecycle(self):
+        vendor = client.post("/api/wedding/vendors", json={"name": "DJ", "category": "music", "total_cost": 8000})
+        assert vendor.status_code == 201
+        vendor_id = vendor.json()["id"]
+        payment = client.post("/api/wedding/payments", json={"vendor_id": vendor_id, "amount": 2000,
+                                                               "payment_type": "advance", "due_date": "2025-07-01"})
+        assert payment.status_code == 201
+        payment_id = payment.json()["id"]
+
+        resp = client.put(f"/api/wedding/payments/{payment_id}", json={
+            "vendor_id": vendor_id, "amount": 2000, "due_date": "2025-07-01", "is_paid": True, "paid_date": "2025-06-20",
+        })
+        assert resp.json()["is_paid"] is True
+        assert client.get("/api/wedding/payments", params={"is_paid": False}).json() == []
+        assert client.delete(f"/api/wedding/vendors/{vendor_id}").status_code == 409
+        assert client.delete(f"/api/wedding/payments/{payment_id}").status_code == 204
+        assert client.delete(f"/api/wedding/vendors/{vendor_id}").status_code == 204
+        assert client.get(f"/api/wedding/vendors/{vendor_id}").status_code == 404
+
+    def test_payment_needs_vendor(self):
+        resp = client.post("/api/wedding/payments", json={"vendor_id": 99, "amount": 1})
+        assert resp.status_code == 400
+
+    def test_settings_upsert(self):
+        assert client.get("/api/wedding/settings").json()["wedding_date"] is None
+        client.put("/api/wedding/settings", json={"wedding_date": "2026-09-01", "original_budget": 150000})
+        client.put("/api/wedding/settings", json={"wedding_date": "2026-09-02", "original_budget": 150000})
+        body = client.get("/api/wedding/settings").json()
+        assert (body["wedding_date"], body["original_budget"]) == ("2026-09-02", 150000)
+
+    def test_settings_reject_invalid_date(self):
+        resp = client.put("/api/wedding/settings", json={"wedding_date": "1/9/2026"})
+        assert resp.status_code == 400
+        assert client.get("/api/wedding/settings").json()["wedding_date"] is None
+
+    def test_stored_invalid_date_is_409(self, wedding):
+        wedding.execute("UPDATE wedding_settings SET wedding_date = 'soon' WHERE id = 1")
+        bump_data_version(wedding, "wedding_settings")
+        wedding.commit()
+        for path in ("/api/wedding/calculator", "/api/wedding/calculator/simulation"):
+            resp = client.get(path)
+            assert resp.status_code == 409
+            assert "YYYY-MM-DD" in resp.json()["detail"]
+
+    def test_write_invalidates_calculator(self, wedding):
+        before = client.get("/api/wedding/calculator").json()["remaining_vendor_costs"]
+        client.post("/api/wedding/vendors", json={"name": "Flowers", "total_cost": 3000})
+        assert client.get("/api/wedding/calculator").json()["remaining_vendor_costs"] == before + 3000
+
+
+# ---------------------------------------------------------------------------
+# Summary and timeline
+# ---------------------------------------------------------------------------
+
+class TestSummary:
+    def test_per_category_totals(self, wedding):
+        wedding.execute("INSERT INTO wedding_vendors (id, name, category) VALUES (2, 'Band', 'music')")
+        wedding.execute("INSERT INTO wedding_payments (vendor_id, amount, is_paid) VALUES (2, 6000, 1)")
+        wedding.execute("UPDATE wedding_settings SET original_budget = 60000")
+        wedding.commit()
+        result = summary(wedding)
+        assert [(c["category"], c["total_cost"], c["paid"]) for c in result["categories"]] == [
+            ("music", 6000, 6000), ("other", 50000, 10000),
+        ]
+        assert (result["total_cost"], result["paid"], result["remaining"]) == (56000, 16000, 40000)
+        assert result["budget_remaining"] == 4000
+
+    def test_empty(self, db):
+        result = client.get("/api/wedding/summary").json()
+        assert result["categories"] == []
+        assert result["budget"] is None
+
+
+class TestTimeline:
+    def test_month_buckets_and_upcoming(self, wedding):
+        wedding.executemany(
+            "INSERT INTO wedding_payments (vendor_id, amount, due_date, is_paid) VALUES (1, ?, ?, ?)",
+            [(1000, "2025-05-20", 0), (2000, "2025-06-10", 0), (3000, "2025-06-25", 1), (4000, "2025-09-01", 0)],
+        )
+        wedding.commit()
+        result = timeline(wedding, today=TODAY)
+        assert [(m["month"], m["total"], m["unpaid"]) for m in result["months"]] == [
+            ("2025-05", 1000, 1000), ("2025-06", 5000, 2000), ("2025-09", 4000, 4000),
+        ]
+        # The fixture's two payments have no due date
+        assert len(result["unscheduled"]) == 2
+        assert [(p["amount"], p["overdue"]) for p in result["upcoming"]] == [(1000, True), (2000, False)]
+
+    def test_upcoming_route_uses_index(self, wedding):
+        plan = " ".join(r[-1] for r in wedding.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM wedding_payments WHERE is_paid = 0 AND due_date <= '2025-07-01' "
+            "ORDER BY due_date"
+        ))
+        assert "idx_wedding_payments_paid_due" in plan
+        assert client.get("/api/wedding/payments/upcoming").status_code == 200
+
+